@@ -0,0 +1,163 @@
+import argparse
+import os
+import random
+import time
+from datetime import date, timedelta
+from models import connection
+from models.connection import get_connection, close_all_connections
+
+# -------------------
+# Synthetic Data
+# -------------------
+# Fills a scratch database (never Data/invoice.db) with realistic volumes so
+# the benchmarks measure something close to a shop with years of history.
+
+SCALES = {
+    "small": {"vendors": 200, "items": 1000, "invoices": 2000, "lines": 20, "years": 8},
+    "medium": {"vendors": 2000, "items": 5000, "invoices": 25000, "lines": 40, "years": 8},
+    "large": {"vendors": 5000, "items": 20000, "invoices": 100000, "lines": 40, "years": 8},
+}
+
+# Share of invoices created and never filled in
+EMPTY_INVOICE_RATE = 0.02
+
+PRODUCE = ["Apples", "Pears", "Grapes", "Lettuce", "Tomatoes", "Onions", "Peppers", "Carrots",
+           "Celery", "Berries", "Melons", "Citrus", "Potatoes", "Squash", "Herbs", "Mushrooms"]
+VARIETIES = ["Red", "Green", "Gold", "Organic", "Roma", "Sweet", "Baby", "Jumbo", "Heirloom",
+             "Local", "Premium", "Select", "Bulk", "Cello", "Vine", "Fancy"]
+PACKS = ["10 lb", "25 lb", "40 lb", "1 bu", "12 ct", "24 ct", "case", "flat", "tray", "bag"]
+NOTES = ["", "", "", "", "deliver to back door", "short 2 cs", "credit pending", "rush",
+         "substitute ok", "damaged on arrival", "price adj", "hold for pickup"]
+
+
+def _bulk_load_triggers(conn):
+    """Drop the maintenance triggers for the bulk insert; returns their SQL to recreate them."""
+    rows = conn.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name IN ('items', 'vendors', 'invoices', 'invoice_items')"
+    ).fetchall()
+    for name, _sql in rows:
+        conn.execute(f"DROP TRIGGER {name}")
+    return [sql for _name, sql in rows]
+
+
+def generate(db_path, vendors, items, invoices, lines, years, seed=1, progress=print):
+    """
+    Create `db_path` with the current schema and fill it. Line counts per
+    invoice vary around `lines`; invoice dates are spread over `years` up to
+    today. Returns a summary dict.
+    """
+    if os.path.abspath(db_path) == os.path.abspath("Data/invoice.db"):
+        raise ValueError("Refusing to generate benchmark data into the live database.")
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
+
+    started = time.perf_counter()
+    rng = random.Random(seed)
+    connection.DB_PATH = db_path
+    conn = get_connection()  # creates the schema through the migrations
+    triggers = _bulk_load_triggers(conn)
+    conn.commit()
+
+    with conn:
+        conn.executemany(
+            "INSERT INTO vendors (id, name, active) VALUES (?, ?, ?)",
+            ((i, f"{rng.choice(VARIETIES)} {rng.choice(PRODUCE)} Farms {i}", int(rng.random() > 0.05))
+             for i in range(1, vendors + 1))
+        )
+        conn.executemany(
+            "INSERT INTO items (id, name, item_code, active) VALUES (?, ?, ?, ?)",
+            ((i, f"{rng.choice(PRODUCE)} {rng.choice(VARIETIES)} {rng.choice(PACKS)} #{i}", f"{40000 + i}",
+              int(rng.random() > 0.05))
+             for i in range(1, items + 1))
+        )
+    progress(f"{vendors} vendors, {items} items")
+
+    # Each vendor carries a subset of items at a fairly stable price
+    vendor_items = {v: rng.sample(range(1, items + 1), min(items, 50)) for v in range(1, vendors + 1)}
+    base_price = {i: round(rng.uniform(5, 80), 2) for i in range(1, items + 1)}
+
+    today = date.today()
+    first_day = today - timedelta(days=365 * years)
+    span = (today - first_day).days
+    dates = sorted(first_day + timedelta(days=rng.randrange(span + 1)) for _ in range(invoices))
+
+    total_lines = 0
+    batch = []
+    with conn:
+        conn.executemany(
+            "INSERT INTO invoices (id, date) VALUES (?, ?)",
+            ((i, d.strftime("%Y-%m-%d")) for i, d in enumerate(dates, start=1))
+        )
+        for invoice_id in range(1, invoices + 1):
+            if rng.random() < EMPTY_INVOICE_RATE:
+                continue
+            invoice_vendors = rng.sample(range(1, vendors + 1), min(vendors, rng.randint(2, 8)))
+            for _ in range(max(1, int(rng.gauss(lines, lines / 4)))):
+                vendor_id = rng.choice(invoice_vendors)
+                item_id = rng.choice(vendor_items[vendor_id])
+                price = round(base_price[item_id] * rng.uniform(0.9, 1.1), 2)
+                batch.append((invoice_id, vendor_id, item_id, rng.randint(1, 40), price, rng.choice(NOTES)))
+            if len(batch) >= 50000:
+                conn.executemany(
+                    "INSERT INTO invoice_items (invoice_id, vendor_id, item_id, quantity, unit_price, optional_info) "
+                    "VALUES (?, ?, ?, ?, ?, ?)", batch
+                )
+                total_lines += len(batch)
+                batch = []
+                progress(f"  {total_lines:,} line items")
+        conn.executemany(
+            "INSERT INTO invoice_items (invoice_id, vendor_id, item_id, quantity, unit_price, optional_info) "
+            "VALUES (?, ?, ?, ?, ?, ?)", batch
+        )
+        total_lines += len(batch)
+
+    # Put the triggers back and build what they would have maintained
+    with conn:
+        for sql in triggers:
+            conn.execute(sql)
+        for table in ("items_fts", "vendors_fts", "invoice_items_fts"):
+            conn.execute(f"INSERT INTO {table} ({table}) VALUES ('rebuild')")
+    from models.reporting import rebuild_spend_summary
+    rebuild_spend_summary()
+    conn.execute("ANALYZE")
+    conn.commit()
+    close_all_connections()
+
+    summary = {
+        "path": db_path,
+        "vendors": vendors,
+        "items": items,
+        "invoices": invoices,
+        "invoice_items": total_lines,
+        "years": years,
+        "seed": seed,
+        "seconds": time.perf_counter() - started,
+        "bytes": os.path.getsize(db_path)
+    }
+    progress(f"{total_lines:,} line items over {invoices:,} invoices in {summary['seconds']:.1f}s "
+             f"({summary['bytes'] / 1024 / 1024:.0f} MB)")
+    return summary
+
+
+def add_arguments(parser):
+    parser.add_argument("--scale", choices=SCALES, default="medium")
+    for key in ("vendors", "items", "invoices", "lines", "years"):
+        parser.add_argument(f"--{key}", type=int, help=f"override the scale's {key}")
+    parser.add_argument("--seed", type=int, default=1)
+
+
+def scale_from_args(args):
+    params = dict(SCALES[args.scale])
+    for key in params:
+        if getattr(args, key, None) is not None:
+            params[key] = getattr(args, key)
+    return params
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic invoice database for benchmarking.")
+    parser.add_argument("--db", default="benchmarks/bench.db", help="scratch database to (re)create")
+    add_arguments(parser)
+    args = parser.parse_args()
+    generate(args.db, seed=args.seed, **scale_from_args(args))
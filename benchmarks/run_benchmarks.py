@@ -0,0 +1,297 @@
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from benchmarks.generate_data import add_arguments, scale_from_args, generate
+from models import connection, database, settings_store
+from models.cleanup_old_invoices import delete_old_invoices, delete_empty_invoices
+from models.connection import close_all_connections, get_connection
+from models.generate_pdf import generate_pdf_invoice, group_invoice_items
+
+# -------------------
+# Benchmarks
+# -------------------
+# Times the hot paths against a synthetic database (see generate_data.py) and
+# writes the results as JSON. Pass --baseline to compare against an earlier
+# run; a benchmark whose fastest run is slower than the baseline's by more
+# than --tolerance plus the run-to-run spread seen in either file is reported
+# as a regression and the script exits with status 1.
+#
+# Each benchmark gets --warmup untimed runs first, and the run uses the
+# default settings plus BENCH_SETTINGS rather than Data/settings.json, so a
+# local settings change (e.g. turning diagnostics on) does not show up as a
+# regression.
+#
+#   python -m benchmarks.run_benchmarks --scale small --save-baseline
+#   python -m benchmarks.run_benchmarks --scale small --baseline
+
+DEFAULT_DB = "benchmarks/bench.db"
+DEFAULT_OUTPUT = "benchmarks/results.json"
+DEFAULT_BASELINE = "benchmarks/baseline.json"
+
+# Invoices read per get_invoice_items run
+SAMPLE_INVOICES = 50
+# Rows added and then removed again per update_invoice run
+UPDATE_ROWS = 40
+
+# Settings pinned for every run, on top of DEFAULT_SETTINGS
+BENCH_SETTINGS = {
+    "diagnostics": {"enabled": False},
+}
+
+
+def _copy_db(source, target):
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(target + suffix):
+            os.remove(target + suffix)
+        if os.path.exists(source + suffix):
+            shutil.copyfile(source + suffix, target + suffix)
+
+
+def _use_db(path):
+    close_all_connections()
+    connection.DB_PATH = path
+
+
+def _pin_settings(workdir):
+    """Point the settings store at a copy of the defaults plus BENCH_SETTINGS."""
+    path = os.path.join(workdir, "settings.json")
+    settings = settings_store.merge_defaults(BENCH_SETTINGS)
+    with open(path, "w") as f:
+        json.dump(settings, f, indent=4)
+    settings_store.SETTINGS_PATH = path
+    return settings
+
+
+# Untimed runs before each benchmark, so cold caches and first-use setup
+# (connections, migrations, imports) stay out of the numbers
+WARMUP = 2
+
+
+def _timed(func, repeat, setup=None):
+    runs = []
+    for i in range(WARMUP + repeat):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        func()
+        if i >= WARMUP:
+            runs.append(time.perf_counter() - started)
+    return runs
+
+
+class BenchmarkContext:
+    """The working copy of the scratch database plus the sample data the benchmarks share."""
+
+    def __init__(self, source_db, workdir, seed=1):
+        self.source_db = source_db
+        self.workdir = workdir
+        self.db_path = os.path.join(workdir, "work.db")
+        _copy_db(source_db, self.db_path)
+        _use_db(self.db_path)
+
+        rng = random.Random(seed)
+        conn = get_connection()
+        ids = [row[0] for row in conn.execute(
+            "SELECT DISTINCT invoice_id FROM invoice_items ORDER BY invoice_id"
+        )]
+        self.sample_ids = rng.sample(ids, min(SAMPLE_INVOICES, len(ids)))
+        # The busiest invoice in the sample stands in for a large order
+        self.large_invoice_id = max(self.sample_ids, key=lambda i: len(database.get_invoice_items(i)))
+        self.large_items = [dict(row) for row in database.get_invoice_items(self.large_invoice_id)]
+        self.large_date = database.get_invoice_details(self.large_invoice_id)["date"]
+        self.counts = {
+            table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in ("vendors", "items", "invoices", "invoice_items")
+        }
+
+    def fresh_copy(self):
+        """Point the app at an untouched copy, for benchmarks that delete data."""
+        path = os.path.join(self.workdir, "fresh.db")
+        close_all_connections()
+        _copy_db(self.source_db, path)
+        _use_db(path)
+        get_connection()
+
+    def restore(self):
+        _use_db(self.db_path)
+
+
+def bench_get_invoice_items(ctx, repeat):
+    def run():
+        for invoice_id in ctx.sample_ids:
+            database.get_invoice_items(invoice_id)
+    return _timed(run, repeat), {"invoices_per_run": len(ctx.sample_ids)}
+
+
+def bench_update_invoice(ctx, repeat):
+    rows = [{
+        "vendor_id": item["vendor_id"],
+        "item_id": item["item_id"],
+        "quantity": item["quantity"],
+        "unit_price": item["unit_price"],
+        "optional_info": item["optional_info"]
+    } for item in (ctx.large_items * UPDATE_ROWS)[:UPDATE_ROWS]]
+
+    def run():
+        new_ids = database.update_invoice(ctx.large_invoice_id, inserts=rows)
+        database.update_invoice(ctx.large_invoice_id, deletes=new_ids)
+    return _timed(run, repeat), {"rows_per_run": UPDATE_ROWS * 2}
+
+
+def bench_get_all_invoices(ctx, repeat):
+    return _timed(database.get_all_invoices, repeat), {"invoices": ctx.counts["invoices"]}
+
+
+def bench_delete_old_invoices(ctx, repeat):
+    removed = []
+    runs = _timed(lambda: removed.append(delete_old_invoices(pause=0)), repeat, setup=ctx.fresh_copy)
+    ctx.restore()
+    return runs, {"invoices_removed": removed[-1][0], "items_removed": removed[-1][1]}
+
+
+def bench_delete_empty_invoices(ctx, repeat):
+    removed = []
+    runs = _timed(lambda: removed.append(delete_empty_invoices(pause=0)), repeat, setup=ctx.fresh_copy)
+    ctx.restore()
+    return runs, {"invoices_removed": removed[-1][0]}
+
+
+def bench_group_invoice_items(ctx, repeat):
+    return _timed(lambda: group_invoice_items(ctx.large_items), repeat), {"lines": len(ctx.large_items)}
+
+
+def bench_generate_pdf_invoice(ctx, repeat):
+    filename = os.path.join(ctx.workdir, "invoice.pdf")
+    runs = _timed(
+        lambda: generate_pdf_invoice(ctx.large_invoice_id, ctx.large_date, ctx.large_items, filename), repeat
+    )
+    return runs, {"lines": len(ctx.large_items), "bytes": os.path.getsize(filename)}
+
+
+BENCHMARKS = {
+    "get_invoice_items": bench_get_invoice_items,
+    "update_invoice": bench_update_invoice,
+    "get_all_invoices": bench_get_all_invoices,
+    "delete_old_invoices": bench_delete_old_invoices,
+    "delete_empty_invoices": bench_delete_empty_invoices,
+    "group_invoice_items": bench_group_invoice_items,
+    "generate_pdf_invoice": bench_generate_pdf_invoice,
+}
+
+
+def run_benchmarks(db_path, names=None, repeat=10, seed=1, progress=print):
+    results = {}
+    settings_path = settings_store.SETTINGS_PATH
+    with tempfile.TemporaryDirectory(prefix="wholesale_bench_") as workdir:
+        _pin_settings(workdir)
+        try:
+            ctx = BenchmarkContext(db_path, workdir, seed)
+            for name in names or BENCHMARKS:
+                runs, info = BENCHMARKS[name](ctx, repeat)
+                results[name] = {
+                    "runs": runs,
+                    "min": min(runs),
+                    "median": statistics.median(runs),
+                    "mean": statistics.mean(runs),
+                    **info
+                }
+                progress(f"{name:<24} median {results[name]['median'] * 1000:9.2f} ms   min {results[name]['min'] * 1000:9.2f} ms")
+            counts = ctx.counts
+        finally:
+            close_all_connections()
+            settings_store.SETTINGS_PATH = settings_path
+
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "repeat": repeat,
+            "warmup": WARMUP,
+            "settings": BENCH_SETTINGS,
+            "database": os.path.abspath(db_path),
+            "counts": counts
+        },
+        "results": results
+    }
+
+
+def _spread(result):
+    # How far the typical run sits above the fastest one, as a fraction
+    return result["median"] / result["min"] - 1 if result["min"] else 0.0
+
+
+def compare(report, baseline, tolerance=0.3):
+    """
+    Compare fastest runs against `baseline`. A benchmark regresses when it
+    is slower by more than `tolerance` plus the larger run-to-run spread of
+    the two results. Returns a list of (name, baseline_min, min, ratio,
+    regressed) for benchmarks in both.
+    """
+    rows = []
+    for name, result in report["results"].items():
+        previous = baseline.get("results", {}).get(name)
+        if not previous or not previous["min"]:
+            continue
+        ratio = result["min"] / previous["min"]
+        allowed = tolerance + max(_spread(result), _spread(previous))
+        rows.append((name, previous["min"], result["min"], ratio, ratio > 1 + allowed))
+    return rows
+
+
+def print_comparison(rows, report, baseline):
+    if baseline.get("meta", {}).get("counts") != report["meta"]["counts"]:
+        print("Warning: the baseline was recorded against a different dataset; timings may not be comparable.")
+    if baseline.get("meta", {}).get("settings") != report["meta"]["settings"]:
+        print("Warning: the baseline was recorded with different pinned settings; timings may not be comparable.")
+    print(f"{'benchmark':<24} {'baseline min':>12} {'current min':>12} {'change':>9}")
+    for name, before, after, ratio, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{name:<24} {before * 1000:10.2f}ms {after * 1000:10.2f}ms {(ratio - 1) * 100:+8.1f}%{flag}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the invoice hot paths against synthetic data.")
+    parser.add_argument("--db", default=DEFAULT_DB, help="scratch database (generated if missing)")
+    parser.add_argument("--regenerate", action="store_true", help="rebuild the scratch database first")
+    add_arguments(parser)
+    parser.add_argument("--only", nargs="+", choices=BENCHMARKS, help="run just these benchmarks")
+    parser.add_argument("--repeat", type=int, default=10, help="timed runs per benchmark")
+    parser.add_argument("--warmup", type=int, default=WARMUP, help="untimed runs before each benchmark")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="where to write the JSON results")
+    parser.add_argument("--baseline", nargs="?", const=DEFAULT_BASELINE, help="compare against this results file")
+    parser.add_argument("--save-baseline", action="store_true", help=f"also write the results to {DEFAULT_BASELINE}")
+    parser.add_argument("--tolerance", type=float, default=0.3,
+                        help="allowed slowdown on top of the observed spread before flagging (0.3 = 30%%)")
+    args = parser.parse_args()
+
+    if args.regenerate or not os.path.exists(args.db):
+        generate(args.db, seed=args.seed, **scale_from_args(args))
+
+    WARMUP = args.warmup
+    report = run_benchmarks(args.db, args.only, args.repeat, args.seed)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+    if args.save_baseline:
+        with open(DEFAULT_BASELINE, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline written to {DEFAULT_BASELINE}")
+
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+        rows = compare(report, baseline, args.tolerance)
+        print_comparison(rows, report, baseline)
+        if any(row[4] for row in rows):
+            sys.exit(1)
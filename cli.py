@@ -0,0 +1,187 @@
+import argparse
+import json
+import sys
+
+# -------------------
+# Command Line
+# -------------------
+# Headless entry point for scripts and scheduled jobs:
+#
+#   python cli.py cleanup
+#   python cli.py list --from 2024-01-01 --limit 20 --json
+#   python cli.py export 12 --file invoice_12.pdf
+#   python cli.py export --from 2024-01-01 --to 2024-01-31 --out exports/
+#   python cli.py import 12 lines.csv
+#   python cli.py totals 12 13 --json
+#
+# Nothing here imports tkinter, and the models are only imported by the
+# subcommand that needs them so a call stays cheap in a tight loop.
+
+
+def emit(args, data, lines):
+    if args.json:
+        json.dump(data, sys.stdout, indent=None if args.compact else 2)
+        sys.stdout.write("\n")
+    else:
+        for line in lines:
+            print(line)
+
+
+def cmd_cleanup(args):
+    from models.cleanup_old_invoices import CleanupWorker
+    worker = CleanupWorker(args.batch_size, None if args.pause_ms is None else args.pause_ms / 1000)
+    # Run on this thread; the worker still records itself in maintenance_log
+    worker.run()
+    stats = worker.stats
+    emit(args, stats, [
+        f"Cleanup {stats['status']}: removed {stats['invoices_removed']} invoices and "
+        f"{stats['items_removed']} line items in {stats['elapsed']:.2f}s"
+        + (f" ({stats['error']})" if stats["error"] else "")
+    ])
+    return 0 if stats["status"] == "done" else 1
+
+
+def cmd_list(args):
+    from models import database
+    rows = database.get_invoices_page(
+        limit=args.limit, start_date=args.start_date, end_date=args.end_date, vendor_id=args.vendor_id
+    )
+    emit(args, [{"id": invoice_id, "date": date} for invoice_id, date in rows],
+         [f"{invoice_id}\t{date}" for invoice_id, date in rows])
+    return 0
+
+
+def cmd_totals(args):
+    from models import database
+    rows = database.get_invoice_totals(args.ids or None, args.start_date, args.end_date)
+    data = [
+        {"id": invoice_id, "date": date, "lines": lines, "quantity": quantity, "total": round(total, 2)}
+        for invoice_id, date, lines, quantity, total in rows
+    ]
+    lines = [f"{row['id']}\t{row['date']}\t{row['lines']} lines\t{row['quantity']} units\t${row['total']:,.2f}" for row in data]
+    if len(data) > 1:
+        lines.append(f"{len(data)} invoices\t\t{sum(r['lines'] for r in data)} lines\t"
+                     f"{sum(r['quantity'] for r in data)} units\t${sum(r['total'] for r in data):,.2f}")
+    missing = sorted(set(args.ids) - {row["id"] for row in data}) if args.ids else []
+    for invoice_id in missing:
+        print(f"Invoice {invoice_id} does not exist.", file=sys.stderr)
+    emit(args, data, lines)
+    return 1 if missing else 0
+
+
+def cmd_export(args):
+    if args.file:
+        if len(args.ids) != 1:
+            print("--file needs exactly one invoice id.", file=sys.stderr)
+            return 2
+        from models.pdf_export import export_invoice_pdf
+        try:
+            stats = export_invoice_pdf(args.ids[0], args.file, use_cache=not args.no_cache)
+        except ValueError as e:
+            print(e, file=sys.stderr)
+            return 1
+        emit(args, stats, [f"Exported invoice {args.ids[0]} to {stats['path']}"
+                           + (" (cached)" if stats.get("cached") else "")])
+        return 0
+
+    if not args.ids and not (args.start_date or args.end_date):
+        print("Give invoice ids or a --from/--to date range.", file=sys.stderr)
+        return 2
+    from models.pdf_export import export_invoices
+
+    def progress(done, total, invoice_id, error):
+        if error and not args.json:
+            print(f"[{done}/{total}] invoice {invoice_id} FAILED: {error}", file=sys.stderr)
+
+    summary = export_invoices(args.ids or None, args.start_date, args.end_date, args.out,
+                              workers=args.workers, progress=progress)
+    emit(args, {
+        "exported": [{"id": invoice_id, "path": path} for invoice_id, path in summary["exported"]],
+        "failed": [{"id": invoice_id, "error": error} for invoice_id, error in summary["failed"]],
+        "rows": summary["rows"],
+        "seconds": summary["seconds"]
+    }, [f"Exported {len(summary['exported'])} invoices ({summary['rows']} rows), "
+        f"{len(summary['failed'])} failed in {summary['seconds']:.1f}s."])
+    return 1 if summary["failed"] else 0
+
+
+def cmd_import(args):
+    from models import database
+    from models.invoice_import import import_line_items
+    invoice_id = args.invoice_id
+    created = False
+    try:
+        # Fail on an unreadable file before making a new invoice for it
+        with open(args.path, "rb"):
+            pass
+        if invoice_id is None:
+            invoice_id = database.create_blank_invoice()
+            created = True
+        report = import_line_items(invoice_id, args.path, error_path=args.errors,
+                                   default_unit_price=args.default_price)
+    except (OSError, ValueError) as e:
+        if created:
+            # e.g. the header is missing a required column; don't leave the invoice behind
+            database.delete_invoice(invoice_id)
+        print(e, file=sys.stderr)
+        return 1
+    report = dict(report, invoice_id=invoice_id,
+                  errors=[{"line": line, "reason": reason, "row": row} for line, reason, row in report["errors"]])
+    lines = [f"Invoice {invoice_id}: imported {report['rows_imported']} of {report['rows_read']} rows, "
+             f"{report['rows_rejected']} rejected"]
+    lines += [f"  line {e['line']}: {e['reason']}" for e in report["errors"]]
+    emit(args, report, lines)
+    return 1 if report["rows_rejected"] else 0
+
+
+def build_parser():
+    output = argparse.ArgumentParser(add_help=False)
+    output.add_argument("--json", action="store_true", help="print machine-readable JSON")
+    output.add_argument("--compact", action="store_true", help="with --json, print it on one line")
+
+    dates = argparse.ArgumentParser(add_help=False)
+    dates.add_argument("--from", dest="start_date", help="first invoice date, YYYY-MM-DD")
+    dates.add_argument("--to", dest="end_date", help="last invoice date, YYYY-MM-DD")
+
+    parser = argparse.ArgumentParser(description="Wholesale invoice tools without the GUI.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    cleanup = commands.add_parser("cleanup", parents=[output],
+                                  help="delete invoices past retention and empty invoices")
+    cleanup.add_argument("--batch-size", type=int, help="invoices deleted per transaction")
+    cleanup.add_argument("--pause-ms", type=int, help="pause between batches (default from settings)")
+    cleanup.set_defaults(func=cmd_cleanup)
+
+    listing = commands.add_parser("list", parents=[output, dates], help="list invoices, newest first")
+    listing.add_argument("--limit", type=int, default=100)
+    listing.add_argument("--vendor-id", type=int, help="only invoices with a line from this vendor")
+    listing.set_defaults(func=cmd_list)
+
+    totals = commands.add_parser("totals", parents=[output, dates], help="line count, units and total per invoice")
+    totals.add_argument("ids", nargs="*", type=int, help="invoice ids (default: all in the date range)")
+    totals.set_defaults(func=cmd_totals)
+
+    export = commands.add_parser("export", parents=[output, dates], help="export invoices to PDF")
+    export.add_argument("ids", nargs="*", type=int, help="invoice ids")
+    export.add_argument("--file", help="output file when exporting a single invoice")
+    export.add_argument("--out", help="output directory (defaults to pdf_output_directory)")
+    export.add_argument("--workers", type=int, help="worker processes (defaults to CPU count)")
+    export.add_argument("--no-cache", action="store_true", help="with --file, always render instead of using the PDF cache")
+    export.set_defaults(func=cmd_export)
+
+    importer = commands.add_parser("import", parents=[output], help="import line items from a CSV/TSV file")
+    importer.add_argument("invoice_id", type=int, nargs="?", help="invoice to add to (default: a new invoice)")
+    importer.add_argument("path", help="CSV or TSV file")
+    importer.add_argument("--errors", help="write rejected rows to this CSV")
+    importer.add_argument("--default-price", type=float, default=0.0, help="unit price for rows without one")
+    importer.set_defaults(func=cmd_import)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
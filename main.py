@@ -1,57 +1,185 @@
+import time
+
+_STARTED = time.perf_counter()
+
+import argparse
+import os
 import tkinter as tk
-from tkinter import ttk
-from ui.edit_invoice import EditInvoiceWindow
-from ui.manage_vendors import ManageVendorsWindow
-from ui.manage_items import ManageItemsWindow
-from models.database import create_blank_invoice
-from ui.settings import SettingsWindow
-from models.cleanup_old_invoices import delete_old_invoices, delete_empty_invoices
-from ui.saved_invoices_window import SavedInvoicesWindow
+from tkinter import ttk, messagebox
 
+# Window modules are imported inside the open_* functions so the menu comes up
+# without loading every window (and what they import) first.
+
+STARTUP_TIMER_ENV = "WHOLESALE_STARTUP_TIMER"
+
+
+class StartupTimer:
+    """Prints how long each startup phase took, when enabled."""
+
+    def __init__(self, enabled):
+        self.enabled = enabled
+        self.last = _STARTED
+
+    def mark(self, phase):
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        print(f"[startup] {phase:<22} {(now - self.last) * 1000:8.1f} ms  (total {(now - _STARTED) * 1000:8.1f} ms)")
+        self.last = now
+
+
+cleanup = None
+maintenance = None
+# Menu buttons for windows that only work against the local database file
+local_only_buttons = []
+
+
+def start_background_services(timer=None):
+    """Start retention cleanup and the maintenance scheduler once; safe to call again."""
+    global cleanup, maintenance
+    if cleanup is not None or maintenance is not None:
+        return
+    from models.backend import is_remote
+    if is_remote():
+        # The service machine owns the database and its upkeep
+        return
+    try:
+        from models.cleanup_old_invoices import start_background_cleanup
+        cleanup = start_background_cleanup()
+    except Exception as e:
+        print(f"Error during cleanup: {e}")
+
+    try:
+        from models.maintenance import start_maintenance_scheduler
+        maintenance = start_maintenance_scheduler()
+    except Exception as e:
+        print(f"Error starting database maintenance: {e}")
+    if maintenance is not None:
+        # Any input counts as activity; maintenance waits for an idle spell
+        root.bind_all("<Any-KeyPress>", maintenance.note_activity, add="+")
+        root.bind_all("<Any-ButtonPress>", maintenance.note_activity, add="+")
+    if timer is not None:
+        timer.mark("cleanup started")
+        if cleanup is not None and timer.enabled:
+            report_cleanup_when_done()
+
+
+def report_cleanup_when_done():
+    if cleanup.is_alive():
+        root.after(200, report_cleanup_when_done)
+        return
+    stats = cleanup.stats
+    print(f"[startup] cleanup {stats['status']} in the background: {stats['elapsed'] * 1000:.1f} ms, "
+          f"{stats['invoices_removed']} invoices removed")
 
-def open_saved_invoices_window():
-    root.withdraw()
-    win = SavedInvoicesWindow(root)
-    win.protocol("WM_DELETE_WINDOW", lambda: on_close_subwindow(win))
-    win.grab_set()  # Make sure the main window is not accessible while this is open
 
 def on_close_subwindow(window):
     window.destroy()
     root.deiconify()
-    
-def open_new_invoice():
-    invoice_id = create_blank_invoice()
+
+def show_window(create, modal=False):
+    """
+    Hide the menu and open the window `create(close)` builds, where
+    `close()` shuts it and brings the menu back. If the invoice service
+    cannot be reached the menu comes straight back instead.
+    """
+    from models.remote_client import ServiceError
+    win = None
+
+    def close():
+        on_close_subwindow(win)
+
     root.withdraw()
-    win = EditInvoiceWindow(root, NewInvoice=True, invoice_db_id=invoice_id)
-    win.protocol("WM_DELETE_WINDOW", lambda: on_close_subwindow(win))
-    
+    try:
+        win = create(close)
+    except ServiceError as e:
+        root.deiconify()
+        messagebox.showerror("Invoice Service", f"Could not reach the invoice service:\n{e}")
+        return None
+    win.protocol("WM_DELETE_WINDOW", close)
+    if modal:
+        win.grab_set()  # Make sure the main window is not accessible while this is open
+    return win
+
+def open_saved_invoices_window():
+    from ui.saved_invoices_window import SavedInvoicesWindow
+    show_window(lambda close: SavedInvoicesWindow(root), modal=True)
+
+def open_new_invoice():
+    from models.backend import database
+    from ui.edit_invoice import EditInvoiceWindow
+    # Cleanup snapshots the newest invoice id when it starts, so it must be
+    # running before a blank invoice exists or it could remove it
+    start_background_services()
+
+    def create(close):
+        invoice_id = database.create_blank_invoice()
+        return EditInvoiceWindow(root, NewInvoice=True, invoice_db_id=invoice_id)
+    show_window(create)
+
 
 def open_edit_invoice():
-    root.withdraw()
-    win = EditInvoiceWindow(root)
-    win.protocol("WM_DELETE_WINDOW", lambda: on_close_subwindow(win))
+    from ui.edit_invoice import EditInvoiceWindow
+    show_window(lambda close: EditInvoiceWindow(root))
 
 def open_manage_vendors():
-    root.withdraw()
-    win = ManageVendorsWindow(root, on_close=lambda: on_close_subwindow(win))
-    win.protocol("WM_DELETE_WINDOW", lambda: on_close_subwindow(win))
+    from ui.manage_vendors import ManageVendorsWindow
+    show_window(lambda close: ManageVendorsWindow(root, on_close=close))
 
 def open_manage_items():
-    root.withdraw()
-    win = ManageItemsWindow(root, on_close=lambda: on_close_subwindow(win))
-    win.protocol("WM_DELETE_WINDOW", lambda: on_close_subwindow(win))
+    from ui.manage_items import ManageItemsWindow
+    show_window(lambda close: ManageItemsWindow(root, on_close=close))
+
+def open_batch_export():
+    from ui.batch_export_window import BatchExportWindow
+    show_window(lambda close: BatchExportWindow(root))
+
+def open_search():
+    from ui.search_window import SearchWindow
+    show_window(lambda close: SearchWindow(root))
+
+def open_reports():
+    from ui.reports_window import ReportsWindow
+    show_window(lambda close: ReportsWindow(root))
+
+def open_diagnostics():
+    from ui.diagnostics_window import DiagnosticsWindow
+    show_window(lambda close: DiagnosticsWindow(root))
 
 def open_settings():
-    root.withdraw()
-    win = SettingsWindow(root)
-    win.protocol("WM_DELETE_WINDOW", lambda: on_close_subwindow(win))
-    
-def main():
+    from ui.settings import SettingsWindow
+    show_window(lambda close: SettingsWindow(root))
+
+def disable_local_only_windows():
+    from models.backend import is_remote
+    if is_remote():
+        # Reports and batch export read the database file directly, which a
+        # terminal using the invoice service does not own
+        for button in local_only_buttons:
+            button.state(["disabled"])
+
+
+def on_first_paint(timer):
+    root.update_idletasks()
+    timer.mark("first paint")
+    disable_local_only_windows()
+    # Cleanup and maintenance start once the menu is on screen
+    start_background_services(timer)
+
+def main(argv=None):
     global root
+    parser = argparse.ArgumentParser(description="Wholesale Invoice Program")
+    parser.add_argument("--startup-timer", action="store_true",
+                        help=f"print startup phase timings (or set {STARTUP_TIMER_ENV}=1)")
+    args, _unknown = parser.parse_known_args(argv)
+    timer = StartupTimer(args.startup_timer or os.environ.get(STARTUP_TIMER_ENV, "") not in ("", "0"))
+    timer.mark("imports")
+
     root = tk.Tk()
     root.title("Wholesale Invoice Program")
-    root.geometry("400x350")
+    root.geometry("400x550")
     root.resizable(False, False)
+    timer.mark("tk root")
 
     title = ttk.Label(root, text="Invoice Management System", font=("Arial", 16))
     title.pack(pady=20)
@@ -61,15 +189,25 @@ def main():
     ttk.Button(root, text="Manage Vendors", width=25, command=open_manage_vendors).pack(pady=10)
     ttk.Button(root, text="Manage Items", width=25, command=open_manage_items).pack(pady=10)
     ttk.Button(root, text="View Saved Invoices", width=25, command=open_saved_invoices_window).pack(pady=10)
+    batch_export_button = ttk.Button(root, text="Batch Export PDFs", width=25, command=open_batch_export)
+    batch_export_button.pack(pady=10)
+    ttk.Button(root, text="Search", width=25, command=open_search).pack(pady=10)
+    reports_button = ttk.Button(root, text="Reports", width=25, command=open_reports)
+    reports_button.pack(pady=10)
+    local_only_buttons.extend([batch_export_button, reports_button])
+    ttk.Button(root, text="Diagnostics", width=25, command=open_diagnostics).pack(pady=10)
     ttk.Button(root, text="Settings", width=25, command=open_settings).pack(pady=10)
+    timer.mark("menu built")
 
-
+    root.after_idle(on_first_paint, timer)
     root.mainloop()
 
+    if cleanup is not None:
+        # Let the current batch commit, then leave the rest for next launch
+        cleanup.cancel()
+        cleanup.join(timeout=5)
+    if maintenance is not None:
+        maintenance.stop()
+
 if __name__ == "__main__":
-    try:
-        delete_old_invoices()
-        delete_empty_invoices()
-    except Exception as e:
-        print(f"Error during cleanup: {e}")
     main()
@@ -0,0 +1,24 @@
+from models.settings_store import get_section
+
+# -------------------
+# Data Backend
+# -------------------
+# The windows import `database`, `get_catalog`, `search_items`, `search_all`
+# and `export_invoice_pdf` from here. With "service": {"url": ...} set they talk
+# to a models.service instance; otherwise they use the local database file.
+# The choice is made once, when this module is first imported.
+
+REMOTE = bool(get_section("service").get("url"))
+
+if REMOTE:
+    from models import remote_client as database
+    from models.remote_client import get_catalog, search_items, search_all, export_invoice_pdf
+else:
+    from models import database
+    from models.catalog import get_catalog
+    from models.search import search_items, search_all
+    from models.pdf_export import export_invoice_pdf
+
+
+def is_remote():
+    return REMOTE
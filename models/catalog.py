@@ -0,0 +1,82 @@
+import threading
+from models.connection import get_connection
+
+# -------------------
+# Catalog Cache
+# -------------------
+# Vendors and items change rarely but are looked up on every loaded row and
+# cell edit. The whole catalog is read once into dictionaries and shared by
+# every window; the write paths in models.database call invalidate(), which
+# bumps a generation counter so the next get_catalog() reloads it.
+
+_lock = threading.Lock()
+_generation = 0
+_catalog = None
+
+
+class Catalog:
+    """A snapshot of the vendors and items tables."""
+
+    def __init__(self, generation, vendor_rows, item_rows):
+        self.generation = generation
+        # id -> (id, name, active) / (id, name, item_code, active)
+        self.vendors = {row[0]: row for row in vendor_rows}
+        self.items = {row[0]: row for row in item_rows}
+        self.vendor_ids = {}
+        for vendor_id, name, _active in vendor_rows:
+            self.vendor_ids.setdefault(name, vendor_id)
+        # Item names are not unique; like get_item_id_by_name, the oldest wins
+        self.item_ids = {}
+        for item_id, name, _code, _active in item_rows:
+            self.item_ids.setdefault(name, item_id)
+
+    def vendor_id(self, name):
+        return self.vendor_ids.get(name)
+
+    def item_id(self, name):
+        return self.item_ids.get(name)
+
+    def vendor_name(self, vendor_id):
+        row = self.vendors.get(vendor_id)
+        return row[1] if row else None
+
+    def item_name(self, item_id):
+        row = self.items.get(item_id)
+        return row[1] if row else None
+
+    def active_vendors(self):
+        """[(id, name)] ordered by name, like database.get_all_vendors()."""
+        return sorted(((v[0], v[1]) for v in self.vendors.values() if v[2]), key=lambda v: v[1])
+
+    def active_items(self):
+        """[(id, name, item_code)] ordered by name, like database.get_all_items()."""
+        return sorted(((i[0], i[1], i[2]) for i in self.items.values() if i[3]), key=lambda i: i[1])
+
+
+def invalidate():
+    """Mark the cached catalog stale; call after any write to vendors or items."""
+    global _generation
+    with _lock:
+        _generation += 1
+
+
+def generation():
+    return _generation
+
+
+def get_catalog():
+    """Return the shared catalog, reloading it if a write has happened since."""
+    global _catalog
+    with _lock:
+        if _catalog is not None and _catalog.generation == _generation:
+            return _catalog
+        current = _generation
+    with get_connection() as conn:
+        vendor_rows = conn.execute("SELECT id, name, active FROM vendors ORDER BY id").fetchall()
+        item_rows = conn.execute("SELECT id, name, item_code, active FROM items ORDER BY id").fetchall()
+    catalog = Catalog(current, vendor_rows, item_rows)
+    with _lock:
+        # Keep the newest snapshot if another thread reloaded meanwhile
+        if _catalog is None or _catalog.generation <= current:
+            _catalog = catalog
+    return catalog
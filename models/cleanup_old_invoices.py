@@ -1,58 +1,176 @@
-import sqlite3
-import json
+import threading
+import time
 from datetime import datetime, timedelta
-import os
+from models.connection import get_connection, close_connection
+from models import database
+from models.settings_store import DEFAULT_SETTINGS, get_section, get_store
 
-SETTINGS_PATH = "Data/settings.json"
-DB_PATH = "Data/invoice.db"
+DEFAULT_CLEANUP_SETTINGS = DEFAULT_SETTINGS["cleanup"]
 
 def load_retention_period():
-    with open(SETTINGS_PATH, "r") as f:
-        settings = json.load(f)
-    
-    retention = settings.get("invoice_retention", {})
+    # Never fall back to the default retention: without a settings file, delete nothing
+    if not get_store().exists():
+        raise FileNotFoundError(f"{get_store().path} not found; skipping retention cleanup.")
+    retention = get_section("invoice_retention")
     years = retention.get("years", 0)
     months = retention.get("months", 0)
-    
+
     total_days = (years * 12 + months) * 30
     return timedelta(days=total_days)
 
-def delete_old_invoices():
+def load_cleanup_settings():
+    return get_section("cleanup")
+
+def _delete_in_batches(select_sql, params, batch_size, pause, cancel_event, progress):
+    """
+    Repeatedly select up to `batch_size` invoice ids and delete them in
+    their own short transaction, so the write lock is only held briefly.
+    Line items are removed by ON DELETE CASCADE.
+    Returns (invoices_removed, items_removed, cancelled).
+    """
+    invoices_removed = 0
+    items_removed = 0
+    while True:
+        if cancel_event is not None and cancel_event.is_set():
+            return invoices_removed, items_removed, True
+
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            ids = [row[0] for row in cursor.execute(select_sql, params + (batch_size,)).fetchall()]
+            if not ids:
+                return invoices_removed, items_removed, False
+            placeholders = ",".join("?" * len(ids))
+            # rowcount does not include cascaded rows, so count them first
+            items_removed += cursor.execute(
+                f"SELECT COUNT(*) FROM invoice_items WHERE invoice_id IN ({placeholders})", ids
+            ).fetchone()[0]
+            cursor.execute(f"DELETE FROM invoices WHERE id IN ({placeholders})", ids)
+            invoices_removed += cursor.rowcount
+            conn.commit()
+
+        if progress:
+            progress(invoices_removed, items_removed)
+        if len(ids) < batch_size:
+            return invoices_removed, items_removed, False
+        if pause:
+            time.sleep(pause)
+
+def delete_old_invoices(batch_size=None, pause=None, cancel_event=None, progress=None):
+    """Delete invoices past the retention period. Returns (invoices, items, cancelled)."""
+    settings = load_cleanup_settings()
+    batch_size = batch_size or settings["batch_size"]
+    pause = settings["pause_ms"] / 1000 if pause is None else pause
+
     cutoff_date = (datetime.now() - load_retention_period()).date()  # <-- `.date()` drops time
     cutoff_str = cutoff_date.strftime("%Y-%m-%d")
 
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-
-    # Delete invoice items first
-    cursor.execute('''
-        DELETE FROM invoice_items
-        WHERE invoice_id IN (
-            SELECT id FROM invoices WHERE date < ?
-        )
-    ''', (cutoff_str,))
-
-    # Delete the invoices themselves
-    cursor.execute('''
-        DELETE FROM invoices WHERE date < ?
-    ''', (cutoff_str,))
-
-    conn.commit()
-    conn.close()
-    
-def delete_empty_invoices():
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
+    return _delete_in_batches(
+        "SELECT id FROM invoices WHERE date < ? ORDER BY date LIMIT ?",
+        (cutoff_str,), batch_size, pause, cancel_event, progress
+    )
+
+def delete_empty_invoices(batch_size=None, pause=None, cancel_event=None, progress=None, max_invoice_id=None):
+    """
+    Delete invoices that have no line items. Only ids up to `max_invoice_id`
+    are considered (defaults to the newest invoice when the call starts), so
+    a blank invoice created while cleanup runs in the background is left alone.
+    """
+    settings = load_cleanup_settings()
+    batch_size = batch_size or settings["batch_size"]
+    pause = settings["pause_ms"] / 1000 if pause is None else pause
+    if max_invoice_id is None:
+        with get_connection() as conn:
+            max_invoice_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM invoices").fetchone()[0]
 
     # Delete invoices that have no corresponding items
-    cursor.execute('''
-        DELETE FROM invoices
-        WHERE id NOT IN (
-            SELECT DISTINCT invoice_id FROM invoice_items
-        )
-    ''')
-
-    conn.commit()
-    conn.close()
+    return _delete_in_batches(
+        '''SELECT id FROM invoices
+           WHERE id <= ?
+             AND NOT EXISTS (SELECT 1 FROM invoice_items WHERE invoice_id = invoices.id)
+           LIMIT ?''',
+        (max_invoice_id,), batch_size, pause, cancel_event, progress
+    )
+
+
+class CleanupWorker(threading.Thread):
+    """
+    Runs the retention and empty-invoice cleanup on a background thread.
+    Call cancel() on exit; the current batch finishes and the rest is
+    picked up next time. Progress is kept in `stats` and each run is
+    recorded in the maintenance_log table.
+    """
+
+    def __init__(self, batch_size=None, pause=None):
+        super().__init__(name="invoice-cleanup", daemon=True)
+        self.batch_size = batch_size
+        self.pause = pause
+        self.cancel_event = threading.Event()
+        # Snapshot before the window opens so a new blank invoice is never touched
+        with get_connection() as conn:
+            self.max_invoice_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM invoices").fetchone()[0]
+        self.stats = {
+            "status": "pending",
+            "invoices_removed": 0,
+            "items_removed": 0,
+            "elapsed": 0.0,
+            "error": None
+        }
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def run(self):
+        started_at = datetime.now()
+        started = time.perf_counter()
+        self.stats["status"] = "running"
+        invoices_before = 0
+        items_before = 0
+
+        def progress(invoices, items):
+            self.stats["invoices_removed"] = invoices_before + invoices
+            self.stats["items_removed"] = items_before + items
+            self.stats["elapsed"] = time.perf_counter() - started
+
+        try:
+            invoices, items, cancelled = delete_old_invoices(
+                self.batch_size, self.pause, self.cancel_event, progress
+            )
+            invoices_before += invoices
+            items_before += items
+            if not cancelled:
+                invoices, items, cancelled = delete_empty_invoices(
+                    self.batch_size, self.pause, self.cancel_event, progress, self.max_invoice_id
+                )
+                invoices_before += invoices
+                items_before += items
+            progress(0, 0)
+            self.stats["status"] = "cancelled" if cancelled else "done"
+        except Exception as e:
+            self.stats["status"] = "failed"
+            self.stats["error"] = str(e)
+            print(f"Error during cleanup: {e}")
+        finally:
+            self.stats["elapsed"] = time.perf_counter() - started
+            try:
+                database.record_maintenance_run(
+                    "retention_cleanup",
+                    started_at,
+                    self.stats["elapsed"],
+                    self.stats["status"],
+                    rows_removed=self.stats["invoices_removed"] + self.stats["items_removed"],
+                    details=f"{self.stats['invoices_removed']} invoices, {self.stats['items_removed']} line items"
+                            + (f"; {self.stats['error']}" if self.stats["error"] else "")
+                )
+            except Exception as e:
+                print(f"Could not record cleanup run: {e}")
+            close_connection()
+
+
+def start_background_cleanup():
+    worker = CleanupWorker()
+    worker.start()
+    return worker
+
 if __name__ == "__main__":
-    delete_old_invoices()
+    invoices, items, _ = delete_old_invoices()
+    print(f"Removed {invoices} invoices and {items} line items past retention.")
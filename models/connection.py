@@ -0,0 +1,123 @@
+import atexit
+import sqlite3
+import threading
+from models.settings_store import DEFAULT_SETTINGS, get_section
+
+DB_PATH = "Data/invoice.db"
+DEFAULT_DB_SETTINGS = DEFAULT_SETTINGS["database"]
+
+JOURNAL_MODES = ("DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF")
+SYNCHRONOUS_MODES = ("OFF", "NORMAL", "FULL", "EXTRA")
+
+_local = threading.local()
+_registry_lock = threading.Lock()
+_open_connections = []
+_migrated_paths = set()
+_migration_locks = {}
+
+
+def load_database_settings():
+    return get_section("database")
+
+
+def _connection_factory():
+    from models.query_stats import TimedConnection, load_diagnostics_settings
+    if load_diagnostics_settings()["enabled"]:
+        return TimedConnection
+    return sqlite3.Connection
+
+
+def _configure(conn, settings):
+    journal_mode = str(settings["journal_mode"]).upper()
+    if journal_mode not in JOURNAL_MODES:
+        journal_mode = DEFAULT_DB_SETTINGS["journal_mode"]
+    synchronous = str(settings["synchronous"]).upper()
+    if synchronous not in SYNCHRONOUS_MODES:
+        synchronous = DEFAULT_DB_SETTINGS["synchronous"]
+
+    conn.execute(f"PRAGMA busy_timeout = {int(settings['busy_timeout_ms'])}")
+    conn.execute(f"PRAGMA journal_mode = {journal_mode}")
+    conn.execute(f"PRAGMA synchronous = {synchronous}")
+    # Negative cache_size is in KiB rather than pages
+    conn.execute(f"PRAGMA cache_size = -{int(settings['cache_size_kb'])}")
+    conn.execute(f"PRAGMA mmap_size = {int(settings['mmap_size_mb']) * 1024 * 1024}")
+    conn.execute("PRAGMA foreign_keys = ON")
+
+
+def get_connection(path=None):
+    """
+    Return the calling thread's long-lived connection to `path`
+    (defaults to DB_PATH), opening and tuning it on first use. Pending
+    schema migrations are applied the first time a path is opened.
+    """
+    path = path or DB_PATH
+    connections = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = {}
+
+    conn = connections.get(path)
+    if conn is None:
+        settings = load_database_settings()
+        conn = sqlite3.connect(
+            path,
+            timeout=int(settings["busy_timeout_ms"]) / 1000,
+            check_same_thread=False,
+            factory=_connection_factory()
+        )
+        try:
+            _configure(conn, settings)
+            _migrate_once(path, conn)
+        except Exception:
+            # Not cached, so the next call retries with a fresh connection
+            conn.close()
+            raise
+        connections[path] = conn
+        with _registry_lock:
+            _open_connections.append(conn)
+    return conn
+
+
+def _migrate_once(path, conn):
+    """Bring the schema up to date the first time this process opens `path`."""
+    if path in _migrated_paths:
+        return
+    with _registry_lock:
+        lock = _migration_locks.setdefault(path, threading.Lock())
+    # Other threads opening the same file wait here until the schema is current
+    with lock:
+        if path in _migrated_paths:
+            return
+        from models.migrations import migrate
+        migrate(conn)
+        _migrated_paths.add(path)
+
+
+def close_connection(path=None):
+    """Close the calling thread's connection(s); call when a worker thread finishes."""
+    connections = getattr(_local, "connections", None)
+    if not connections:
+        return
+    paths = [path] if path else list(connections)
+    for p in paths:
+        conn = connections.pop(p, None)
+        if conn is None:
+            continue
+        with _registry_lock:
+            if conn in _open_connections:
+                _open_connections.remove(conn)
+        conn.close()
+
+
+def close_all_connections():
+    with _registry_lock:
+        connections = list(_open_connections)
+        _open_connections.clear()
+    for conn in connections:
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+    _local.connections = {}
+
+
+atexit.register(close_all_connections)
@@ -1,10 +1,7 @@
 import sqlite3
 from datetime import datetime
-
-DB_NAME = "Data/invoice.db"
-
-def get_connection():
-    return sqlite3.connect(DB_NAME)
+from models.connection import get_connection
+from models import catalog
 
 # -------------------
 # Vendor Operations
@@ -15,6 +12,7 @@ def add_vendor(name):
         cursor = conn.cursor()
         cursor.execute("INSERT INTO vendors (name) VALUES (?)", (name,))
         conn.commit()
+    catalog.invalidate()
 
 def get_all_vendors(active_only=True):
     with get_connection() as conn:
@@ -30,6 +28,14 @@ def soft_delete_vendor(vendor_id):
         cursor = conn.cursor()
         cursor.execute("UPDATE vendors SET active = 0 WHERE id = ?", (vendor_id,))
         conn.commit()
+    catalog.invalidate()
+
+def rename_vendor(vendor_id, name):
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("UPDATE vendors SET name = ? WHERE id = ?", (name, vendor_id))
+        conn.commit()
+    catalog.invalidate()
 
 
 # -------------------
@@ -41,12 +47,14 @@ def soft_delete_item(item_id):
         cursor = conn.cursor()
         cursor.execute("UPDATE items SET active = 0 WHERE id = ?", (item_id,))
         conn.commit()
+    catalog.invalidate()
 
 def add_item(name, item_code):
     with get_connection() as conn:
         cursor = conn.cursor()
         cursor.execute("INSERT INTO items (name, item_code) VALUES (?, ?)", (name, item_code))
         conn.commit()
+    catalog.invalidate()
 
 def get_all_items(active_only=True):
     with get_connection() as conn:
@@ -58,12 +66,18 @@ def get_all_items(active_only=True):
         return cursor.fetchall()
     
 def get_item_id_by_name(name):
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT id FROM items WHERE name = ?", (name,))
-    result = cursor.fetchone()
-    conn.close()
-    return result[0] if result else None
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT id FROM items WHERE name = ?", (name,))
+        result = cursor.fetchone()
+        return result[0] if result else None
+
+def rename_item(item_id, name, item_code):
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("UPDATE items SET name = ?, item_code = ? WHERE id = ?", (name, item_code, item_id))
+        conn.commit()
+    catalog.invalidate()
 
 # -------------------
 # Invoice Operations
@@ -75,10 +89,90 @@ def get_all_invoices():
         cursor.execute("SELECT id, date FROM invoices ORDER BY id DESC")
         return cursor.fetchall()
 
+def get_latest_invoice_id():
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT MAX(id) FROM invoices")
+        return cursor.fetchone()[0]
+
+def get_invoices_page(after=None, limit=100, start_date=None, end_date=None, invoice_id=None, vendor_id=None):
+    """
+    One page of (id, date) rows, newest first. Pass the (date, id) of the
+    last row already shown as `after` to get the next page; the keyset
+    comparison lets SQLite seek on idx_invoices_date instead of skipping
+    OFFSET rows. Filters: inclusive YYYY-MM-DD range, exact invoice id and
+    invoices containing at least one line from `vendor_id`.
+    """
+    query = "SELECT id, date FROM invoices WHERE 1 = 1"
+    params = []
+    if after is not None:
+        query += " AND (date, id) < (?, ?)"
+        params.extend(after)
+    if start_date:
+        query += " AND date >= ?"
+        params.append(start_date)
+    if end_date:
+        query += " AND date <= ?"
+        params.append(end_date)
+    if invoice_id is not None:
+        query += " AND id = ?"
+        params.append(invoice_id)
+    if vendor_id is not None:
+        query += " AND EXISTS (SELECT 1 FROM invoice_items WHERE invoice_id = invoices.id AND vendor_id = ?)"
+        params.append(vendor_id)
+    query += " ORDER BY date DESC, id DESC LIMIT ?"
+    params.append(limit)
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        return cursor.fetchall()
+
+def get_invoice_ids(start_date=None, end_date=None):
+    """Invoice ids ordered by date, optionally limited to an inclusive YYYY-MM-DD range."""
+    query = "SELECT id FROM invoices WHERE 1 = 1"
+    params = []
+    if start_date:
+        query += " AND date >= ?"
+        params.append(start_date)
+    if end_date:
+        query += " AND date <= ?"
+        params.append(end_date)
+    query += " ORDER BY date, id"
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        return [row[0] for row in cursor.fetchall()]
+
+def get_invoice_totals(invoice_ids=None, start_date=None, end_date=None):
+    """(id, date, line_count, quantity, total) per invoice, oldest first; invoices with no lines show zeros."""
+    query = '''
+        SELECT inv.id, inv.date, COUNT(ii.id),
+               COALESCE(SUM(ii.quantity), 0),
+               COALESCE(SUM(ii.quantity * ii.unit_price), 0)
+        FROM invoices inv
+        LEFT JOIN invoice_items ii ON ii.invoice_id = inv.id
+        WHERE 1 = 1'''
+    params = []
+    if invoice_ids is not None:
+        invoice_ids = list(invoice_ids)
+        query += f" AND inv.id IN ({','.join('?' * len(invoice_ids))})"
+        params.extend(invoice_ids)
+    if start_date:
+        query += " AND inv.date >= ?"
+        params.append(start_date)
+    if end_date:
+        query += " AND inv.date <= ?"
+        params.append(end_date)
+    query += " GROUP BY inv.id ORDER BY inv.date, inv.id"
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        return cursor.fetchall()
+
 def get_invoice_items(invoice_id):
     with get_connection() as conn:
-        conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
+        cursor.row_factory = sqlite3.Row
         cursor.execute("""
             SELECT ii.id AS invoice_item_id,
                 ii.vendor_id,
@@ -97,53 +191,140 @@ def get_invoice_items(invoice_id):
         """, (invoice_id,))
         return cursor.fetchall()
 
-def update_invoice(invoice_db_id, items, deleted_ids=None):
-    with get_connection() as conn:
-        cursor = conn.cursor()
-
-        # Delete any marked rows
-        if deleted_ids:
-            for item_id in deleted_ids:
-                cursor.execute("DELETE FROM invoice_items WHERE id = ?", (item_id,))
-
-        for item in items:
-            if item.get("existing_id"):
-                # 🔧 UPDATE all relevant fields including vendor_id and item_id
-                cursor.execute(
-                    '''UPDATE invoice_items
-                       SET vendor_id = ?, item_id = ?, quantity = ?, unit_price = ?, optional_info = ?
-                       WHERE id = ?''',
-                    (
-                        item["vendor_id"],
-                        item["item_id"],
-                        item["quantity"],
-                        item["unit_price"],
-                        item.get("optional_info", ""),
-                        item["existing_id"]
-                    )
-                )
-            else:
-                cursor.execute(
-                    '''INSERT INTO invoice_items (invoice_id, vendor_id, item_id, quantity, unit_price, optional_info)
-                       VALUES (?, ?, ?, ?, ?, ?)''',
-                    (
-                        invoice_db_id,
-                        item["vendor_id"],
-                        item["item_id"],
-                        item["quantity"],
-                        item["unit_price"],
-                        item.get("optional_info", "")
-                    )
-                )
+def iter_grouped_invoice_items(invoice_id):
+    """
+    Yield (vendor_name, item) pairs for an invoice, combined by vendor,
+    item code and unit price the same way group_invoice_items does, and
+    ordered by vendor. Rows are streamed from the cursor, not materialized.
+    """
+    cursor = get_connection().cursor()
+    cursor.row_factory = sqlite3.Row
+    cursor.execute("""
+        SELECT g.vendor_name,
+            g.item_code,
+            i.name AS item_name,
+            ii.optional_info,
+            g.quantity,
+            g.unit_price
+        FROM (
+            SELECT v.name AS vendor_name,
+                i.item_code,
+                ii.unit_price,
+                SUM(ii.quantity) AS quantity,
+                MIN(ii.id) AS first_id,
+                MAX(ii.id) AS last_id
+            FROM invoice_items ii
+            JOIN items i ON ii.item_id = i.id
+            JOIN vendors v ON ii.vendor_id = v.id
+            WHERE ii.invoice_id = ?
+            GROUP BY v.name, i.item_code, ii.unit_price
+        ) g
+        JOIN invoice_items ii ON ii.id = g.last_id
+        JOIN items i ON ii.item_id = i.id
+        ORDER BY g.vendor_name, g.first_id
+    """, (invoice_id,))
+    try:
+        for row in cursor:
+            yield row["vendor_name"], row
+    finally:
+        cursor.close()
+
+def update_invoice(invoice_db_id, inserts=None, updates=None, deletes=None):
+    """
+    Apply a changeset to an invoice's line items in one transaction.
+    inserts/updates are lists of row dicts (updates carry "existing_id"),
+    deletes is an iterable of invoice_items ids. Updates and deletes only
+    touch rows that belong to `invoice_db_id`. Returns the ids assigned
+    to `inserts`, in the same order.
+    """
+    inserts = list(inserts or [])
+    updates = list(updates or [])
+    deletes = list(deletes or [])
+
+    with get_connection() as conn:
+        cursor = conn.cursor()
+
+        if deletes:
+            cursor.executemany(
+                "DELETE FROM invoice_items WHERE id = ? AND invoice_id = ?",
+                [(item_id, invoice_db_id) for item_id in deletes]
+            )
+
+        if updates:
+            cursor.executemany(
+                '''UPDATE invoice_items
+                   SET vendor_id = ?, item_id = ?, quantity = ?, unit_price = ?, optional_info = ?
+                   WHERE id = ? AND invoice_id = ?''',
+                [(
+                    item["vendor_id"],
+                    item["item_id"],
+                    item["quantity"],
+                    item["unit_price"],
+                    item.get("optional_info", ""),
+                    item["existing_id"],
+                    invoice_db_id
+                ) for item in updates]
+            )
+
+        new_ids = []
+        if inserts:
+            cursor.executemany(
+                '''INSERT INTO invoice_items (invoice_id, vendor_id, item_id, quantity, unit_price, optional_info)
+                   VALUES (?, ?, ?, ?, ?, ?)''',
+                [(
+                    invoice_db_id,
+                    item["vendor_id"],
+                    item["item_id"],
+                    item["quantity"],
+                    item["unit_price"],
+                    item.get("optional_info", "")
+                ) for item in inserts]
+            )
+            # AUTOINCREMENT ids are handed out consecutively while this
+            # transaction holds the write lock, so the batch ends at last_insert_rowid()
+            last_id = cursor.execute("SELECT last_insert_rowid()").fetchone()[0]
+            new_ids = list(range(last_id - len(inserts) + 1, last_id + 1))
 
         conn.commit()
+        return new_ids
 
 
 
+def get_price_history(vendor_id, item_id):
+    """
+    Unit prices paid for an item from a vendor: {"last", "average", "min",
+    "max", "count"}, or None if it was never bought. "last" is the price
+    on the newest invoice. Both queries are answered from
+    idx_invoice_items_price_history.
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT COUNT(*), AVG(unit_price), MIN(unit_price), MAX(unit_price)
+            FROM invoice_items
+            WHERE vendor_id = ? AND item_id = ?
+        """, (vendor_id, item_id))
+        count, average, low, high = cursor.fetchone()
+        if not count:
+            return None
+        cursor.execute("""
+            SELECT unit_price FROM invoice_items
+            WHERE vendor_id = ? AND item_id = ?
+            ORDER BY invoice_id DESC
+            LIMIT 1
+        """, (vendor_id, item_id))
+        return {
+            "last": cursor.fetchone()[0],
+            "average": average,
+            "min": low,
+            "max": high,
+            "count": count
+        }
+
 def get_invoice_details(invoice_id):
     with get_connection() as conn:
-        conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
+        cursor.row_factory = sqlite3.Row
         cursor.execute("SELECT id, date FROM invoices WHERE id = ?", (invoice_id,))
         row = cursor.fetchone()
         return dict(row) if row else None
@@ -162,6 +343,31 @@ def create_blank_invoice():
 def delete_invoice(invoice_id):
     with get_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute("DELETE FROM invoice_items WHERE invoice_id = ?", (invoice_id,))
+        # Line items go with it through ON DELETE CASCADE
         cursor.execute("DELETE FROM invoices WHERE id = ?", (invoice_id,))
         conn.commit()
+
+
+# -------------------
+# Maintenance Log
+# -------------------
+
+def record_maintenance_run(task, started_at, elapsed_seconds, status, rows_removed=0, details=None):
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            '''INSERT INTO maintenance_log (task, started_at, elapsed_seconds, status, rows_removed, details)
+               VALUES (?, ?, ?, ?, ?, ?)''',
+            (task, started_at.strftime("%Y-%m-%d %H:%M:%S"), elapsed_seconds, status, rows_removed, details)
+        )
+        conn.commit()
+
+def get_maintenance_log(limit=50):
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            '''SELECT task, started_at, elapsed_seconds, status, rows_removed, details
+               FROM maintenance_log ORDER BY id DESC LIMIT ?''',
+            (limit,)
+        )
+        return cursor.fetchall()
@@ -1,5 +1,3 @@
-
-
 from collections import defaultdict
 
 def group_invoice_items(items):
@@ -28,117 +26,226 @@ def group_invoice_items(items):
 from reportlab.lib.pagesizes import LETTER
 from reportlab.pdfgen import canvas
 from reportlab.lib.units import inch
-from collections import defaultdict
+from reportlab.pdfbase.pdfmetrics import stringWidth
 import os
+import time
 
-def generate_pdf_invoice(invoice_id, order_date, invoice_items, filename="invoice_report.pdf"):
+HEADERS = ["Vendor", "Item Code", "Item Name", "Info", "Qty", "Unit $", "Ext. Cost"]
+COL_WIDTHS = [1.2, 0.8, 1.5, 1.5, 0.5, 0.7, 0.8]
+LEFT_MARGIN = 0.5 * inch
+ROW_HEIGHT = 0.2 * inch
+BOTTOM_MARGIN = 1 * inch
+CELL_PADDING = 4
+ELLIPSIS = "..."
+
+BODY_FONT = ("Helvetica", 9)
+BOLD_FONT = ("Helvetica-Bold", 9)
+
+# x position and usable text width of every column, computed once
+COLUMN_X = []
+COLUMN_MAX_WIDTH = []
+_x = LEFT_MARGIN
+for _w in COL_WIDTHS:
+    COLUMN_X.append(_x)
+    COLUMN_MAX_WIDTH.append(_w * inch - CELL_PADDING)
+    _x += _w * inch
+del _x, _w
+
+_FIT_CACHE_LIMIT = 20000
+
+
+class _PageWriter:
+    """Draws table rows onto a canvas, switching fonts and pages only when needed."""
+
+    def __init__(self, c, height):
+        self.c = c
+        self.height = height
+        self.font = None
+        self.pages = 1
+        self._fit_cache = {}
+
+    def set_font(self, name, size):
+        if self.font != (name, size):
+            self.c.setFont(name, size)
+            self.font = (name, size)
+
+    def fit(self, text, col):
+        """Truncate `text` so it does not spill into the next column."""
+        key = (text, col, self.font)
+        cached = self._fit_cache.get(key)
+        if cached is not None:
+            return cached
+        name, size = self.font
+        max_width = COLUMN_MAX_WIDTH[col]
+        fitted = text
+        if stringWidth(text, name, size) > max_width:
+            lo, hi = 0, len(text)
+            while lo < hi:
+                mid = (lo + hi + 1) // 2
+                if stringWidth(text[:mid] + ELLIPSIS, name, size) <= max_width:
+                    lo = mid
+                else:
+                    hi = mid - 1
+            fitted = text[:lo] + ELLIPSIS
+        if len(self._fit_cache) >= _FIT_CACHE_LIMIT:
+            self._fit_cache.clear()
+        self._fit_cache[key] = fitted
+        return fitted
+
+    def table_header(self, y):
+        self.set_font(*BOLD_FONT)
+        for col, h in enumerate(HEADERS):
+            self.c.drawString(COLUMN_X[col], y, h)
+        return y - ROW_HEIGHT
+
+    def ensure_room(self, y):
+        if y < BOTTOM_MARGIN:
+            self.c.showPage()
+            self.font = None
+            self.pages += 1
+            y = self.table_header(self.height - 1 * inch)
+        return y
+
+    def row(self, y, row_data, font=BODY_FONT):
+        y = self.ensure_room(y)
+        self.set_font(*font)
+        for col, val in enumerate(row_data):
+            text = str(val)
+            if text:
+                self.c.drawString(COLUMN_X[col], y, self.fit(text, col))
+        return y - ROW_HEIGHT
+
+
+def iter_grouped_rows(invoice_items):
     """
-    Generate a PDF invoice with subtotals per vendor and grand totals.
-    invoice_items = list of dicts:
-        {
-            "vendor_name": str,
-            "item_id": str or int,
-            "item_name": str,
-            "optional_info": str,
-            "quantity": int,
-            "unit_price": float
-        }
+    Turn a list of raw line item dicts into the (vendor, item) stream that
+    render_invoice_pdf expects: combined by vendor/item code/price, vendors sorted.
+    """
+    grouped = group_invoice_items(invoice_items)
+    for vendor in sorted(grouped.keys()):
+        for item in grouped[vendor]:
+            yield vendor, item
+
+
+def render_invoice_pdf(invoice_id, order_date, grouped_rows, filename="invoice_report.pdf"):
     """
-    c = canvas.Canvas(filename, pagesize=LETTER)
+    Render an invoice from an iterator of (vendor_name, item) pairs that is
+    already grouped and ordered by vendor. Each item is a dict with
+    item_code, item_name, optional_info, quantity and unit_price.
+
+    Rows are drawn as they arrive and each page is flushed into the
+    document on showPage(), so only the current page is held uncompressed.
+    Returns stats: {"path", "rows", "pages", "seconds", "rows_per_second"}.
+    """
+    started = time.perf_counter()
+    c = canvas.Canvas(filename, pagesize=LETTER, pageCompression=1)
     width, height = LETTER
+    writer = _PageWriter(c, height)
 
     # Header
-    c.setFont("Helvetica-Bold", 16)
+    writer.set_font("Helvetica-Bold", 16)
     c.drawString(1 * inch, height - 1 * inch, "Wholesale Invoices - Accounting Report")
 
     # Metadata
-    c.setFont("Helvetica", 10)
+    writer.set_font("Helvetica", 10)
     c.drawString(1 * inch, height - 1.25 * inch, f"Invoice ID: {invoice_id}")
     c.drawString(4 * inch, height - 1.25 * inch, f"Order Date: {order_date}")
 
-    # Table headers
-    headers = ["Vendor", "Item Code", "Item Name", "Info", "Qty", "Unit $", "Ext. Cost"]
-    col_widths = [1.2, 0.8, 1.5, 1.5, 0.5, 0.7, 0.8]
-    y = height - 1.75 * inch
-
-    def draw_table_header(y):
-        c.setFont("Helvetica-Bold", 9)
-        x = 0.5 * inch
-        for i, h in enumerate(headers):
-            c.drawString(x, y, h)
-            x += col_widths[i] * inch
-        return y - 0.2 * inch
-
-    def draw_row(y, row_data, font="Helvetica", size=9):
-        c.setFont(font, size)
-        x = 0.5 * inch
-        for i, val in enumerate(row_data):
-            c.drawString(x, y, str(val))
-            x += col_widths[i] * inch
-        return y - 0.2 * inch
-
-    y = draw_table_header(y)
-
-
-    def group_invoice_items(items):
-        combined = defaultdict(lambda: {
-            "vendor_name": "",
-            "item_code": "",
-            "item_name": "",
-            "optional_info": "",
-            "quantity": 0,
-            "unit_price": 0.0
-        })
-        for item in items:
-            key = (item["vendor_name"], item["item_code"], item["unit_price"])
-            combined[key]["vendor_name"] = item["vendor_name"]
-            combined[key]["item_code"] = item["item_code"]
-            combined[key]["item_name"] = item["item_name"]
-            combined[key]["optional_info"] = item.get("optional_info", "")
-            combined[key]["unit_price"] = item["unit_price"]
-            combined[key]["quantity"] += item["quantity"]
-        grouped = defaultdict(list)
-        for (vendor, _, _), combined_item in combined.items():
-            grouped[vendor].append(combined_item)
-        return grouped
+    y = writer.table_header(height - 1.75 * inch)
 
-    grouped = group_invoice_items(invoice_items)
-    grand_total_qty = 0
-    grand_total_cost = 0
-    for vendor in sorted(grouped.keys()):
-        items = grouped[vendor]
-        subtotal_qty = 0
-        subtotal_cost = 0
-        for item in items:
-            ext_cost = item["quantity"] * item["unit_price"]
-            row = [
-                vendor,
-                item["item_code"],
-                item["item_name"],
-                item["optional_info"],
-                item["quantity"],
-                f"{item['unit_price']:.2f}",
-                f"{ext_cost:.2f}"
-            ]
-            y = draw_row(y, row)
-            subtotal_qty += item["quantity"]
-            subtotal_cost += ext_cost
-            if y < 1 * inch:
-                c.showPage()
-                y = height - 1 * inch
-                y = draw_table_header(y)
-        # Subtotal row
-        y = draw_row(y, ["", "", "", "Subtotal:", subtotal_qty, "", f"{subtotal_cost:.2f}"], font="Helvetica-Bold")
+    def close_vendor(y, subtotal_qty, subtotal_cost):
+        y = writer.row(y, ["", "", "", "Subtotal:", subtotal_qty, "", f"{subtotal_cost:.2f}"], font=BOLD_FONT)
         # Underline to separate vendors
         c.line(0.5 * inch, y + 0.15 * inch, 7.5 * inch, y + 0.15 * inch)
-        y -= 0.2 * inch
-        grand_total_qty += subtotal_qty
-        grand_total_cost += subtotal_cost
-        
+        return y - ROW_HEIGHT
+
+    rows = 0
+    current_vendor = None
+    subtotal_qty = 0
+    subtotal_cost = 0
+    grand_total_qty = 0
+    grand_total_cost = 0
+    for vendor, item in grouped_rows:
+        if vendor != current_vendor:
+            if current_vendor is not None:
+                y = close_vendor(y, subtotal_qty, subtotal_cost)
+            current_vendor = vendor
+            subtotal_qty = 0
+            subtotal_cost = 0
+
+        quantity = item["quantity"]
+        unit_price = item["unit_price"]
+        ext_cost = quantity * unit_price
+        y = writer.row(y, [
+            vendor,
+            item["item_code"],
+            item["item_name"],
+            item["optional_info"] or "",
+            quantity,
+            f"{unit_price:.2f}",
+            f"{ext_cost:.2f}"
+        ])
+        rows += 1
+        subtotal_qty += quantity
+        subtotal_cost += ext_cost
+        grand_total_qty += quantity
+        grand_total_cost += ext_cost
+
+    if current_vendor is not None:
+        y = close_vendor(y, subtotal_qty, subtotal_cost)
+
     # Grand total
-    c.setFont("Helvetica-Bold", 10)
+    y = writer.ensure_room(y)
+    writer.set_font("Helvetica-Bold", 10)
     c.drawString(0.5 * inch, y, f"GRAND TOTAL: ")
     c.line(0.5 * inch, y - 0.05 * inch, 7.5 * inch, y - 0.05 * inch)
     c.drawString(5.5 * inch, y, f"Quantity: {grand_total_qty}  Total: ${grand_total_cost:.2f}")
     c.save()
-    return os.path.abspath(filename)
+
+    elapsed = time.perf_counter() - started
+    return {
+        "path": os.path.abspath(filename),
+        "rows": rows,
+        "pages": writer.pages,
+        "seconds": elapsed,
+        "rows_per_second": rows / elapsed if elapsed > 0 else 0.0
+    }
+
+
+def generate_pdf_invoice(invoice_id, order_date, invoice_items, filename="invoice_report.pdf"):
+    """
+    Generate a PDF invoice with subtotals per vendor and grand totals.
+    invoice_items = list of dicts:
+        {
+            "vendor_name": str,
+            "item_id": str or int,
+            "item_name": str,
+            "optional_info": str,
+            "quantity": int,
+            "unit_price": float
+        }
+    """
+    stats = render_invoice_pdf(invoice_id, order_date, iter_grouped_rows(invoice_items), filename)
+    return stats["path"]
+
+
+if __name__ == "__main__":
+    import argparse
+    from models import database
+
+    parser = argparse.ArgumentParser(description="Render an invoice PDF straight from the database and report throughput.")
+    parser.add_argument("invoice_id", type=int)
+    parser.add_argument("output", nargs="?", default="invoice_report.pdf")
+    args = parser.parse_args()
+
+    details = database.get_invoice_details(args.invoice_id)
+    if details is None:
+        raise SystemExit(f"Invoice {args.invoice_id} does not exist.")
+    stats = render_invoice_pdf(
+        args.invoice_id,
+        details["date"],
+        database.iter_grouped_invoice_items(args.invoice_id),
+        args.output
+    )
+    print(f"{stats['rows']} rows, {stats['pages']} pages in {stats['seconds']:.2f}s "
+          f"({stats['rows_per_second']:.0f} rows/s) -> {stats['path']}")
@@ -0,0 +1,197 @@
+import csv
+import os
+from models import database
+from models.catalog import get_catalog
+
+# Accepted header spellings for each field (compared lowercased, stripped)
+COLUMN_ALIASES = {
+    "vendor": ("vendor", "vendor_name", "vendor name"),
+    "item": ("item", "item_name", "item name", "name"),
+    "item_code": ("item_code", "item code", "code"),
+    "quantity": ("quantity", "qty"),
+    "unit_price": ("unit_price", "unit price", "price", "unit $"),
+    "optional_info": ("optional_info", "optional info", "info", "notes"),
+}
+
+DEFAULT_CHUNK_SIZE = 1000
+MAX_ERRORS_KEPT = 100
+
+
+def _detect_delimiter(path, sample):
+    if os.path.splitext(path)[1].lower() in (".tsv", ".tab"):
+        return "\t"
+    try:
+        return csv.Sniffer().sniff(sample, delimiters=",\t;").delimiter
+    except csv.Error:
+        return ","
+
+
+def _map_columns(header):
+    normalized = [h.strip().lower() for h in header]
+    columns = {}
+    for field, aliases in COLUMN_ALIASES.items():
+        for index, name in enumerate(normalized):
+            if name in aliases:
+                columns[field] = index
+                break
+    if "vendor" not in columns:
+        raise ValueError("Import file needs a 'vendor' column.")
+    if "item" not in columns and "item_code" not in columns:
+        raise ValueError("Import file needs an 'item' or 'item_code' column.")
+    if "quantity" not in columns:
+        raise ValueError("Import file needs a 'quantity' column.")
+    return columns
+
+
+def load_lookup_maps(active=True):
+    """
+    Build lowercased name/code -> id maps for vendors and items from the
+    shared catalog. Only active (not removed) rows by default, matching
+    what the editor's dropdowns offer; active=False maps the removed ones.
+    """
+    catalog = get_catalog()
+    vendors = {}
+    for vendor_id, name, is_active in catalog.vendors.values():
+        if bool(is_active) == active:
+            vendors.setdefault(name.strip().lower(), vendor_id)
+    items_by_name = {}
+    items_by_code = {}
+    for item_id, name, item_code, is_active in catalog.items.values():
+        if bool(is_active) != active:
+            continue
+        items_by_name.setdefault(name.strip().lower(), item_id)
+        if item_code:
+            items_by_code.setdefault(item_code.strip().lower(), item_id)
+    return vendors, items_by_name, items_by_code
+
+
+def _parse_number(text, cast):
+    return cast(text.replace("$", "").replace(",", "").strip())
+
+
+def _cell(row, columns, field):
+    index = columns.get(field)
+    if index is None or index >= len(row):
+        return ""
+    return row[index].strip()
+
+
+def import_line_items(invoice_id, path, chunk_size=DEFAULT_CHUNK_SIZE, error_path=None, default_unit_price=0.0):
+    """
+    Stream a CSV/TSV file into invoice_items for `invoice_id`.
+
+    Rows are resolved against in-memory vendor/item maps and inserted in
+    chunks of `chunk_size`, one transaction per chunk. Rejected rows are
+    written to `error_path` (if given) with the line number and reason;
+    only the first MAX_ERRORS_KEPT are kept in the returned report.
+    """
+    if database.get_invoice_details(invoice_id) is None:
+        raise ValueError(f"Invoice {invoice_id} does not exist.")
+    vendors, items_by_name, items_by_code = load_lookup_maps()
+    removed_vendors, removed_items_by_name, removed_items_by_code = load_lookup_maps(active=False)
+    report = {
+        "rows_read": 0,
+        "rows_imported": 0,
+        "rows_rejected": 0,
+        "errors": [],
+        "error_path": error_path
+    }
+
+    error_file = open(error_path, "w", newline="", encoding="utf-8") if error_path else None
+    error_writer = csv.writer(error_file) if error_file else None
+    if error_writer:
+        error_writer.writerow(["line", "reason", "row"])
+
+    def reject(line_no, reason, row):
+        report["rows_rejected"] += 1
+        if len(report["errors"]) < MAX_ERRORS_KEPT:
+            report["errors"].append((line_no, reason, row))
+        if error_writer:
+            error_writer.writerow([line_no, reason] + row)
+
+    try:
+        with open(path, "r", newline="", encoding="utf-8-sig") as f:
+            delimiter = _detect_delimiter(path, f.read(4096))
+            f.seek(0)
+            reader = csv.reader(f, delimiter=delimiter)
+            header = next(reader, None)
+            if header is None:
+                return report
+            columns = _map_columns(header)
+
+            chunk = []
+            for row in reader:
+                line_no = reader.line_num
+                if not any(cell.strip() for cell in row):
+                    continue
+                report["rows_read"] += 1
+
+                vendor_name = _cell(row, columns, "vendor")
+                vendor_id = vendors.get(vendor_name.lower())
+                if vendor_id is None:
+                    if vendor_name.lower() in removed_vendors:
+                        reject(line_no, f"Vendor '{vendor_name}' has been removed", row)
+                    else:
+                        reject(line_no, f"Unknown vendor '{vendor_name}'", row)
+                    continue
+
+                item_name = _cell(row, columns, "item")
+                item_code = _cell(row, columns, "item_code")
+                item_id = items_by_name.get(item_name.lower()) if item_name else None
+                if item_id is None and item_code:
+                    item_id = items_by_code.get(item_code.lower())
+                if item_id is None:
+                    removed = item_name.lower() in removed_items_by_name if item_name else False
+                    if removed or (item_code and item_code.lower() in removed_items_by_code):
+                        reject(line_no, f"Item '{item_name or item_code}' has been removed", row)
+                    else:
+                        reject(line_no, f"Unknown item '{item_name or item_code}'", row)
+                    continue
+
+                try:
+                    quantity = _parse_number(_cell(row, columns, "quantity"), int)
+                    price_text = _cell(row, columns, "unit_price")
+                    unit_price = _parse_number(price_text, float) if price_text else default_unit_price
+                except ValueError:
+                    reject(line_no, "Invalid quantity or unit price", row)
+                    continue
+                if quantity < 0 or unit_price < 0:
+                    reject(line_no, "Negative quantity or unit price", row)
+                    continue
+
+                chunk.append({
+                    "vendor_id": vendor_id,
+                    "item_id": item_id,
+                    "quantity": quantity,
+                    "unit_price": unit_price,
+                    "optional_info": _cell(row, columns, "optional_info")
+                })
+                if len(chunk) >= chunk_size:
+                    database.update_invoice(invoice_id, inserts=chunk)
+                    report["rows_imported"] += len(chunk)
+                    chunk = []
+
+            if chunk:
+                database.update_invoice(invoice_id, inserts=chunk)
+                report["rows_imported"] += len(chunk)
+    finally:
+        if error_file:
+            error_file.close()
+
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Import invoice line items from a CSV/TSV file.")
+    parser.add_argument("invoice_id", type=int)
+    parser.add_argument("path")
+    parser.add_argument("--errors", help="write rejected rows to this CSV file")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    result = import_line_items(args.invoice_id, args.path, chunk_size=args.chunk_size, error_path=args.errors)
+    print(f"Read {result['rows_read']} rows, imported {result['rows_imported']}, rejected {result['rows_rejected']}.")
+    for line_no, reason, _ in result["errors"][:20]:
+        print(f"  line {line_no}: {reason}")
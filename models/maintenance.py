@@ -0,0 +1,163 @@
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from models import connection
+from models.connection import get_connection, close_connection
+from models import database
+from models.settings_store import DEFAULT_SETTINGS, get_section
+
+TASK_NAME = "database_maintenance"
+
+DEFAULT_MAINTENANCE_SETTINGS = DEFAULT_SETTINGS["maintenance"]
+
+# sqlite auto_vacuum values
+AUTO_VACUUM_INCREMENTAL = 2
+
+
+def load_maintenance_settings():
+    return get_section("maintenance")
+
+
+def _database_size(path):
+    size = 0
+    for suffix in ("", "-wal"):
+        try:
+            size += os.path.getsize(path + suffix)
+        except OSError:
+            pass
+    return size
+
+
+def run_maintenance(vacuum_pages=None):
+    """
+    Refresh planner statistics and give free pages back to the filesystem.
+
+    The first run switches the file to incremental auto-vacuum, which
+    needs one full VACUUM; later runs only release up to `vacuum_pages`
+    free pages. Returns a summary dict and records it in maintenance_log.
+    """
+    path = connection.DB_PATH
+    if vacuum_pages is None:
+        vacuum_pages = load_maintenance_settings()["vacuum_pages"]
+
+    started_at = datetime.now()
+    started = time.perf_counter()
+    conn = get_connection()
+    conn.commit()
+
+    size_before = _database_size(path)
+    free_before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    steps = []
+
+    has_stats = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'"
+    ).fetchone()
+    if has_stats:
+        conn.execute("PRAGMA optimize").fetchall()
+        steps.append("optimize")
+    else:
+        conn.execute("ANALYZE")
+        steps.append("analyze")
+
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != AUTO_VACUUM_INCREMENTAL:
+        conn.execute(f"PRAGMA auto_vacuum = {AUTO_VACUUM_INCREMENTAL}")
+        conn.execute("VACUUM")
+        steps.append("vacuum")
+    elif free_before:
+        # execute() stops after the first freed page; executescript runs it to completion
+        conn.executescript(f"PRAGMA incremental_vacuum({int(vacuum_pages)});")
+        steps.append("incremental_vacuum")
+    conn.commit()
+
+    if conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal":
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    free_after = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    size_after = _database_size(path)
+    elapsed = time.perf_counter() - started
+    summary = {
+        "steps": steps,
+        "size_before": size_before,
+        "size_after": size_after,
+        "free_pages_before": free_before,
+        "free_pages_after": free_after,
+        "elapsed": elapsed
+    }
+    database.record_maintenance_run(
+        TASK_NAME,
+        started_at,
+        elapsed,
+        "done",
+        details=f"{', '.join(steps)}; size {size_before} -> {size_after} bytes; "
+                f"free pages {free_before} -> {free_after}"
+    )
+    return summary
+
+
+def last_maintenance_time():
+    with get_connection() as conn:
+        row = conn.execute(
+            "SELECT MAX(started_at) FROM maintenance_log WHERE task = ? AND status = 'done'",
+            (TASK_NAME,)
+        ).fetchone()
+    return datetime.strptime(row[0], "%Y-%m-%d %H:%M:%S") if row and row[0] else None
+
+
+class MaintenanceScheduler(threading.Thread):
+    """
+    Background thread that runs run_maintenance() once per interval, but
+    only after the app has been idle for `idle_seconds`. The UI reports
+    activity through note_activity().
+    """
+
+    def __init__(self, interval_hours=None, idle_seconds=None, vacuum_pages=None, poll_seconds=15):
+        super().__init__(name="db-maintenance", daemon=True)
+        settings = load_maintenance_settings()
+        self.interval = timedelta(hours=interval_hours if interval_hours is not None else settings["interval_hours"])
+        self.idle_seconds = idle_seconds if idle_seconds is not None else settings["idle_seconds"]
+        self.vacuum_pages = vacuum_pages if vacuum_pages is not None else settings["vacuum_pages"]
+        self.poll_seconds = poll_seconds
+        self.last_activity = time.monotonic()
+        self.last_summary = None
+        self._stop_event = threading.Event()
+
+    def note_activity(self, event=None):
+        self.last_activity = time.monotonic()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def is_due(self):
+        last_run = last_maintenance_time()
+        return last_run is None or datetime.now() - last_run >= self.interval
+
+    def run(self):
+        try:
+            while not self._stop_event.wait(self.poll_seconds):
+                if time.monotonic() - self.last_activity < self.idle_seconds:
+                    continue
+                try:
+                    if self.is_due():
+                        self.last_summary = run_maintenance(self.vacuum_pages)
+                except Exception as e:
+                    print(f"Error during database maintenance: {e}")
+                    self._stop_event.wait(self.poll_seconds * 20)
+        finally:
+            close_connection()
+
+
+def start_maintenance_scheduler():
+    """Start the scheduler unless maintenance is turned off in settings."""
+    if not load_maintenance_settings().get("enabled", True):
+        return None
+    scheduler = MaintenanceScheduler()
+    scheduler.start()
+    return scheduler
+
+
+if __name__ == "__main__":
+    result = run_maintenance()
+    print(f"Ran {', '.join(result['steps'])} in {result['elapsed']:.2f}s; "
+          f"size {result['size_before']} -> {result['size_after']} bytes, "
+          f"free pages {result['free_pages_before']} -> {result['free_pages_after']}")
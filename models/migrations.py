@@ -0,0 +1,364 @@
+from datetime import datetime
+from models.connection import get_connection
+
+# -------------------
+# Migration Steps
+# -------------------
+# Each entry is (version, description, statements). Steps are applied in
+# order, each inside its own transaction, and recorded in schema_version.
+# Never edit a released step; append a new one instead.
+
+MIGRATIONS = [
+    (1, "baseline schema", [
+        '''CREATE TABLE IF NOT EXISTS vendors (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL UNIQUE,
+            active INTEGER NOT NULL DEFAULT 1
+        )''',
+        '''CREATE TABLE IF NOT EXISTS items (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            item_code TEXT NOT NULL,
+            active INTEGER NOT NULL DEFAULT 1
+        )''',
+        '''CREATE TABLE IF NOT EXISTS invoices (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            date TEXT NOT NULL
+        )''',
+        '''CREATE TABLE IF NOT EXISTS invoice_items (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            invoice_id INTEGER NOT NULL,
+            vendor_id INTEGER NOT NULL,
+            item_id INTEGER NOT NULL,
+            quantity INTEGER NOT NULL,
+            unit_price REAL NOT NULL,
+            optional_info TEXT,
+            FOREIGN KEY(invoice_id) REFERENCES invoices(id),
+            FOREIGN KEY(vendor_id) REFERENCES vendors(id),
+            FOREIGN KEY(item_id) REFERENCES items(id)
+        )''',
+    ]),
+    (2, "indexes for line item, retention and item name lookups", [
+        "CREATE INDEX IF NOT EXISTS idx_invoice_items_invoice_id ON invoice_items(invoice_id)",
+        "CREATE INDEX IF NOT EXISTS idx_invoice_items_vendor_id ON invoice_items(vendor_id)",
+        "CREATE INDEX IF NOT EXISTS idx_invoice_items_item_id ON invoice_items(item_id)",
+        "CREATE INDEX IF NOT EXISTS idx_invoices_date ON invoices(date)",
+        "CREATE INDEX IF NOT EXISTS idx_items_name ON items(name)",
+    ]),
+    (3, "maintenance log", [
+        '''CREATE TABLE IF NOT EXISTS maintenance_log (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            task TEXT NOT NULL,
+            started_at TEXT NOT NULL,
+            elapsed_seconds REAL NOT NULL,
+            status TEXT NOT NULL,
+            rows_removed INTEGER NOT NULL DEFAULT 0,
+            details TEXT
+        )''',
+    ]),
+    (4, "cascade line item deletes from invoices", [
+        # SQLite cannot alter a foreign key, so rebuild invoice_items
+        '''CREATE TABLE invoice_items_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            invoice_id INTEGER NOT NULL,
+            vendor_id INTEGER NOT NULL,
+            item_id INTEGER NOT NULL,
+            quantity INTEGER NOT NULL,
+            unit_price REAL NOT NULL,
+            optional_info TEXT,
+            FOREIGN KEY(invoice_id) REFERENCES invoices(id) ON DELETE CASCADE,
+            FOREIGN KEY(vendor_id) REFERENCES vendors(id),
+            FOREIGN KEY(item_id) REFERENCES items(id)
+        )''',
+        '''INSERT INTO invoice_items_new (id, invoice_id, vendor_id, item_id, quantity, unit_price, optional_info)
+           SELECT id, invoice_id, vendor_id, item_id, quantity, unit_price, optional_info FROM invoice_items''',
+        # Keep the AUTOINCREMENT high-water mark so deleted ids are never reused
+        '''UPDATE sqlite_sequence
+           SET seq = (SELECT seq FROM sqlite_sequence WHERE name = 'invoice_items')
+           WHERE name = 'invoice_items_new'
+             AND (SELECT seq FROM sqlite_sequence WHERE name = 'invoice_items') > seq''',
+        "DROP TABLE invoice_items",
+        "ALTER TABLE invoice_items_new RENAME TO invoice_items",
+        "CREATE INDEX IF NOT EXISTS idx_invoice_items_invoice_id ON invoice_items(invoice_id)",
+        "CREATE INDEX IF NOT EXISTS idx_invoice_items_vendor_id ON invoice_items(vendor_id)",
+        "CREATE INDEX IF NOT EXISTS idx_invoice_items_item_id ON invoice_items(item_id)",
+    ]),
+    (5, "full-text search over items, vendors and line item notes", [
+        # External-content tables: the text stays in the base tables and the
+        # triggers below keep each index in step with every write.
+        '''CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5(
+            name, item_code, content='items', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        )''',
+        '''CREATE VIRTUAL TABLE IF NOT EXISTS vendors_fts USING fts5(
+            name, content='vendors', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        )''',
+        '''CREATE VIRTUAL TABLE IF NOT EXISTS invoice_items_fts USING fts5(
+            optional_info, content='invoice_items', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        )''',
+        '''CREATE TRIGGER IF NOT EXISTS items_fts_insert AFTER INSERT ON items BEGIN
+            INSERT INTO items_fts (rowid, name, item_code) VALUES (new.id, new.name, new.item_code);
+        END''',
+        '''CREATE TRIGGER IF NOT EXISTS items_fts_delete AFTER DELETE ON items BEGIN
+            INSERT INTO items_fts (items_fts, rowid, name, item_code) VALUES ('delete', old.id, old.name, old.item_code);
+        END''',
+        '''CREATE TRIGGER IF NOT EXISTS items_fts_update AFTER UPDATE OF name, item_code ON items BEGIN
+            INSERT INTO items_fts (items_fts, rowid, name, item_code) VALUES ('delete', old.id, old.name, old.item_code);
+            INSERT INTO items_fts (rowid, name, item_code) VALUES (new.id, new.name, new.item_code);
+        END''',
+        '''CREATE TRIGGER IF NOT EXISTS vendors_fts_insert AFTER INSERT ON vendors BEGIN
+            INSERT INTO vendors_fts (rowid, name) VALUES (new.id, new.name);
+        END''',
+        '''CREATE TRIGGER IF NOT EXISTS vendors_fts_delete AFTER DELETE ON vendors BEGIN
+            INSERT INTO vendors_fts (vendors_fts, rowid, name) VALUES ('delete', old.id, old.name);
+        END''',
+        '''CREATE TRIGGER IF NOT EXISTS vendors_fts_update AFTER UPDATE OF name ON vendors BEGIN
+            INSERT INTO vendors_fts (vendors_fts, rowid, name) VALUES ('delete', old.id, old.name);
+            INSERT INTO vendors_fts (rowid, name) VALUES (new.id, new.name);
+        END''',
+        # Also fires for line items removed by ON DELETE CASCADE
+        '''CREATE TRIGGER IF NOT EXISTS invoice_items_fts_insert AFTER INSERT ON invoice_items BEGIN
+            INSERT INTO invoice_items_fts (rowid, optional_info) VALUES (new.id, new.optional_info);
+        END''',
+        '''CREATE TRIGGER IF NOT EXISTS invoice_items_fts_delete AFTER DELETE ON invoice_items BEGIN
+            INSERT INTO invoice_items_fts (invoice_items_fts, rowid, optional_info) VALUES ('delete', old.id, old.optional_info);
+        END''',
+        '''CREATE TRIGGER IF NOT EXISTS invoice_items_fts_update AFTER UPDATE OF optional_info ON invoice_items BEGIN
+            INSERT INTO invoice_items_fts (invoice_items_fts, rowid, optional_info) VALUES ('delete', old.id, old.optional_info);
+            INSERT INTO invoice_items_fts (rowid, optional_info) VALUES (new.id, new.optional_info);
+        END''',
+        "INSERT INTO items_fts (items_fts) VALUES ('rebuild')",
+        "INSERT INTO vendors_fts (vendors_fts) VALUES ('rebuild')",
+        "INSERT INTO invoice_items_fts (invoice_items_fts) VALUES ('rebuild')",
+    ]),
+    (6, "spend summary for reporting", [
+        '''CREATE TABLE IF NOT EXISTS spend_summary (
+            month TEXT NOT NULL,
+            vendor_id INTEGER NOT NULL,
+            item_id INTEGER NOT NULL,
+            quantity INTEGER NOT NULL DEFAULT 0,
+            spend REAL NOT NULL DEFAULT 0,
+            line_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (month, vendor_id, item_id)
+        ) WITHOUT ROWID''',
+        '''CREATE TRIGGER IF NOT EXISTS spend_summary_insert AFTER INSERT ON invoice_items BEGIN
+            INSERT INTO spend_summary (month, vendor_id, item_id, quantity, spend, line_count)
+            SELECT substr(date, 1, 7), new.vendor_id, new.item_id, new.quantity, new.quantity * new.unit_price, 1
+            FROM invoices WHERE id = new.invoice_id
+            ON CONFLICT (month, vendor_id, item_id) DO UPDATE SET
+                quantity = quantity + excluded.quantity,
+                spend = spend + excluded.spend,
+                line_count = line_count + 1;
+        END''',
+        # During ON DELETE CASCADE the invoice row is already gone, so the
+        # month lookup finds nothing and this is a no-op; the BEFORE DELETE
+        # trigger on invoices below has already subtracted those lines.
+        '''CREATE TRIGGER IF NOT EXISTS spend_summary_delete AFTER DELETE ON invoice_items BEGIN
+            UPDATE spend_summary SET
+                quantity = quantity - old.quantity,
+                spend = spend - old.quantity * old.unit_price,
+                line_count = line_count - 1
+            WHERE month = (SELECT substr(date, 1, 7) FROM invoices WHERE id = old.invoice_id)
+              AND vendor_id = old.vendor_id AND item_id = old.item_id;
+            DELETE FROM spend_summary
+            WHERE month = (SELECT substr(date, 1, 7) FROM invoices WHERE id = old.invoice_id)
+              AND vendor_id = old.vendor_id AND item_id = old.item_id AND line_count <= 0;
+        END''',
+        '''CREATE TRIGGER IF NOT EXISTS spend_summary_update
+        AFTER UPDATE OF invoice_id, vendor_id, item_id, quantity, unit_price ON invoice_items BEGIN
+            UPDATE spend_summary SET
+                quantity = quantity - old.quantity,
+                spend = spend - old.quantity * old.unit_price,
+                line_count = line_count - 1
+            WHERE month = (SELECT substr(date, 1, 7) FROM invoices WHERE id = old.invoice_id)
+              AND vendor_id = old.vendor_id AND item_id = old.item_id;
+            DELETE FROM spend_summary
+            WHERE month = (SELECT substr(date, 1, 7) FROM invoices WHERE id = old.invoice_id)
+              AND vendor_id = old.vendor_id AND item_id = old.item_id AND line_count <= 0;
+            INSERT INTO spend_summary (month, vendor_id, item_id, quantity, spend, line_count)
+            SELECT substr(date, 1, 7), new.vendor_id, new.item_id, new.quantity, new.quantity * new.unit_price, 1
+            FROM invoices WHERE id = new.invoice_id
+            ON CONFLICT (month, vendor_id, item_id) DO UPDATE SET
+                quantity = quantity + excluded.quantity,
+                spend = spend + excluded.spend,
+                line_count = line_count + 1;
+        END''',
+        '''CREATE TRIGGER IF NOT EXISTS spend_summary_invoice_delete BEFORE DELETE ON invoices BEGIN
+            UPDATE spend_summary SET
+                quantity = quantity - (SELECT SUM(quantity) FROM invoice_items
+                                       WHERE invoice_id = old.id AND vendor_id = spend_summary.vendor_id
+                                         AND item_id = spend_summary.item_id),
+                spend = spend - (SELECT SUM(quantity * unit_price) FROM invoice_items
+                                 WHERE invoice_id = old.id AND vendor_id = spend_summary.vendor_id
+                                   AND item_id = spend_summary.item_id),
+                line_count = line_count - (SELECT COUNT(*) FROM invoice_items
+                                           WHERE invoice_id = old.id AND vendor_id = spend_summary.vendor_id
+                                             AND item_id = spend_summary.item_id)
+            WHERE month = substr(old.date, 1, 7)
+              AND (vendor_id, item_id) IN (SELECT vendor_id, item_id FROM invoice_items WHERE invoice_id = old.id);
+            DELETE FROM spend_summary WHERE month = substr(old.date, 1, 7) AND line_count <= 0;
+        END''',
+        # Moving an invoice to another month moves its lines with it
+        '''CREATE TRIGGER IF NOT EXISTS spend_summary_invoice_date AFTER UPDATE OF date ON invoices
+        WHEN substr(old.date, 1, 7) != substr(new.date, 1, 7) BEGIN
+            UPDATE spend_summary SET
+                quantity = quantity - (SELECT SUM(quantity) FROM invoice_items
+                                       WHERE invoice_id = old.id AND vendor_id = spend_summary.vendor_id
+                                         AND item_id = spend_summary.item_id),
+                spend = spend - (SELECT SUM(quantity * unit_price) FROM invoice_items
+                                 WHERE invoice_id = old.id AND vendor_id = spend_summary.vendor_id
+                                   AND item_id = spend_summary.item_id),
+                line_count = line_count - (SELECT COUNT(*) FROM invoice_items
+                                           WHERE invoice_id = old.id AND vendor_id = spend_summary.vendor_id
+                                             AND item_id = spend_summary.item_id)
+            WHERE month = substr(old.date, 1, 7)
+              AND (vendor_id, item_id) IN (SELECT vendor_id, item_id FROM invoice_items WHERE invoice_id = old.id);
+            DELETE FROM spend_summary WHERE month = substr(old.date, 1, 7) AND line_count <= 0;
+            INSERT INTO spend_summary (month, vendor_id, item_id, quantity, spend, line_count)
+            SELECT substr(new.date, 1, 7), vendor_id, item_id, SUM(quantity), SUM(quantity * unit_price), COUNT(*)
+            FROM invoice_items WHERE invoice_id = new.id
+            GROUP BY vendor_id, item_id
+            ON CONFLICT (month, vendor_id, item_id) DO UPDATE SET
+                quantity = quantity + excluded.quantity,
+                spend = spend + excluded.spend,
+                line_count = line_count + excluded.line_count;
+        END''',
+        '''INSERT INTO spend_summary (month, vendor_id, item_id, quantity, spend, line_count)
+           SELECT substr(inv.date, 1, 7), ii.vendor_id, ii.item_id,
+                  SUM(ii.quantity), SUM(ii.quantity * ii.unit_price), COUNT(*)
+           FROM invoice_items ii
+           JOIN invoices inv ON inv.id = ii.invoice_id
+           GROUP BY 1, 2, 3''',
+    ]),
+    (7, "covering index for vendor/item price history", [
+        # Answers last/avg/min/max unit_price for a pair from the index alone;
+        # it also serves every lookup idx_invoice_items_vendor_id did.
+        "CREATE INDEX IF NOT EXISTS idx_invoice_items_price_history ON invoice_items(vendor_id, item_id, invoice_id, unit_price)",
+        "DROP INDEX IF EXISTS idx_invoice_items_vendor_id",
+    ]),
+]
+
+# Queries on hot paths and the index each one is expected to use.
+HOT_QUERIES = {
+    "get_invoice_items": (
+        '''SELECT ii.id, ii.vendor_id, ii.item_id, ii.quantity, ii.unit_price, ii.optional_info
+           FROM invoice_items ii
+           JOIN items i ON ii.item_id = i.id
+           JOIN vendors v ON ii.vendor_id = v.id
+           WHERE ii.invoice_id = ?''',
+        (0,),
+        "idx_invoice_items_invoice_id"
+    ),
+    "delete_invoice_items": (
+        "SELECT id FROM invoice_items WHERE invoice_id = ?",
+        (0,),
+        "idx_invoice_items_invoice_id"
+    ),
+    "old_invoices": (
+        "SELECT id FROM invoices WHERE date < ?",
+        ("1970-01-01",),
+        "idx_invoices_date"
+    ),
+    "empty_invoices": (
+        "SELECT id FROM invoices WHERE id <= ? AND NOT EXISTS (SELECT 1 FROM invoice_items WHERE invoice_id = invoices.id)",
+        (0,),
+        "idx_invoice_items_invoice_id"
+    ),
+    "price_history": (
+        "SELECT COUNT(*), AVG(unit_price), MIN(unit_price), MAX(unit_price) FROM invoice_items WHERE vendor_id = ? AND item_id = ?",
+        (0, 0),
+        "idx_invoice_items_price_history"
+    ),
+    "last_price": (
+        "SELECT unit_price FROM invoice_items WHERE vendor_id = ? AND item_id = ? ORDER BY invoice_id DESC LIMIT 1",
+        (0, 0),
+        "idx_invoice_items_price_history"
+    ),
+    "get_item_id_by_name": (
+        "SELECT id FROM items WHERE name = ?",
+        ("",),
+        "idx_items_name"
+    ),
+}
+
+
+def _ensure_version_table(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT NOT NULL,
+            applied_at TEXT NOT NULL
+        )
+    ''')
+
+
+def get_schema_version(conn=None):
+    conn = conn or get_connection()
+    _ensure_version_table(conn)
+    conn.commit()
+    row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    return row[0] or 0
+
+
+def migrate(conn=None):
+    """Apply every pending migration step. Returns the versions applied."""
+    conn = conn or get_connection()
+    current = get_schema_version(conn)
+    if current >= MIGRATIONS[-1][0]:
+        return []
+
+    # Table rebuilds must not trigger cascades or FK checks mid-copy;
+    # this pragma is a no-op inside a transaction, so set it first.
+    foreign_keys = conn.execute("PRAGMA foreign_keys").fetchone()[0]
+    conn.execute("PRAGMA foreign_keys = OFF")
+    applied = []
+    for version, description, statements in MIGRATIONS:
+        if version <= current:
+            continue
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            # Another process may have applied this step while we waited for the lock
+            done = conn.execute("SELECT 1 FROM schema_version WHERE version = ?", (version,)).fetchone()
+            if not done:
+                for statement in statements:
+                    conn.execute(statement)
+                conn.execute(
+                    "INSERT INTO schema_version (version, description, applied_at) VALUES (?, ?, ?)",
+                    (version, description, datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+                )
+                applied.append(version)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            conn.execute(f"PRAGMA foreign_keys = {foreign_keys}")
+            raise
+    conn.execute(f"PRAGMA foreign_keys = {foreign_keys}")
+    return applied
+
+
+def explain_query_plan(sql, params=(), conn=None):
+    conn = conn or get_connection()
+    rows = conn.execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()
+    return [row[3] for row in rows]
+
+
+def check_hot_query_plans(conn=None):
+    """
+    Run EXPLAIN QUERY PLAN over HOT_QUERIES and report whether each one
+    uses its expected index: {name: (uses_index, [plan lines])}.
+    """
+    conn = conn or get_connection()
+    results = {}
+    for name, (sql, params, index_name) in HOT_QUERIES.items():
+        plan = explain_query_plan(sql, params, conn)
+        results[name] = (any(index_name in line for line in plan), plan)
+    return results
+
+
+if __name__ == "__main__":
+    print(f"Applied migrations: {migrate() or 'none'}")
+    print(f"Schema version: {get_schema_version()}")
+    for name, (ok, plan) in check_hot_query_plans().items():
+        print(f"{'OK  ' if ok else 'SCAN'} {name}: {' | '.join(plan)}")
@@ -0,0 +1,268 @@
+import hashlib
+import os
+import re
+import sqlite3
+import tempfile
+import time
+import zlib
+from contextlib import closing
+from datetime import datetime, timedelta
+from models.settings_store import DEFAULT_SETTINGS, get_section
+
+DEFAULT_ARCHIVE_SETTINGS = DEFAULT_SETTINGS["pdf_archive"]
+
+# Re-exporting an invoice only changes these fields, so they are left out of
+# the content hash and such re-exports share one stored copy.
+_VOLATILE_FIELDS = re.compile(
+    rb"/(?:CreationDate|ModDate)\s*\(D:[^)]*\)|/ID\s*\[\s*<[0-9A-Fa-f]*>\s*<[0-9A-Fa-f]*>\s*\]"
+)
+
+
+def load_archive_settings():
+    return get_section("pdf_archive")
+
+
+def content_hash(data):
+    return hashlib.sha256(_VOLATILE_FIELDS.sub(b"", data)).hexdigest()
+
+
+def filename_pattern(filename_format):
+    """Regex that pulls the invoice id and date back out of an export filename."""
+    pattern = re.escape(filename_format)
+    pattern = pattern.replace(re.escape("{id}"), r"(?P<id>\d+)", 1)
+    pattern = pattern.replace(re.escape("{date}"), r"(?P<date>\d{8})", 1)
+    pattern = re.sub(r"\\\{\w+\\\}", ".*?", pattern)
+    return re.compile(pattern + r"\.pdf$", re.IGNORECASE)
+
+
+def parse_invoice_filename(name, filename_format):
+    """Returns (invoice_id, "YYYY-MM-DD") from an export filename; None where unknown."""
+    match = filename_pattern(filename_format).match(name)
+    if not match:
+        return None, None
+    groups = match.groupdict()
+    invoice_id = int(groups["id"]) if groups.get("id") else None
+    invoice_date = None
+    if groups.get("date"):
+        try:
+            invoice_date = datetime.strptime(groups["date"], "%Y%m%d").strftime("%Y-%m-%d")
+        except ValueError:
+            pass
+    return invoice_id, invoice_date
+
+
+class PdfArchive:
+    """
+    A single SQLite file holding zlib-compressed PDFs, stored once per
+    content hash. Each archived filename points at its blob along with the
+    invoice id and date parsed from the name.
+    """
+
+    def __init__(self, path=None, compression_level=None):
+        settings = load_archive_settings()
+        self.path = path or settings["path"]
+        self.compression_level = compression_level if compression_level is not None else settings["compression_level"]
+        self.archive_after_days = settings["archive_after_days"]
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS blobs (
+                    hash TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    stored_size INTEGER NOT NULL,
+                    data BLOB NOT NULL
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS files (
+                    name TEXT PRIMARY KEY,
+                    hash TEXT NOT NULL REFERENCES blobs(hash),
+                    invoice_id INTEGER,
+                    invoice_date TEXT,
+                    modified REAL NOT NULL,
+                    archived_at REAL NOT NULL
+                )
+            ''')
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_files_hash ON files(hash)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_files_invoice ON files(invoice_id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_files_modified ON files(modified)")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=10)
+
+    def add_file(self, filepath, invoice_id=None, invoice_date=None, conn=None):
+        """Store one PDF. Returns True if its content was new to the archive."""
+        with open(filepath, "rb") as f:
+            data = f.read()
+        digest = content_hash(data)
+        modified = os.path.getmtime(filepath)
+        owns_conn = conn is None
+        conn = conn or self._connect()
+        try:
+            exists = conn.execute("SELECT 1 FROM blobs WHERE hash = ?", (digest,)).fetchone()
+            if not exists:
+                packed = zlib.compress(data, self.compression_level)
+                conn.execute(
+                    "INSERT INTO blobs (hash, size, stored_size, data) VALUES (?, ?, ?, ?)",
+                    (digest, len(data), len(packed), packed)
+                )
+            conn.execute(
+                "INSERT OR REPLACE INTO files (name, hash, invoice_id, invoice_date, modified, archived_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (os.path.basename(filepath), digest, invoice_id, invoice_date, modified, time.time())
+            )
+            if owns_conn:
+                self._drop_orphans(conn)
+                conn.commit()
+        finally:
+            if owns_conn:
+                conn.close()
+        return not exists
+
+    def archive_directory(self, directory, older_than_days=None, filename_format=None, batch_size=100, progress=None):
+        """
+        Move PDFs older than `older_than_days` out of `directory` into the
+        archive. Files are only removed after the batch holding them has
+        committed. Returns a summary dict.
+        """
+        if older_than_days is None:
+            older_than_days = load_archive_settings()["archive_after_days"]
+        if filename_format is None:
+            from models.pdf_export import load_export_settings
+            filename_format = load_export_settings()["filename_format"]
+        cutoff = (datetime.now() - timedelta(days=older_than_days)).timestamp()
+
+        candidates = []
+        with os.scandir(directory) as it:
+            for entry in it:
+                if entry.name.lower().endswith(".pdf") and entry.is_file() and entry.stat().st_mtime < cutoff:
+                    candidates.append(entry.path)
+
+        summary = {"archived": 0, "new_blobs": 0, "bytes_in": 0, "failed": []}
+        for start in range(0, len(candidates), batch_size):
+            batch = candidates[start:start + batch_size]
+            done = []
+            with closing(self._connect()) as conn:
+                for path in batch:
+                    name = os.path.basename(path)
+                    invoice_id, invoice_date = parse_invoice_filename(name, filename_format)
+                    try:
+                        size = os.path.getsize(path)
+                        if self.add_file(path, invoice_id, invoice_date, conn=conn):
+                            summary["new_blobs"] += 1
+                        summary["bytes_in"] += size
+                        done.append(path)
+                    except OSError as e:
+                        summary["failed"].append((name, str(e)))
+                self._drop_orphans(conn)
+                conn.commit()
+            for path in done:
+                try:
+                    os.remove(path)
+                    summary["archived"] += 1
+                except OSError as e:
+                    summary["failed"].append((os.path.basename(path), f"archived but not removed: {e}"))
+            if progress:
+                progress(min(start + batch_size, len(candidates)), len(candidates))
+        return summary
+
+    def list_files(self, text="", offset=0, limit=200):
+        """Archived files whose name contains `text`, newest first: (total, [(name, size, modified, invoice_id, invoice_date)])."""
+        where = "WHERE f.name LIKE ? ESCAPE '\\'" if text.strip() else ""
+        params = []
+        if where:
+            escaped = text.strip().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            params.append(f"%{escaped}%")
+        with closing(self._connect()) as conn:
+            total = conn.execute(f"SELECT COUNT(*) FROM files f {where}", params).fetchone()[0]
+            rows = conn.execute(f'''
+                SELECT f.name, b.size, f.modified, f.invoice_id, f.invoice_date
+                FROM files f JOIN blobs b ON b.hash = f.hash
+                {where}
+                ORDER BY f.modified DESC
+                LIMIT ? OFFSET ?
+            ''', params + [limit, offset]).fetchall()
+        return total, rows
+
+    def find_by_invoice(self, invoice_id):
+        with closing(self._connect()) as conn:
+            return [row[0] for row in conn.execute(
+                "SELECT name FROM files WHERE invoice_id = ? ORDER BY modified DESC", (invoice_id,)
+            )]
+
+    def read(self, name):
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT b.data FROM files f JOIN blobs b ON b.hash = f.hash WHERE f.name = ?", (name,)
+            ).fetchone()
+        if row is None:
+            raise FileNotFoundError(f"'{name}' is not in the archive.")
+        return zlib.decompress(row[0])
+
+    def extract(self, name, filepath=None):
+        """
+        Write an archived PDF to `filepath` (default: a temp folder, reused
+        on later calls) and return the path.
+        """
+        if filepath is None:
+            folder = os.path.join(tempfile.gettempdir(), "wholesale_pdf_archive")
+            os.makedirs(folder, exist_ok=True)
+            filepath = os.path.join(folder, os.path.basename(name))
+        data = self.read(name)
+        temp_path = f"{filepath}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, filepath)
+        return filepath
+
+    def remove(self, name):
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM files WHERE name = ?", (name,))
+            self._drop_orphans(conn)
+
+    def _drop_orphans(self, conn):
+        conn.execute("DELETE FROM blobs WHERE hash NOT IN (SELECT hash FROM files)")
+
+    def stats(self):
+        with closing(self._connect()) as conn:
+            files = conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+            blobs, original, stored = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(stored_size), 0) FROM blobs"
+            ).fetchone()
+            logical = conn.execute(
+                "SELECT COALESCE(SUM(b.size), 0) FROM files f JOIN blobs b ON b.hash = f.hash"
+            ).fetchone()[0]
+        return {"files": files, "blobs": blobs, "bytes_logical": logical, "bytes_unique": original, "bytes_stored": stored}
+
+
+def get_archive():
+    settings = load_archive_settings()
+    return PdfArchive(settings["path"], settings["compression_level"])
+
+
+if __name__ == "__main__":
+    import argparse
+    from models.pdf_export import load_export_settings
+
+    parser = argparse.ArgumentParser(description="Archive exported invoice PDFs into one deduplicated store.")
+    parser.add_argument("--archive", action="store_true", help="move old PDFs from the output directory into the archive")
+    parser.add_argument("--days", type=int, help="archive PDFs older than this many days")
+    parser.add_argument("--dir", help="directory to archive (default: pdf_output_directory)")
+    parser.add_argument("--extract", metavar="NAME", help="write an archived PDF back out")
+    parser.add_argument("--out", help="where --extract writes the file")
+    args = parser.parse_args()
+
+    archive = get_archive()
+    if args.archive:
+        directory = args.dir or load_export_settings()["output_directory"]
+        result = archive.archive_directory(directory, args.days)
+        print(f"Archived {result['archived']} PDFs ({result['new_blobs']} new), {result['bytes_in'] / 1024 / 1024:.1f} MB in")
+        for name, error in result["failed"]:
+            print(f"  {name}: {error}")
+    if args.extract:
+        print(archive.extract(args.extract, args.out))
+    info = archive.stats()
+    print(f"{info['files']} files in {info['blobs']} unique PDFs; "
+          f"{info['bytes_logical'] / 1024 / 1024:.1f} MB stored as {info['bytes_stored'] / 1024 / 1024:.1f} MB")
@@ -0,0 +1,161 @@
+import hashlib
+import os
+import shutil
+import sqlite3
+import time
+from contextlib import closing
+from models import database
+from models.settings_store import DEFAULT_SETTINGS, get_section
+
+# Bump to drop every cached PDF, e.g. after a change outside generate_pdf.py
+# that still affects the output. Edits to generate_pdf.py itself are picked
+# up automatically through its source digest.
+CACHE_VERSION = 1
+
+DEFAULT_CACHE_SETTINGS = DEFAULT_SETTINGS["pdf_cache"]
+
+_LAYOUT_SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "generate_pdf.py")
+_layout_digest = None
+
+
+def load_cache_settings():
+    return get_section("pdf_cache")
+
+
+def layout_digest():
+    """Digest of the PDF layout code, so cached files go stale when it changes."""
+    global _layout_digest
+    if _layout_digest is None:
+        with open(_LAYOUT_SOURCE, "rb") as f:
+            _layout_digest = hashlib.sha256(f.read()).hexdigest()
+    return _layout_digest
+
+
+def invoice_content_hash(invoice_id, order_date):
+    """
+    Hash everything that ends up on the rendered page: the invoice id and
+    date, its grouped line items and the layout code. Returns (hash, rows).
+    """
+    digest = hashlib.sha256()
+    digest.update(f"v{CACHE_VERSION}|{layout_digest()}|{invoice_id}|{order_date}\n".encode("utf-8"))
+    rows = 0
+    for vendor, item in database.iter_grouped_invoice_items(invoice_id):
+        digest.update(repr((
+            vendor,
+            item["item_code"],
+            item["item_name"],
+            item["optional_info"],
+            item["quantity"],
+            item["unit_price"]
+        )).encode("utf-8"))
+        rows += 1
+    return digest.hexdigest(), rows
+
+
+class PdfCache:
+    """Content-addressed store of rendered PDFs with an LRU size limit."""
+
+    def __init__(self, directory=None, max_size_mb=None):
+        settings = load_cache_settings()
+        self.directory = directory or settings["directory"]
+        self.max_bytes = int((max_size_mb if max_size_mb is not None else settings["max_size_mb"]) * 1024 * 1024)
+        os.makedirs(self.directory, exist_ok=True)
+        self.index_path = os.path.join(self.directory, "index.db")
+        with closing(self._connect()) as conn, conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS entries (
+                    hash TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used REAL NOT NULL
+                )
+            ''')
+
+    def _connect(self):
+        return sqlite3.connect(self.index_path, timeout=10)
+
+    def _path_for(self, content_hash):
+        return os.path.join(self.directory, content_hash + ".pdf")
+
+    def fetch(self, content_hash, filepath):
+        """Copy a cached PDF to `filepath`. Returns False on a miss."""
+        cached_path = self._path_for(content_hash)
+        with closing(self._connect()) as conn, conn:
+            row = conn.execute("SELECT size FROM entries WHERE hash = ?", (content_hash,)).fetchone()
+            if row is None:
+                return False
+            if not os.path.exists(cached_path):
+                conn.execute("DELETE FROM entries WHERE hash = ?", (content_hash,))
+                return False
+            conn.execute("UPDATE entries SET last_used = ? WHERE hash = ?", (time.time(), content_hash))
+        if os.path.abspath(cached_path) != os.path.abspath(filepath):
+            shutil.copyfile(cached_path, filepath)
+        return True
+
+    def store(self, content_hash, filepath):
+        cached_path = self._path_for(content_hash)
+        temp_path = f"{cached_path}.{os.getpid()}.tmp"
+        shutil.copyfile(filepath, temp_path)
+        os.replace(temp_path, cached_path)
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (hash, size, created_at, last_used) VALUES (?, ?, ?, ?)",
+                (content_hash, os.path.getsize(cached_path), now, now)
+            )
+        self.evict()
+
+    def evict(self):
+        """Drop least recently used entries until the cache fits in max_bytes."""
+        with closing(self._connect()) as conn, conn:
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if total <= self.max_bytes:
+                return 0
+            removed = 0
+            for content_hash, size in conn.execute("SELECT hash, size FROM entries ORDER BY last_used").fetchall():
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(self._path_for(content_hash))
+                except FileNotFoundError:
+                    pass
+                conn.execute("DELETE FROM entries WHERE hash = ?", (content_hash,))
+                total -= size
+                removed += 1
+            return removed
+
+    def clear(self):
+        with closing(self._connect()) as conn, conn:
+            for (content_hash,) in conn.execute("SELECT hash FROM entries").fetchall():
+                try:
+                    os.remove(self._path_for(content_hash))
+                except FileNotFoundError:
+                    pass
+            conn.execute("DELETE FROM entries")
+
+    def stats(self):
+        with closing(self._connect()) as conn:
+            count, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        return {"entries": count, "bytes": size, "max_bytes": self.max_bytes}
+
+
+def get_cache():
+    """The configured cache, or None when caching is turned off in settings."""
+    settings = load_cache_settings()
+    if not settings.get("enabled", True):
+        return None
+    return PdfCache(settings["directory"], settings["max_size_mb"])
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Inspect or clear the rendered PDF cache.")
+    parser.add_argument("--clear", action="store_true", help="remove every cached PDF")
+    args = parser.parse_args()
+
+    cache = PdfCache()
+    if args.clear:
+        cache.clear()
+    info = cache.stats()
+    print(f"{info['entries']} cached PDFs, {info['bytes'] / 1024 / 1024:.1f} of {info['max_bytes'] / 1024 / 1024:.0f} MB")
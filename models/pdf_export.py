@@ -0,0 +1,166 @@
+import os
+import time
+from datetime import datetime
+from models import database
+from models.connection import get_connection
+from models.pdf_cache import get_cache, invoice_content_hash
+from models.settings_store import DEFAULT_SETTINGS, get_settings
+
+DEFAULT_FILENAME_FORMAT = DEFAULT_SETTINGS["pdf_filename_format"]
+
+
+def load_export_settings():
+    settings = get_settings()
+    return {
+        "output_directory": settings.get("pdf_output_directory", ""),
+        "filename_format": settings.get("pdf_filename_format", DEFAULT_FILENAME_FORMAT)
+    }
+
+
+def build_pdf_filename(invoice_id, order_date, filename_format=None):
+    formatted_date = datetime.strptime(order_date, "%Y-%m-%d").strftime("%Y%m%d")
+    template = filename_format or DEFAULT_FILENAME_FORMAT
+    return template.format(id=invoice_id, date=formatted_date) + ".pdf"
+
+
+def export_invoice_pdf(invoice_id, filepath, order_date=None, use_cache=True):
+    """
+    Render one invoice straight from the database, reusing a cached PDF
+    when nothing that affects the output has changed. Returns the renderer
+    stats plus "cached" (True when the file came from the cache).
+    """
+    started = time.perf_counter()
+    if order_date is None:
+        # Not database.get_invoice_details: its `with conn` would commit a caller's transaction
+        row = get_connection().execute("SELECT date FROM invoices WHERE id = ?", (invoice_id,)).fetchone()
+        if row is None:
+            raise ValueError(f"Invoice {invoice_id} does not exist.")
+        order_date = row[0]
+
+    cache = get_cache() if use_cache else None
+    if cache is None:
+        from models.generate_pdf import render_invoice_pdf
+        stats = render_invoice_pdf(invoice_id, order_date, database.iter_grouped_invoice_items(invoice_id), filepath)
+        stats["cached"] = False
+        return stats
+
+    # Hash and render inside one read transaction so both see the same rows.
+    # A caller already in a transaction gives that snapshot; leave it open.
+    conn = get_connection()
+    owns_transaction = not conn.in_transaction
+    if owns_transaction:
+        conn.execute("BEGIN")
+    try:
+        content_hash, rows = invoice_content_hash(invoice_id, order_date)
+        if cache.fetch(content_hash, filepath):
+            elapsed = time.perf_counter() - started
+            return {
+                "path": os.path.abspath(filepath),
+                "rows": rows,
+                "pages": None,
+                "seconds": elapsed,
+                "rows_per_second": rows / elapsed if elapsed > 0 else 0.0,
+                "cached": True
+            }
+        from models.generate_pdf import render_invoice_pdf
+        stats = render_invoice_pdf(invoice_id, order_date, database.iter_grouped_invoice_items(invoice_id), filepath)
+    finally:
+        if owns_transaction:
+            conn.commit()
+    cache.store(content_hash, filepath)
+    stats["cached"] = False
+    return stats
+
+
+def _init_export_worker(db_path):
+    # Spawned workers start from a fresh interpreter; point them at the same file
+    from models import connection
+    connection.DB_PATH = db_path
+
+
+def _export_worker(invoice_id, output_dir, filename_format):
+    # Runs in a pool process, which opens its own connection
+    details = database.get_invoice_details(invoice_id)
+    if details is None:
+        raise ValueError(f"Invoice {invoice_id} does not exist.")
+    filepath = os.path.join(output_dir, build_pdf_filename(invoice_id, details["date"], filename_format))
+    stats = export_invoice_pdf(invoice_id, filepath, details["date"])
+    return stats["path"], stats["rows"]
+
+
+def export_invoices(invoice_ids=None, start_date=None, end_date=None, output_dir=None,
+                    filename_format=None, workers=None, progress=None):
+    """
+    Export many invoices to PDF in a process pool.
+
+    Pass explicit `invoice_ids` or a YYYY-MM-DD `start_date`/`end_date`
+    range. Output directory and filename template default to the settings.
+    `progress(done, total, invoice_id, error)` is called as each invoice
+    finishes. Returns {"exported": [(id, path)], "failed": [(id, message)],
+    "rows", "seconds"}.
+    """
+    started = time.perf_counter()
+    export_settings = load_export_settings()
+    output_dir = output_dir or export_settings["output_directory"] or os.getcwd()
+    filename_format = filename_format or export_settings["filename_format"]
+    os.makedirs(output_dir, exist_ok=True)
+
+    if invoice_ids is None:
+        invoice_ids = database.get_invoice_ids(start_date, end_date)
+    invoice_ids = list(invoice_ids)
+
+    result = {"exported": [], "failed": [], "rows": 0, "seconds": 0.0}
+    total = len(invoice_ids)
+    if total:
+        # Only batch export needs the process pool; keep multiprocessing out of startup
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+        from models import connection
+        workers = max(1, min(workers or os.cpu_count() or 1, total))
+        # Spawn, not fork: this process has other threads (Tk, cleanup,
+        # maintenance) whose SQLite handles and locks a fork would copy
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=_init_export_worker, initargs=(connection.DB_PATH,)) as pool:
+            futures = {
+                pool.submit(_export_worker, invoice_id, output_dir, filename_format): invoice_id
+                for invoice_id in invoice_ids
+            }
+            for done, future in enumerate(as_completed(futures), start=1):
+                invoice_id = futures[future]
+                error = None
+                try:
+                    path, rows = future.result()
+                    result["exported"].append((invoice_id, path))
+                    result["rows"] += rows
+                except Exception as e:
+                    error = str(e)
+                    result["failed"].append((invoice_id, error))
+                if progress:
+                    progress(done, total, invoice_id, error)
+
+    result["exported"].sort()
+    result["failed"].sort()
+    result["seconds"] = time.perf_counter() - started
+    return result
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export invoices to PDF without the GUI.")
+    parser.add_argument("--ids", help="comma separated invoice ids")
+    parser.add_argument("--from", dest="start_date", help="first invoice date, YYYY-MM-DD")
+    parser.add_argument("--to", dest="end_date", help="last invoice date, YYYY-MM-DD")
+    parser.add_argument("--out", help="output directory (defaults to pdf_output_directory)")
+    parser.add_argument("--workers", type=int, help="worker processes (defaults to CPU count)")
+    args = parser.parse_args()
+
+    ids = [int(i) for i in args.ids.split(",") if i.strip()] if args.ids else None
+
+    def report(done, total, invoice_id, error):
+        status = f"FAILED: {error}" if error else "ok"
+        print(f"[{done}/{total}] invoice {invoice_id} {status}")
+
+    summary = export_invoices(ids, args.start_date, args.end_date, args.out, workers=args.workers, progress=report)
+    print(f"Exported {len(summary['exported'])} invoices ({summary['rows']} rows), "
+          f"{len(summary['failed'])} failed in {summary['seconds']:.1f}s.")
@@ -0,0 +1,93 @@
+import os
+import threading
+
+# -------------------
+# Saved PDF Directory Index
+# -------------------
+# Listing a large PDF directory (often on a network share) and stat-ing every
+# file on each refresh is slow. DirectoryIndex keeps (name, size, mtime) for
+# every PDF and only rescans when the directory's own mtime changes, which
+# happens whenever a file is added, removed or renamed in it.
+
+
+class DirectoryIndex:
+    def __init__(self, directory, suffix=".pdf"):
+        self.directory = directory
+        self.suffix = suffix.lower()
+        self._lock = threading.Lock()
+        self._dir_mtime = None
+        self._entries = {}
+        # Newest first; rebuilt lazily after a rescan
+        self._ordered = None
+
+    def refresh(self, force=False):
+        """
+        Rescan if the directory changed since the last scan (or `force`).
+        Returns True if the listing was rebuilt. Raises OSError if the
+        directory cannot be read.
+        """
+        dir_mtime = os.stat(self.directory).st_mtime_ns
+        with self._lock:
+            if not force and dir_mtime == self._dir_mtime:
+                return False
+
+        entries = {}
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if not entry.name.lower().endswith(self.suffix):
+                    continue
+                try:
+                    if not entry.is_file():
+                        continue
+                    # Served from the directory listing itself on Windows
+                    st = entry.stat()
+                except OSError:
+                    # Removed between listing and stat
+                    continue
+                entries[entry.name] = (entry.name, st.st_size, st.st_mtime)
+
+        with self._lock:
+            self._entries = entries
+            self._dir_mtime = dir_mtime
+            self._ordered = None
+        return True
+
+    def _sorted(self):
+        with self._lock:
+            if self._ordered is None:
+                self._ordered = sorted(self._entries.values(), key=lambda e: e[2], reverse=True)
+            return self._ordered
+
+    def __len__(self):
+        return len(self._entries)
+
+    def query(self, text="", offset=0, limit=200):
+        """
+        Entries whose name contains `text` (case-insensitive), newest first.
+        Returns (total_matches, [(name, size, mtime), ...] for the page).
+        """
+        ordered = self._sorted()
+        text = text.strip().lower()
+        if text:
+            ordered = [e for e in ordered if text in e[0].lower()]
+        return len(ordered), ordered[offset:offset + limit]
+
+    def remove(self, name):
+        """Forget a file we deleted ourselves, without waiting for a rescan."""
+        with self._lock:
+            if self._entries.pop(name, None) is not None:
+                self._ordered = None
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_directory_index(directory):
+    """One shared index per directory, so reopening the window reuses the last scan."""
+    key = os.path.abspath(directory)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = DirectoryIndex(directory)
+        return index
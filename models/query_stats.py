@@ -0,0 +1,316 @@
+import logging
+import re
+import sqlite3
+import sys
+import threading
+import time
+from collections import deque
+from collections.abc import Mapping
+from logging.handlers import RotatingFileHandler
+from models.settings_store import DEFAULT_SETTINGS, get_section
+
+# -------------------
+# Query Timing
+# -------------------
+# When diagnostics are enabled, get_connection() opens connections with
+# TimedConnection, whose cursors time every statement (execute plus the
+# fetches that drain it) and count the rows it returned or changed. Totals
+# are kept per statement text in a process-wide QueryStats, and statements
+# slower than the threshold are written to a rotating log.
+
+DEFAULT_DIAGNOSTICS_SETTINGS = DEFAULT_SETTINGS["diagnostics"]
+
+# Recent durations kept per statement for the percentiles
+SAMPLE_SIZE = 500
+
+_WHITESPACE = re.compile(r"\s+")
+# Batched deletes build "IN (?,?,...)" lists of varying length; count them as one statement
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+
+
+def load_diagnostics_settings():
+    return get_section("diagnostics")
+
+
+def _params_shape(parameters):
+    """Enough about the bound parameters to re-bind placeholders for EXPLAIN."""
+    if isinstance(parameters, Mapping):
+        return tuple(parameters)
+    try:
+        return len(parameters)
+    except TypeError:
+        return 0
+
+
+def _percentile(ordered, fraction):
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def _caller():
+    """First frame outside this module, as "module.function"."""
+    frame = sys._getframe(1)
+    while frame is not None and frame.f_globals.get("__name__") == __name__:
+        frame = frame.f_back
+    if frame is None:
+        return ""
+    return f"{frame.f_globals.get('__name__', '?')}.{frame.f_code.co_name}"
+
+
+class _Statement:
+    __slots__ = ("sql", "caller", "calls", "total", "rows", "max", "slowest_sql", "slowest_params", "samples")
+
+    def __init__(self, sql, caller):
+        self.sql = sql
+        self.caller = caller
+        self.calls = 0
+        self.total = 0.0
+        self.rows = 0
+        self.max = 0.0
+        self.slowest_sql = sql
+        self.slowest_params = 0
+        self.samples = deque(maxlen=SAMPLE_SIZE)
+
+
+class QueryStats:
+    def __init__(self, settings=None):
+        self._lock = threading.Lock()
+        self._statements = {}
+        self._keys = {}
+        self._logger = None
+        self.configure(settings or load_diagnostics_settings())
+
+    def configure(self, settings):
+        self.slow_seconds = float(settings["slow_query_ms"]) / 1000
+        self.log_path = settings["log_path"]
+        self.log_max_bytes = int(settings["log_max_kb"]) * 1024
+        self.log_backups = int(settings["log_backups"])
+
+    def _key(self, sql):
+        key = self._keys.get(sql)
+        if key is None:
+            key = _IN_LIST.sub("IN (?, ...)", _WHITESPACE.sub(" ", sql).strip())
+            if len(self._keys) > 5000:
+                self._keys.clear()
+            self._keys[sql] = key
+        return key
+
+    def caller_if_new(self, sql):
+        """Where a statement is first seen from; looked up at execute time, before fetching moves on."""
+        if self._key(sql) in self._statements:
+            return None
+        return _caller()
+
+    def record(self, sql, parameters, elapsed, rows, caller=None):
+        key = self._key(sql)
+        if key.startswith("EXPLAIN"):
+            return
+        with self._lock:
+            stmt = self._statements.get(key)
+            if stmt is None:
+                stmt = self._statements[key] = _Statement(key, caller or _caller())
+            stmt.calls += 1
+            stmt.total += elapsed
+            stmt.rows += rows
+            stmt.samples.append(elapsed)
+            if elapsed >= stmt.max:
+                stmt.max = elapsed
+                stmt.slowest_sql = sql
+                stmt.slowest_params = _params_shape(parameters)
+        if elapsed >= self.slow_seconds:
+            self._log_slow(key, stmt.caller, elapsed, rows)
+
+    def _log_slow(self, sql, caller, elapsed, rows):
+        if self._logger is None:
+            logger = logging.getLogger("wholesale.slow_queries")
+            logger.propagate = False
+            try:
+                handler = RotatingFileHandler(
+                    self.log_path, maxBytes=self.log_max_bytes, backupCount=self.log_backups, encoding="utf-8"
+                )
+            except OSError as e:
+                print(f"Could not open slow query log: {e}")
+                handler = logging.NullHandler()
+            handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+            logger.addHandler(handler)
+            logger.setLevel(logging.INFO)
+            self._logger = logger
+        self._logger.info("%.1f ms  %d rows  %s  %s", elapsed * 1000, rows, caller, sql)
+
+    def snapshot(self):
+        """Per-statement totals, slowest total time first."""
+        with self._lock:
+            statements = [
+                (s.sql, s.caller, s.calls, s.total, s.rows, s.max, s.slowest_sql, s.slowest_params, list(s.samples))
+                for s in self._statements.values()
+            ]
+        result = []
+        for sql, caller, calls, total, rows, slowest, slowest_sql, slowest_params, samples in statements:
+            samples.sort()
+            result.append({
+                "sql": sql,
+                "caller": caller,
+                "calls": calls,
+                "total": total,
+                "mean": total / calls,
+                "p50": _percentile(samples, 0.5),
+                "p95": _percentile(samples, 0.95),
+                "max": slowest,
+                "rows": rows,
+                "slowest_sql": slowest_sql,
+                "slowest_params": slowest_params
+            })
+        result.sort(key=lambda s: s["total"], reverse=True)
+        return result
+
+    def reset(self):
+        with self._lock:
+            self._statements.clear()
+
+
+_stats = None
+_stats_lock = threading.Lock()
+
+
+def get_query_stats():
+    global _stats
+    with _stats_lock:
+        if _stats is None:
+            _stats = QueryStats()
+        return _stats
+
+
+class TimedCursor(sqlite3.Cursor):
+    """
+    Times each statement from execute() until its rows are drained (or the
+    next statement starts) and reports it to the shared QueryStats.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats = get_query_stats()
+        # [sql, parameters, elapsed, rows, caller] for a SELECT still being fetched
+        self._pending = None
+
+    def _finish(self):
+        pending, self._pending = self._pending, None
+        if pending is not None:
+            self._stats.record(*pending)
+
+    def _run(self, method, sql, parameters, sample_params):
+        self._finish()
+        started = time.perf_counter()
+        try:
+            method(sql, parameters)
+        except Exception:
+            self._stats.record(sql, sample_params, time.perf_counter() - started, 0)
+            raise
+        elapsed = time.perf_counter() - started
+        if self.description is None:
+            self._stats.record(sql, sample_params, elapsed, max(self.rowcount, 0))
+        else:
+            self._pending = [sql, sample_params, elapsed, 0, self._stats.caller_if_new(sql)]
+        return self
+
+    def execute(self, sql, parameters=()):
+        return self._run(super().execute, sql, parameters, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        # The first row of a list stands in for the rest when explaining the plan
+        sample = seq_of_parameters[0] if isinstance(seq_of_parameters, (list, tuple)) and seq_of_parameters else ()
+        return self._run(super().executemany, sql, seq_of_parameters, sample)
+
+    def fetchone(self):
+        started = time.perf_counter()
+        row = super().fetchone()
+        if self._pending is not None:
+            self._pending[2] += time.perf_counter() - started
+            if row is None:
+                self._finish()
+            else:
+                self._pending[3] += 1
+        return row
+
+    def fetchmany(self, size=None):
+        size = self.arraysize if size is None else size
+        started = time.perf_counter()
+        rows = super().fetchmany(size)
+        if self._pending is not None:
+            self._pending[2] += time.perf_counter() - started
+            self._pending[3] += len(rows)
+            if len(rows) < size:
+                self._finish()
+        return rows
+
+    def fetchall(self):
+        started = time.perf_counter()
+        rows = super().fetchall()
+        if self._pending is not None:
+            self._pending[2] += time.perf_counter() - started
+            self._pending[3] += len(rows)
+            self._finish()
+        return rows
+
+    def __next__(self):
+        started = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            if self._pending is not None:
+                self._pending[2] += time.perf_counter() - started
+                self._finish()
+            raise
+        if self._pending is not None:
+            self._pending[2] += time.perf_counter() - started
+            self._pending[3] += 1
+        return row
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        try:
+            self._finish()
+        except Exception:
+            pass
+
+
+class TimedConnection(sqlite3.Connection):
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, script):
+        started = time.perf_counter()
+        try:
+            return super().executescript(script)
+        finally:
+            get_query_stats().record(script, (), time.perf_counter() - started, 0)
+
+    def commit(self):
+        started = time.perf_counter()
+        try:
+            super().commit()
+        finally:
+            get_query_stats().record("COMMIT", (), time.perf_counter() - started, 0)
+
+
+def explain_statement(stmt, conn=None):
+    """Query plan for the slowest call of a snapshot() entry, or [] if it cannot be explained."""
+    from models.migrations import explain_query_plan
+    sql = stmt["slowest_sql"].lstrip()
+    if sql[:6].upper() not in ("SELECT", "INSERT", "UPDATE", "DELETE") and sql[:4].upper() != "WITH":
+        return []
+    shape = stmt["slowest_params"]
+    params = dict.fromkeys(shape) if isinstance(shape, tuple) else [None] * shape
+    try:
+        return explain_query_plan(sql, params, conn)
+    except sqlite3.Error as e:
+        return [f"(no plan: {e})"]
@@ -0,0 +1,194 @@
+import http.client
+import json
+import os
+import threading
+import time
+import urllib.parse
+from models.catalog import Catalog
+from models.settings_store import get_section
+
+# -------------------
+# Invoice Service Client
+# -------------------
+# Stands in for models.database (plus the catalog, item search and PDF
+# export) when "service": {"url": ...} is set, calling a models.service
+# instance instead of opening the database file. Rows come back supporting
+# both row["name"] and row[0], like sqlite3.Row.
+
+TOKEN_HEADER = "X-Service-Token"
+
+# How long a fetched catalog is trusted before asking the service whether
+# another terminal changed it
+CATALOG_CHECK_SECONDS = 2.0
+
+
+class ServiceError(Exception):
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+class RemoteRow(tuple):
+    """A read-only row that also answers by column name."""
+
+    def __new__(cls, keys, values):
+        row = super().__new__(cls, values)
+        row._index = {key: i for i, key in enumerate(keys)}
+        return row
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return tuple.__getitem__(self, self._index[key])
+        return tuple.__getitem__(self, key)
+
+    def keys(self):
+        return list(self._index)
+
+
+def _decode(obj):
+    if isinstance(obj, dict) and "__row__" in obj:
+        return RemoteRow(obj["__row__"], obj["values"])
+    return obj
+
+
+def _encode(value):
+    # Callers pass sets (e.g. the editor's deleted row ids) like they would locally
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _request(path, payload=None):
+    settings = get_section("service")
+    url = settings["url"].rstrip("/") + path
+    parts = urllib.parse.urlsplit(url)
+    data = json.dumps(payload, default=_encode).encode("utf-8") if payload is not None else None
+    headers = {"Content-Type": "application/json"}
+    if settings.get("token"):
+        headers[TOKEN_HEADER] = settings["token"]
+
+    # A down or unreachable service should fail within connect_timeout_seconds;
+    # timeout_seconds only bounds waiting for the answer (e.g. a PDF render)
+    connection_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+    conn = connection_class(parts.hostname, parts.port, timeout=settings["connect_timeout_seconds"])
+    try:
+        conn.connect()
+        conn.sock.settimeout(settings["timeout_seconds"])
+        conn.request("POST" if data is not None else "GET", parts.path, body=data, headers=headers)
+        response = conn.getresponse()
+        body = response.read()
+    except (OSError, http.client.HTTPException) as e:
+        raise ServiceError(f"Invoice service at {settings['url']} is unreachable: {e}") from None
+    finally:
+        conn.close()
+
+    if response.status >= 400:
+        try:
+            message = json.loads(body).get("error", response.reason)
+        except ValueError:
+            message = response.reason
+        if response.status == 400:
+            raise ValueError(message)
+        raise ServiceError(message, response.status)
+    return response.getheader("Content-Type", ""), body
+
+
+def _rows(value):
+    # JSON has no tuples; give row lists back the shape sqlite returns
+    if isinstance(value, list):
+        return [tuple(row) if isinstance(row, list) else row for row in value]
+    if isinstance(value, dict):
+        return {key: _rows(rows) for key, rows in value.items()}
+    return value
+
+
+def call(name, *args, **kwargs):
+    _content_type, body = _request(f"/api/{name}", {"args": args, "kwargs": kwargs})
+    return _rows(json.loads(body, object_hook=_decode)["result"])
+
+
+def health():
+    _content_type, body = _request("/health")
+    return json.loads(body)
+
+
+def _operation(name, writes_catalog=False):
+    def remote(*args, **kwargs):
+        result = call(name, *args, **kwargs)
+        if writes_catalog:
+            invalidate_catalog()
+        return result
+    remote.__name__ = name
+    return remote
+
+
+get_all_vendors = _operation("get_all_vendors")
+get_all_items = _operation("get_all_items")
+get_item_id_by_name = _operation("get_item_id_by_name")
+get_all_invoices = _operation("get_all_invoices")
+get_latest_invoice_id = _operation("get_latest_invoice_id")
+get_invoices_page = _operation("get_invoices_page")
+get_invoice_ids = _operation("get_invoice_ids")
+get_invoice_totals = _operation("get_invoice_totals")
+get_invoice_items = _operation("get_invoice_items")
+get_invoice_details = _operation("get_invoice_details")
+get_price_history = _operation("get_price_history")
+search_items = _operation("search_items")
+search_all = _operation("search_all")
+add_vendor = _operation("add_vendor", writes_catalog=True)
+rename_vendor = _operation("rename_vendor", writes_catalog=True)
+soft_delete_vendor = _operation("soft_delete_vendor", writes_catalog=True)
+add_item = _operation("add_item", writes_catalog=True)
+rename_item = _operation("rename_item", writes_catalog=True)
+soft_delete_item = _operation("soft_delete_item", writes_catalog=True)
+create_blank_invoice = _operation("create_blank_invoice")
+update_invoice = _operation("update_invoice")
+delete_invoice = _operation("delete_invoice")
+
+
+def export_invoice_pdf(invoice_id, filepath, order_date=None, use_cache=True):
+    """Have the service render the invoice and save the PDF to `filepath`."""
+    started = time.perf_counter()
+    _content_type, data = _request(
+        "/api/export_invoice_pdf",
+        {"args": [], "kwargs": {"invoice_id": invoice_id, "order_date": order_date, "use_cache": use_cache}}
+    )
+    temp_path = f"{filepath}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(data)
+    os.replace(temp_path, filepath)
+    return {"path": os.path.abspath(filepath), "bytes": len(data), "seconds": time.perf_counter() - started}
+
+
+_catalog_lock = threading.Lock()
+_catalog = None
+_catalog_checked = 0.0
+
+
+def invalidate_catalog():
+    global _catalog_checked
+    with _catalog_lock:
+        _catalog_checked = 0.0
+
+
+def get_catalog():
+    """The service's catalog, refetched when its generation moves on."""
+    global _catalog, _catalog_checked
+    with _catalog_lock:
+        if _catalog is not None and time.monotonic() - _catalog_checked < CATALOG_CHECK_SECONDS:
+            return _catalog
+        current = _catalog
+    if current is not None and call("catalog_generation") == current.generation:
+        with _catalog_lock:
+            _catalog_checked = time.monotonic()
+        return current
+    snapshot = call("catalog")
+    catalog = Catalog(
+        snapshot["generation"],
+        [tuple(row) for row in snapshot["vendors"]],
+        [tuple(row) for row in snapshot["items"]]
+    )
+    with _catalog_lock:
+        _catalog = catalog
+        _catalog_checked = time.monotonic()
+    return catalog
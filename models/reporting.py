@@ -0,0 +1,128 @@
+import argparse
+import csv
+import time
+from models.connection import get_connection
+
+# -------------------
+# Spend Reports
+# -------------------
+# Reports read spend_summary (migration 6), which triggers on invoice_items
+# and invoices keep up to date: one row per (month, vendor, item) instead of
+# one per line item, so a report never scans invoice_items.
+
+GROUPINGS = {
+    "month": ("s.month", "s.month"),
+    "vendor": ("s.vendor_id", "v.name AS vendor_name"),
+    "item": ("s.item_id", "i.name AS item_name, i.item_code"),
+}
+
+COLUMN_TITLES = {
+    "month": "Month",
+    "vendor_name": "Vendor",
+    "item_name": "Item",
+    "item_code": "Item Code",
+    "quantity": "Quantity",
+    "spend": "Spend",
+    "line_count": "Lines",
+}
+
+
+def rebuild_spend_summary():
+    """Recompute spend_summary from invoice_items. Returns (rows, seconds)."""
+    started = time.perf_counter()
+    conn = get_connection()
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("DELETE FROM spend_summary")
+        conn.execute('''
+            INSERT INTO spend_summary (month, vendor_id, item_id, quantity, spend, line_count)
+            SELECT substr(inv.date, 1, 7), ii.vendor_id, ii.item_id,
+                   SUM(ii.quantity), SUM(ii.quantity * ii.unit_price), COUNT(*)
+            FROM invoice_items ii
+            JOIN invoices inv ON inv.id = ii.invoice_id
+            GROUP BY 1, 2, 3
+        ''')
+        rows = conn.execute("SELECT COUNT(*) FROM spend_summary").fetchone()[0]
+    return rows, time.perf_counter() - started
+
+
+def spend_report(start_month=None, end_month=None, group_by=("vendor",), vendor_id=None, item_id=None):
+    """
+    Quantity, spend and line count per group over a month range.
+
+    Months are "YYYY-MM" and inclusive. `group_by` is any combination of
+    "month", "vendor" and "item". Returns (columns, rows), biggest spend first
+    (or in month order when grouping by month).
+    """
+    group_by = [g for g in GROUPINGS if g in group_by]
+    if not group_by:
+        raise ValueError("Group by at least one of: " + ", ".join(GROUPINGS))
+
+    where = []
+    params = []
+    if start_month:
+        where.append("s.month >= ?")
+        params.append(start_month)
+    if end_month:
+        where.append("s.month <= ?")
+        params.append(end_month)
+    if vendor_id is not None:
+        where.append("s.vendor_id = ?")
+        params.append(vendor_id)
+    if item_id is not None:
+        where.append("s.item_id = ?")
+        params.append(item_id)
+
+    select = ", ".join(GROUPINGS[g][1] for g in group_by)
+    group = ", ".join(GROUPINGS[g][0] for g in group_by)
+    order = "s.month, spend DESC" if "month" in group_by else "spend DESC"
+    sql = f'''
+        SELECT {select},
+               SUM(s.quantity) AS quantity,
+               ROUND(SUM(s.spend), 2) AS spend,
+               SUM(s.line_count) AS line_count
+        FROM spend_summary s
+        JOIN vendors v ON v.id = s.vendor_id
+        JOIN items i ON i.id = s.item_id
+        {"WHERE " + " AND ".join(where) if where else ""}
+        GROUP BY {group}
+        ORDER BY {order}
+    '''
+    with get_connection() as conn:
+        cursor = conn.execute(sql, params)
+        columns = [d[0] for d in cursor.description]
+        return columns, cursor.fetchall()
+
+
+def write_report_csv(columns, rows, path):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow([COLUMN_TITLES.get(c, c) for c in columns])
+        writer.writerows(rows)
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Spend reports from the invoice database.")
+    parser.add_argument("--backfill", action="store_true", help="rebuild the summary table from line items first")
+    parser.add_argument("--from", dest="start_month", help="first month, YYYY-MM")
+    parser.add_argument("--to", dest="end_month", help="last month, YYYY-MM")
+    parser.add_argument("--by", default="vendor", help="comma separated: month,vendor,item (default vendor)")
+    parser.add_argument("--csv", help="write the report to this CSV file")
+    args = parser.parse_args()
+
+    if args.backfill:
+        count, seconds = rebuild_spend_summary()
+        print(f"Rebuilt spend summary: {count} rows in {seconds:.2f}s")
+
+    started = time.perf_counter()
+    columns, rows = spend_report(args.start_month, args.end_month, [g.strip() for g in args.by.split(",")])
+    elapsed = time.perf_counter() - started
+    if args.csv:
+        write_report_csv(columns, rows, args.csv)
+        print(f"Wrote {len(rows)} rows to {args.csv} ({elapsed * 1000:.1f} ms)")
+    else:
+        print(" | ".join(COLUMN_TITLES.get(c, c) for c in columns))
+        for row in rows:
+            print(" | ".join("" if v is None else str(v) for v in row))
+        print(f"{len(rows)} rows in {elapsed * 1000:.1f} ms")
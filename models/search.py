@@ -0,0 +1,114 @@
+import re
+import sqlite3
+from models.connection import get_connection
+
+# -------------------
+# Full-text search
+# -------------------
+# Backed by the FTS5 tables from migration 5 (items_fts, vendors_fts,
+# invoice_items_fts). Results come back best match first (bm25).
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def build_match_query(text):
+    """
+    Turn what the user typed into an FTS5 query: every word must match the
+    start of some indexed word, so "acm pap" finds "Acme Paper Towels".
+    Returns None when there is nothing searchable in `text`.
+    """
+    tokens = _TOKEN.findall(text.lower())
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def search_items(text, limit=20, active_only=True):
+    """Items whose name or item code match `text`: [(id, name, item_code)]."""
+    query = build_match_query(text)
+    if query is None:
+        return []
+    with get_connection() as conn:
+        return conn.execute(f"""
+            SELECT i.id, i.name, i.item_code
+            FROM items_fts
+            JOIN items i ON i.id = items_fts.rowid
+            WHERE items_fts MATCH ? {"AND i.active = 1" if active_only else ""}
+            ORDER BY items_fts.rank
+            LIMIT ?
+        """, (query, limit)).fetchall()
+
+
+def search_vendors(text, limit=20, active_only=True):
+    """Vendors whose name matches `text`: [(id, name)]."""
+    query = build_match_query(text)
+    if query is None:
+        return []
+    with get_connection() as conn:
+        return conn.execute(f"""
+            SELECT v.id, v.name
+            FROM vendors_fts
+            JOIN vendors v ON v.id = vendors_fts.rowid
+            WHERE vendors_fts MATCH ? {"AND v.active = 1" if active_only else ""}
+            ORDER BY vendors_fts.rank
+            LIMIT ?
+        """, (query, limit)).fetchall()
+
+
+def search_line_items(text, limit=50):
+    """
+    Line items whose optional info matches `text`, as rows with
+    invoice_item_id, invoice_id, date, vendor_name, item_name and
+    optional_info.
+    """
+    query = build_match_query(text)
+    if query is None:
+        return []
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.row_factory = sqlite3.Row
+        cursor.execute("""
+            SELECT ii.id AS invoice_item_id,
+                ii.invoice_id,
+                inv.date,
+                v.name AS vendor_name,
+                i.name AS item_name,
+                ii.optional_info
+            FROM invoice_items_fts
+            JOIN invoice_items ii ON ii.id = invoice_items_fts.rowid
+            JOIN invoices inv ON inv.id = ii.invoice_id
+            JOIN items i ON i.id = ii.item_id
+            JOIN vendors v ON v.id = ii.vendor_id
+            WHERE invoice_items_fts MATCH ?
+            ORDER BY invoice_items_fts.rank
+            LIMIT ?
+        """, (query, limit))
+        return cursor.fetchall()
+
+
+def search_all(text, limit=20):
+    """Run every search at once, for the global search box."""
+    return {
+        "items": search_items(text, limit, active_only=False),
+        "vendors": search_vendors(text, limit, active_only=False),
+        "line_items": search_line_items(text, limit)
+    }
+
+
+def rebuild_search_index():
+    """Rebuild all FTS indexes from the base tables (e.g. after a bulk restore)."""
+    with get_connection() as conn:
+        for table in ("items_fts", "vendors_fts", "invoice_items_fts"):
+            conn.execute(f"INSERT INTO {table} ({table}) VALUES ('rebuild')")
+        conn.commit()
+
+
+if __name__ == "__main__":
+    import sys
+    results = search_all(" ".join(sys.argv[1:]))
+    for item_id, name, code in results["items"]:
+        print(f"item    {item_id:>6}  {name} ({code})")
+    for vendor_id, name in results["vendors"]:
+        print(f"vendor  {vendor_id:>6}  {name}")
+    for row in results["line_items"]:
+        print(f"invoice {row['invoice_id']:>6}  {row['date']}  {row['vendor_name']} / {row['item_name']}: {row['optional_info']}")
@@ -0,0 +1,277 @@
+import hmac
+import ipaddress
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from models import catalog, connection, database, search
+from models.connection import get_connection
+from models.settings_store import DEFAULT_SETTINGS, get_section
+
+# -------------------
+# Invoice Service
+# -------------------
+# Lets several terminals share one invoice database through a single process
+# instead of opening Data/invoice.db over a network share. Requests are
+# handled by a fixed pool of worker threads, each keeping its own long-lived
+# connection (see models.connection), and every write goes through one lock
+# so writers queue here rather than retrying on SQLITE_BUSY.
+#
+#   python -m models.service --host 0.0.0.0 --port 8765 --token <shared secret>
+#
+# Listening beyond this machine needs a token (or "service": {"token": ...});
+# terminals send it in the X-Service-Token header.
+# Every operation is POST /api/<name> with a JSON body {"args": [...],
+# "kwargs": {...}} and answers {"result": ...} or {"error": "..."}.
+# GET /api/ lists the operations; GET /health checks the database.
+# Terminals use it by setting "service": {"url": "http://host:8765", "token": ...}.
+
+DEFAULT_SERVICE_SETTINGS = DEFAULT_SETTINGS["service"]
+
+TOKEN_HEADER = "X-Service-Token"
+MAX_BODY_BYTES = 16 * 1024 * 1024
+
+
+def _catalog_snapshot():
+    current = catalog.get_catalog()
+    return {
+        "generation": current.generation,
+        "vendors": sorted(current.vendors.values()),
+        "items": sorted(current.items.values())
+    }
+
+
+# name -> (function, writes)
+OPERATIONS = {
+    "get_all_vendors": (database.get_all_vendors, False),
+    "get_all_items": (database.get_all_items, False),
+    "get_item_id_by_name": (database.get_item_id_by_name, False),
+    "get_all_invoices": (database.get_all_invoices, False),
+    "get_latest_invoice_id": (database.get_latest_invoice_id, False),
+    "get_invoices_page": (database.get_invoices_page, False),
+    "get_invoice_ids": (database.get_invoice_ids, False),
+    "get_invoice_totals": (database.get_invoice_totals, False),
+    "get_invoice_items": (database.get_invoice_items, False),
+    "get_invoice_details": (database.get_invoice_details, False),
+    "get_price_history": (database.get_price_history, False),
+    "search_items": (search.search_items, False),
+    "search_all": (search.search_all, False),
+    "catalog": (_catalog_snapshot, False),
+    "catalog_generation": (catalog.generation, False),
+    "add_vendor": (database.add_vendor, True),
+    "rename_vendor": (database.rename_vendor, True),
+    "soft_delete_vendor": (database.soft_delete_vendor, True),
+    "add_item": (database.add_item, True),
+    "rename_item": (database.rename_item, True),
+    "soft_delete_item": (database.soft_delete_item, True),
+    "create_blank_invoice": (database.create_blank_invoice, True),
+    "update_invoice": (database.update_invoice, True),
+    "delete_invoice": (database.delete_invoice, True),
+}
+
+
+def _encode(value):
+    if isinstance(value, sqlite3.Row):
+        return {"__row__": list(value.keys()), "values": list(value)}
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+class PooledHTTPServer(HTTPServer):
+    """HTTPServer that hands each request to a fixed pool of threads."""
+
+    def __init__(self, address, handler, workers=4, token=""):
+        super().__init__(address, handler)
+        self.token = token
+        self.write_lock = threading.Lock()
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="service")
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self._process, request, client_address)
+
+    def _process(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown(wait=True)
+
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    server_version = "WholesaleInvoiceService/1.0"
+    quiet = True
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+    def _send(self, status, body, content_type="application/json"):
+        if not isinstance(body, bytes):
+            body = json.dumps(body, default=_encode).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _authorized(self):
+        sent = self.headers.get(TOKEN_HEADER) or ""
+        if self.server.token and not hmac.compare_digest(sent.encode("utf-8"), self.server.token.encode("utf-8")):
+            self._send(401, {"error": "Missing or wrong service token."})
+            return False
+        return True
+
+    def do_GET(self):
+        if not self._authorized():
+            return
+        if self.path == "/health":
+            try:
+                get_connection().execute("SELECT 1").fetchone()
+            except sqlite3.Error as e:
+                self._send(503, {"status": "error", "error": str(e)})
+                return
+            self._send(200, {"status": "ok"})
+        elif self.path in ("/api", "/api/"):
+            self._send(200, {"result": {name: {"writes": writes} for name, (_f, writes) in OPERATIONS.items()}})
+        else:
+            self._send(404, {"error": f"Unknown path {self.path}"})
+
+    def do_POST(self):
+        if not self._authorized():
+            return
+        if not self.path.startswith("/api/"):
+            self._send(404, {"error": f"Unknown path {self.path}"})
+            return
+        name = self.path[len("/api/"):]
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            if length > MAX_BODY_BYTES:
+                self._send(413, {"error": "Request body too large."})
+                return
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            args = payload.get("args", [])
+            kwargs = payload.get("kwargs", {})
+        except (ValueError, AttributeError) as e:
+            self._send(400, {"error": f"Bad request body: {e}"})
+            return
+
+        if name == "export_invoice_pdf":
+            self._export_pdf(args, kwargs)
+            return
+        if name not in OPERATIONS:
+            self._send(404, {"error": f"Unknown operation '{name}'"})
+            return
+        func, writes = OPERATIONS[name]
+        try:
+            if writes:
+                with self.server.write_lock:
+                    result = func(*args, **kwargs)
+            else:
+                result = func(*args, **kwargs)
+        except sqlite3.IntegrityError as e:
+            self._send(409, {"error": str(e)})
+            return
+        except (TypeError, ValueError, KeyError) as e:
+            self._send(400, {"error": str(e)})
+            return
+        except Exception as e:
+            print(f"Service error in {name}: {e}")
+            self._send(500, {"error": str(e)})
+            return
+        self._send(200, {"result": result})
+
+    def _export_pdf(self, args, kwargs):
+        from models.pdf_export import export_invoice_pdf
+        fd, temp_path = tempfile.mkstemp(prefix="service-", suffix=".pdf")
+        os.close(fd)
+        try:
+            # Only reads the invoice database, so no write lock
+            export_invoice_pdf(*args, filepath=temp_path, **kwargs)
+            with open(temp_path, "rb") as f:
+                data = f.read()
+        except (TypeError, ValueError) as e:
+            self._send(400, {"error": str(e)})
+            return
+        except Exception as e:
+            print(f"Service error in export_invoice_pdf: {e}")
+            self._send(500, {"error": str(e)})
+            return
+        finally:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+        self._send(200, data, "application/pdf")
+
+
+def load_service_settings():
+    return get_section("service")
+
+
+def is_loopback(host):
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def create_server(host=None, port=None, workers=None, token=None):
+    """
+    Bind the service without starting it; call serve_forever() on the result.
+    Refuses a non-loopback host without a token, since every write operation
+    would otherwise be open to the network.
+    """
+    settings = load_service_settings()
+    host = host or settings["host"]
+    token = settings["token"] if token is None else token
+    if not token and not is_loopback(host):
+        raise ValueError(f"Refusing to listen on {host} without a service token; "
+                         "pass --token or set \"service\": {\"token\": ...} in the settings.")
+    return PooledHTTPServer(
+        (host, settings["port"] if port is None else port),
+        ServiceHandler,
+        workers=workers or settings["workers"],
+        token=token
+    )
+
+
+def serve_in_background(host="127.0.0.1", port=0, workers=None, token=None):
+    """Start a service on a daemon thread (port 0 picks a free one). Returns the server."""
+    server = create_server(host, port, workers, token)
+    threading.Thread(target=server.serve_forever, name="invoice-service", daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve the invoice database over HTTP/JSON.")
+    parser.add_argument("--host", help="address to listen on (default from settings)")
+    parser.add_argument("--port", type=int, help="port to listen on (default from settings)")
+    parser.add_argument("--workers", type=int, help="worker threads, one database connection each")
+    parser.add_argument("--token", help="shared secret clients must send (default from settings)")
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    args = parser.parse_args()
+
+    ServiceHandler.quiet = not args.verbose
+    try:
+        server = create_server(args.host, args.port, args.workers, args.token)
+    except ValueError as e:
+        parser.exit(2, f"{e}\n")
+    host, port = server.server_address[:2]
+    print(f"Serving {os.path.abspath(connection.DB_PATH)} on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
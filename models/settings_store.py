@@ -0,0 +1,210 @@
+import copy
+import json
+import os
+import tempfile
+import threading
+
+# -------------------
+# Settings Service
+# -------------------
+# Every module used to open and parse Data/settings.json on its own, often
+# several times per window. SettingsStore keeps one parsed copy, re-reads the
+# file only when its mtime or size changes, and writes through a temp file
+# that is renamed into place so a reader (or a second instance saving at the
+# same time) never sees a half-written file.
+
+SETTINGS_PATH = "Data/settings.json"
+
+DEFAULT_SETTINGS = {
+    "invoice_retention": {
+        "years": 2,
+        "months": 0
+    },
+    "row_colors": {
+        "even": "#f4f4f4",
+        "odd": "#ffffff"
+    },
+    "pdf_output_directory": "",
+    "defaults": {
+        "quantity": 1,
+        "unit_price": 0.0
+    },
+    "window_mode": "zoomed",
+    "virtual_grid": True,
+    "confirmations": {
+        "on_save": True,
+        "on_delete": True
+    },
+    "pdf_filename_format": "invoice_{id}_{date}",
+    "saved_invoices": {
+        "page_size": 200,
+        "poll_seconds": 0
+    },
+    "database": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size_kb": 16384,
+        "mmap_size_mb": 128,
+        "busy_timeout_ms": 5000
+    },
+    "pdf_archive": {
+        "path": "Data/pdf_archive.db",
+        "archive_after_days": 90,
+        "compression_level": 6
+    },
+    "pdf_cache": {
+        "enabled": True,
+        "directory": "Data/pdf_cache",
+        "max_size_mb": 256
+    },
+    "cleanup": {
+        "batch_size": 200,
+        "pause_ms": 50
+    },
+    "maintenance": {
+        "enabled": True,
+        "interval_hours": 24,
+        "idle_seconds": 120,
+        "vacuum_pages": 2000
+    },
+    "diagnostics": {
+        "enabled": True,
+        "slow_query_ms": 250,
+        "log_path": "Data/slow_queries.log",
+        "log_max_kb": 1024,
+        "log_backups": 3
+    },
+    "service": {
+        "url": "",
+        "host": "127.0.0.1",
+        "port": 8765,
+        "workers": 4,
+        "token": "",
+        "connect_timeout_seconds": 3,
+        "timeout_seconds": 30
+    }
+}
+
+
+def merge_defaults(settings, defaults=DEFAULT_SETTINGS):
+    """A copy of `settings` with any keys it lacks filled in from `defaults`."""
+    merged = copy.deepcopy(defaults)
+    for key, value in settings.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = merge_defaults(value, merged[key])
+        else:
+            merged[key] = value
+    return merged
+
+
+class SettingsStore:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._settings = None
+        self._signature = None
+        self._generation = 0
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _load(self):
+        """Re-read the file if it changed since the last read. Call with the lock held."""
+        signature = self._stat()
+        if self._settings is not None and signature == self._signature:
+            return
+        settings = {}
+        if signature is not None:
+            try:
+                with open(self.path, "r") as f:
+                    settings = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Could not read settings: {e}")
+                if self._settings is not None:
+                    # Keep the last good copy; try again once the file changes
+                    self._signature = signature
+                    return
+        merged = merge_defaults(settings)
+        if merged != self._settings:
+            self._generation += 1
+        self._settings = merged
+        self._signature = signature
+
+    def get(self):
+        """All settings with defaults filled in. The caller gets its own copy."""
+        with self._lock:
+            self._load()
+            return copy.deepcopy(self._settings)
+
+    def section(self, name):
+        with self._lock:
+            self._load()
+            return copy.deepcopy(self._settings.get(name, {}))
+
+    def generation(self):
+        """Changes whenever the settings do, whether saved here or by another instance."""
+        with self._lock:
+            self._load()
+            return self._generation
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def save(self, settings):
+        merged = merge_defaults(settings)
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            fd, temp_path = tempfile.mkstemp(prefix=".settings-", suffix=".tmp", dir=directory)
+            try:
+                if os.path.exists(self.path):
+                    os.chmod(temp_path, os.stat(self.path).st_mode & 0o777)
+                with os.fdopen(fd, "w") as f:
+                    json.dump(merged, f, indent=4)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(temp_path, self.path)
+            except BaseException:
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+                raise
+            if merged != self._settings:
+                self._generation += 1
+            self._settings = merged
+            self._signature = self._stat()
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(path=None):
+    """One store per settings file (SETTINGS_PATH, relative to the working directory, by default)."""
+    key = os.path.abspath(path or SETTINGS_PATH)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = SettingsStore(key)
+        return store
+
+
+def get_settings():
+    return get_store().get()
+
+
+def get_section(name):
+    return get_store().section(name)
+
+
+def save_settings(settings):
+    get_store().save(settings)
+
+
+def settings_generation():
+    return get_store().generation()
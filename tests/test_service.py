@@ -0,0 +1,79 @@
+import json
+import os
+import tempfile
+import unittest
+from models import connection, database, remote_client, settings_store
+from models.connection import close_all_connections
+from models.service import serve_in_background
+
+# Runs the invoice service on a scratch database and drives it through
+# models.remote_client, the way a terminal in remote mode does:
+#
+#   python -m unittest discover tests
+
+
+class ServiceRoundTripTest(unittest.TestCase):
+
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory(prefix="wholesale_service_")
+        self.saved_paths = (connection.DB_PATH, settings_store.SETTINGS_PATH)
+        close_all_connections()
+        connection.DB_PATH = os.path.join(self.workdir.name, "invoice.db")
+        settings_store.SETTINGS_PATH = os.path.join(self.workdir.name, "settings.json")
+        self.write_service_settings(url="", token="")
+
+        database.add_vendor("Test Vendor")
+        database.add_item("Test Item", "T-1")
+        self.vendor_id = database.get_all_vendors()[0][0]
+        self.item_id = database.get_all_items()[0][0]
+
+        self.server = serve_in_background(port=0, token="secret")
+        self.write_service_settings(url=f"http://127.0.0.1:{self.server.server_address[1]}", token="secret")
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        close_all_connections()
+        connection.DB_PATH, settings_store.SETTINGS_PATH = self.saved_paths
+        self.workdir.cleanup()
+
+    def write_service_settings(self, **service):
+        settings = settings_store.merge_defaults({"service": service, "diagnostics": {"enabled": False}})
+        with open(settings_store.SETTINGS_PATH, "w") as f:
+            json.dump(settings, f)
+
+    def line(self, quantity, unit_price):
+        return {"vendor_id": self.vendor_id, "item_id": self.item_id,
+                "quantity": quantity, "unit_price": unit_price, "optional_info": "note"}
+
+    def test_update_invoice_round_trip(self):
+        invoice_id = remote_client.create_blank_invoice()
+        new_ids = remote_client.update_invoice(invoice_id, inserts=[self.line(2, 1.5), self.line(3, 2.0)])
+        self.assertEqual(len(new_ids), 2)
+
+        rows = remote_client.get_invoice_items(invoice_id)
+        self.assertEqual([row["quantity"] for row in rows], [2, 3])
+        self.assertEqual(rows[0]["vendor_name"], "Test Vendor")
+
+        # The editor hands over its deleted ids as a set
+        update = dict(self.line(5, 1.5), existing_id=new_ids[0])
+        remote_client.update_invoice(invoice_id, updates=[update], deletes={new_ids[1]})
+        rows = remote_client.get_invoice_items(invoice_id)
+        self.assertEqual([(row["invoice_item_id"], row["quantity"]) for row in rows], [(new_ids[0], 5)])
+
+    def test_update_invoice_leaves_other_invoices_alone(self):
+        first = remote_client.create_blank_invoice()
+        second = remote_client.create_blank_invoice()
+        (line_id,) = remote_client.update_invoice(first, inserts=[self.line(1, 1.0)])
+        remote_client.update_invoice(second, deletes=[line_id])
+        self.assertEqual(len(remote_client.get_invoice_items(first)), 1)
+
+    def test_wrong_token_is_rejected(self):
+        self.write_service_settings(url=f"http://127.0.0.1:{self.server.server_address[1]}", token="wrong")
+        with self.assertRaises(remote_client.ServiceError) as raised:
+            remote_client.get_latest_invoice_id()
+        self.assertEqual(raised.exception.status, 401)
+
+
+if __name__ == "__main__":
+    unittest.main()
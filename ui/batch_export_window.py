@@ -0,0 +1,137 @@
+import os
+import queue
+import threading
+import tkinter as tk
+from tkinter import ttk, filedialog, messagebox
+from datetime import datetime
+from models.pdf_export import export_invoices
+from ui.settings import load_settings, watch_settings
+
+
+class BatchExportWindow(tk.Toplevel):
+    def __init__(self, master=None):
+        super().__init__(master)
+        self.title("🖨 Batch Export PDFs")
+        self.geometry("520x420")
+        self.settings = load_settings()
+
+        self.events = queue.Queue()
+        self.worker = None
+
+        self.create_widgets()
+        watch_settings(self, self.on_settings_changed)
+
+    def on_settings_changed(self, settings):
+        # Follow a new default folder unless one was picked here
+        if self.output_var.get() == self.settings.get("pdf_output_directory", ""):
+            self.output_var.set(settings.get("pdf_output_directory", ""))
+        self.settings = settings
+
+    def create_widgets(self):
+        frame = ttk.Frame(self, padding=10)
+        frame.pack(fill="both", expand=True)
+
+        today = datetime.now()
+        ttk.Label(frame, text="From (YYYY-MM-DD):").grid(row=0, column=0, sticky="w")
+        self.start_var = tk.StringVar(value=today.replace(day=1).strftime("%Y-%m-%d"))
+        ttk.Entry(frame, textvariable=self.start_var, width=15).grid(row=0, column=1, sticky="w")
+
+        ttk.Label(frame, text="To (YYYY-MM-DD):").grid(row=1, column=0, sticky="w")
+        self.end_var = tk.StringVar(value=today.strftime("%Y-%m-%d"))
+        ttk.Entry(frame, textvariable=self.end_var, width=15).grid(row=1, column=1, sticky="w")
+
+        ttk.Label(frame, text="Or Invoice IDs (comma separated):").grid(row=2, column=0, sticky="w", pady=(10, 0))
+        self.ids_var = tk.StringVar()
+        ttk.Entry(frame, textvariable=self.ids_var, width=30).grid(row=2, column=1, columnspan=2, sticky="w", pady=(10, 0))
+
+        ttk.Label(frame, text="Output Directory:").grid(row=3, column=0, sticky="w", pady=(10, 0))
+        self.output_var = tk.StringVar(value=self.settings.get("pdf_output_directory", ""))
+        ttk.Entry(frame, textvariable=self.output_var, width=30).grid(row=3, column=1, sticky="w", pady=(10, 0))
+        ttk.Button(frame, text="Browse", command=self.browse_output_dir).grid(row=3, column=2, pady=(10, 0))
+
+        ttk.Label(frame, text="Worker Processes:").grid(row=4, column=0, sticky="w")
+        self.workers_var = tk.IntVar(value=os.cpu_count() or 1)
+        ttk.Spinbox(frame, from_=1, to=64, textvariable=self.workers_var, width=5).grid(row=4, column=1, sticky="w")
+
+        self.start_button = ttk.Button(frame, text="Start Export", command=self.start_export)
+        self.start_button.grid(row=5, column=0, columnspan=3, pady=10)
+
+        self.progress = ttk.Progressbar(frame, mode="determinate")
+        self.progress.grid(row=6, column=0, columnspan=3, sticky="ew")
+        self.status_label = ttk.Label(frame, text="")
+        self.status_label.grid(row=7, column=0, columnspan=3, sticky="w")
+
+        self.failures = tk.Listbox(frame, height=8)
+        self.failures.grid(row=8, column=0, columnspan=3, sticky="nsew", pady=(5, 0))
+        frame.columnconfigure(1, weight=1)
+        frame.rowconfigure(8, weight=1)
+
+    def browse_output_dir(self):
+        directory = filedialog.askdirectory()
+        if directory:
+            self.output_var.set(directory)
+
+    def start_export(self):
+        if self.worker and self.worker.is_alive():
+            return
+        try:
+            ids_text = self.ids_var.get().strip()
+            invoice_ids = [int(i) for i in ids_text.split(",") if i.strip()] if ids_text else None
+            start_date = self.start_var.get().strip() or None
+            end_date = self.end_var.get().strip() or None
+            for value in (start_date, end_date):
+                if value:
+                    datetime.strptime(value, "%Y-%m-%d")
+            workers = int(self.workers_var.get())
+        except ValueError:
+            messagebox.showerror("Invalid Input", "Check the dates (YYYY-MM-DD), invoice ids and worker count.")
+            return
+
+        self.failures.delete(0, tk.END)
+        self.progress["value"] = 0
+        self.status_label.config(text="Starting...")
+        self.start_button.config(state="disabled")
+
+        def run():
+            try:
+                summary = export_invoices(
+                    invoice_ids, start_date, end_date,
+                    output_dir=self.output_var.get().strip() or None,
+                    workers=workers,
+                    progress=lambda *args: self.events.put(("progress", args))
+                )
+                self.events.put(("done", summary))
+            except Exception as e:
+                self.events.put(("error", e))
+
+        self.worker = threading.Thread(target=run, daemon=True)
+        self.worker.start()
+        self.after(100, self.poll_events)
+
+    def poll_events(self):
+        try:
+            while True:
+                kind, payload = self.events.get_nowait()
+                if kind == "progress":
+                    done, total, invoice_id, error = payload
+                    self.progress["maximum"] = total
+                    self.progress["value"] = done
+                    self.status_label.config(text=f"Exported {done} of {total}")
+                    if error:
+                        self.failures.insert(tk.END, f"Invoice {invoice_id}: {error}")
+                elif kind == "done":
+                    self.start_button.config(state="normal")
+                    self.status_label.config(
+                        text=f"Done: {len(payload['exported'])} exported, {len(payload['failed'])} failed "
+                             f"in {payload['seconds']:.1f}s"
+                    )
+                    return
+                elif kind == "error":
+                    self.start_button.config(state="normal")
+                    self.status_label.config(text="")
+                    messagebox.showerror("Export Failed", f"Batch export failed: {payload}")
+                    return
+        except queue.Empty:
+            pass
+        if self.winfo_exists():
+            self.after(100, self.poll_events)
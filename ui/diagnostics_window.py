@@ -0,0 +1,127 @@
+import os
+import tkinter as tk
+from tkinter import ttk, messagebox
+from models.query_stats import get_query_stats, explain_statement
+from ui.task_runner import TaskRunner
+
+
+class DiagnosticsWindow(tk.Toplevel):
+    COLUMNS = (
+        ("calls", "Calls", 60),
+        ("total", "Total ms", 80),
+        ("p50", "p50 ms", 70),
+        ("p95", "p95 ms", 70),
+        ("max", "Max ms", 70),
+        ("rows", "Rows", 70),
+        ("caller", "Called From", 200),
+        ("sql", "Statement", 420),
+    )
+
+    def __init__(self, master=None):
+        super().__init__(master)
+        self.title("🩺 Query Diagnostics")
+        self.geometry("1100x600")
+        self.stats = get_query_stats()
+        self.tasks = TaskRunner(self)
+        self.statements = {}
+
+        self.create_widgets()
+        self.refresh()
+
+    def create_widgets(self):
+        list_frame = ttk.Frame(self)
+        list_frame.pack(fill="both", expand=True, padx=10, pady=(10, 5))
+        self.tree = ttk.Treeview(list_frame, columns=[c[0] for c in self.COLUMNS], show="headings")
+        for key, title, width in self.COLUMNS:
+            self.tree.heading(key, text=title)
+            self.tree.column(key, width=width, anchor="w" if key in ("caller", "sql") else "e")
+        scrollbar = ttk.Scrollbar(list_frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.pack(side="left", fill="both", expand=True)
+        scrollbar.pack(side="right", fill="y")
+        self.tree.bind("<<TreeviewSelect>>", self.show_plan)
+
+        plan_frame = ttk.LabelFrame(self, text="Query Plan (slowest call)")
+        plan_frame.pack(fill="x", padx=10, pady=5)
+        self.plan_text = tk.Text(plan_frame, height=8, wrap="none", state="disabled")
+        self.plan_text.pack(fill="x", padx=5, pady=5)
+
+        btn_frame = ttk.Frame(self)
+        btn_frame.pack(fill="x", padx=10, pady=(0, 10))
+        ttk.Button(btn_frame, text="Refresh", command=self.refresh).pack(side="left", padx=5)
+        ttk.Button(btn_frame, text="Reset", command=self.reset).pack(side="left", padx=5)
+        ttk.Button(btn_frame, text="Open Slow Query Log", command=self.open_log).pack(side="left", padx=5)
+        self.status_label = ttk.Label(btn_frame, text="")
+        self.status_label.pack(side="left", padx=10)
+        ttk.Button(btn_frame, text="Close", command=self.destroy).pack(side="right", padx=5)
+
+    def refresh(self):
+        snapshot = self.stats.snapshot()
+        self.statements = {}
+        self.tree.delete(*self.tree.get_children())
+        for stmt in snapshot:
+            iid = self.tree.insert("", "end", values=(
+                f"{stmt['calls']:,}",
+                f"{stmt['total'] * 1000:,.1f}",
+                f"{stmt['p50'] * 1000:,.2f}",
+                f"{stmt['p95'] * 1000:,.2f}",
+                f"{stmt['max'] * 1000:,.2f}",
+                f"{stmt['rows']:,}",
+                stmt["caller"],
+                stmt["sql"][:300]
+            ))
+            self.statements[iid] = stmt
+
+        total = sum(stmt["total"] for stmt in snapshot)
+        self.status_label.config(
+            text=f"{len(snapshot)} statements, {total:,.2f}s total. "
+                 f"Slower than {self.stats.slow_seconds * 1000:.0f} ms is logged to {self.stats.log_path}"
+        )
+        if snapshot:
+            # Start on the statement with the worst tail latency
+            slowest = max(self.statements, key=lambda iid: self.statements[iid]["p95"])
+            self.tree.selection_set(slowest)
+            self.tree.see(slowest)
+        else:
+            self.set_plan("")
+
+    def show_plan(self, event=None):
+        selected = self.tree.selection()
+        if not selected:
+            return
+        stmt = self.statements[selected[0]]
+        self.tasks.submit(
+            explain_statement, stmt,
+            key="plan",
+            on_done=lambda plan: self.set_plan(stmt["slowest_sql"].strip() + "\n\n" + ("\n".join(plan) or "(no plan for this statement)")),
+            on_error=lambda e: self.set_plan(f"Could not explain statement: {e}")
+        )
+
+    def set_plan(self, text):
+        self.plan_text.config(state="normal")
+        self.plan_text.delete("1.0", "end")
+        self.plan_text.insert("1.0", text)
+        self.plan_text.config(state="disabled")
+
+    def reset(self):
+        self.stats.reset()
+        self.refresh()
+
+    def open_log(self):
+        path = self.stats.log_path
+        if not os.path.exists(path):
+            messagebox.showinfo("Slow Query Log", "No slow queries have been logged yet.", parent=self)
+            return
+        log = tk.Toplevel(self)
+        log.title(os.path.basename(path))
+        log.geometry("900x400")
+        text = tk.Text(log, wrap="none")
+        text.pack(fill="both", expand=True)
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            text.insert("1.0", f.read())
+        text.see("end")
+        text.config(state="disabled")
+
+    def destroy(self):
+        self.tasks.close()
+        super().destroy()
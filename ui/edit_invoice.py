@@ -1,10 +1,14 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-from models import database
-from models.generate_pdf import generate_pdf_invoice
-from ui.settings import load_settings
+from models.backend import database, get_catalog, search_items, export_invoice_pdf, is_remote
+from models.pdf_export import build_pdf_filename
+from models.invoice_import import import_line_items
+from ui.settings import load_settings, watch_settings
 from datetime import datetime
 from ui.widgets import AutocompleteCombobox
+from ui.virtual_grid import VirtualTreeview
+from ui.invoice_browser import InvoiceBrowser
+from ui.task_runner import TaskRunner
 import os
 import platform
 import subprocess
@@ -28,27 +32,23 @@ class EditInvoiceWindow(tk.Toplevel):
 
         self.even_color = self.settings["row_colors"].get("even", "#f4f4f4")
         self.odd_color = self.settings["row_colors"].get("odd", "#ffffff")
+        self.virtual_grid = self.settings.get("virtual_grid", True)
 
         self.NewInvoiceFlag = NewInvoice
         self.selected_invoice_id = invoice_db_id
         self.invoice_items = []
         self.tree_full_data = {}
         self.deleted_ids = set()
+        self.dirty_rows = set()
         self.invoice_info_label = None
         self.unsaved_changes = False
-        
-        self.vendor_list = sorted(database.get_all_vendors(), key=lambda v: v[1].lower())
-        self.item_list = sorted([i[1] for i in database.get_all_items()], key=lambda name: name.lower())
-
+        self.tasks = TaskRunner(self, on_busy=self.show_busy)
 
-        if invoice_db_id is None:
-            self.invoices = database.get_all_invoices()
-            if self.invoices:
-                self.selected_invoice_id = self.invoices[0][0]
-        else:
-            self.invoices = []
+        # Filled in by apply_catalog once the catalog has loaded in the background
+        self.catalog = None
+        self.vendor_list = []
+        self.item_list = []
 
-    
         self.setup_invoice_selector()
         ttk.Separator(self, orient="horizontal").pack(fill='x', padx=10, pady=5)
         self.setup_treeview()
@@ -57,22 +57,58 @@ class EditInvoiceWindow(tk.Toplevel):
         ttk.Separator(self, orient="horizontal").pack(fill='x', padx=10, pady=5)
         self.setup_buttons()
 
-        if invoice_db_id:
-            self.load_invoice_items_from_id(invoice_db_id)
+        self.refresh_catalog(
+            on_error=lambda e: messagebox.showerror("Error", f"Could not load vendors and items: {e}", parent=self)
+        )
         if self.selected_invoice_id:
             self.load_invoice_items_from_id(self.selected_invoice_id)
+        elif invoice_db_id is None:
+            # Keyed like a load, so saving waits for it and picking an invoice replaces it
+            self.tasks.submit(
+                database.get_latest_invoice_id,
+                key="invoice",
+                on_done=lambda invoice_id: invoice_id and self.load_invoice_items_from_id(invoice_id),
+                on_error=lambda e: messagebox.showerror("Error", f"Failed to load invoice: {e}", parent=self)
+            )
+        watch_settings(self, self.on_settings_changed)
+
+    def refresh_catalog(self, on_error=None):
+        # get_catalog can be a round trip to the invoice service, so never on the Tk thread
+        self.tasks.submit(
+            get_catalog,
+            key="catalog",
+            on_done=self.apply_catalog,
+            on_error=on_error or (lambda e: print(f"Could not refresh vendors and items: {e}"))
+        )
+
+    def apply_catalog(self, catalog):
+        if catalog is self.catalog:
+            return
+        self.catalog = catalog
+        self.vendor_list = sorted(catalog.active_vendors(), key=lambda v: v[1].lower())
+        self.item_list = sorted([i[1] for i in catalog.active_items()], key=lambda name: name.lower())
+        self.vendor_combo.set_completion_list([v[1] for v in self.vendor_list])
+        self.item_combo.set_completion_list(self.item_list)
+        self.prefill_unit_price()
+
+    def on_settings_changed(self, settings):
+        # Confirmations, defaults and the export folder are read from
+        # self.settings when used; row colours need re-applying
+        self.settings = settings
+        self.even_color = settings["row_colors"].get("even", "#f4f4f4")
+        self.odd_color = settings["row_colors"].get("odd", "#ffffff")
+        self.tree.tag_configure('evenrow', background=self.even_color)
+        self.tree.tag_configure('oddrow', background=self.odd_color)
 
     def setup_invoice_selector(self):
         frame = ttk.LabelFrame(self, text="📄 Invoice Selection")
         frame.pack(fill='x', padx=10, pady=5)
+        self.busy_label = ttk.Label(frame, text="", foreground="gray")
+        self.busy_label.pack(side="right", padx=10)
         if self.NewInvoiceFlag:
             ttk.Label(frame, text=f"Invoice ID: {self.selected_invoice_id}").pack(side="left")
             return
-        self.invoice_var = tk.StringVar()
-        invoice_options = [f"{inv[1]} | Invoice ID: {inv[0]}" for inv in self.invoices]
-        self.invoice_menu = ttk.Combobox(frame, textvariable=self.invoice_var, values=invoice_options, state="readonly", width=40)
-        self.invoice_menu.pack(side="left", padx=10)
-        self.invoice_menu.bind("<<ComboboxSelected>>", self.load_invoice_items)
+        ttk.Button(frame, text="Browse Invoices...", command=self.open_invoice_browser).pack(side="left", padx=10)
 
     def setup_treeview(self):
         tree_frame = ttk.LabelFrame(self, text="📦 Line Items")
@@ -81,7 +117,10 @@ class EditInvoiceWindow(tk.Toplevel):
         tree_frame.pack(fill='both', expand=True, padx=10, pady=5)
 
         columns = ("vendor", "item", "quantity", "price", "optional_info")
-        self.tree = ttk.Treeview(tree_frame, columns=columns, show="headings", height=18)
+        if self.virtual_grid:
+            self.tree = VirtualTreeview(tree_frame, columns=columns, show="headings", height=18)
+        else:
+            self.tree = ttk.Treeview(tree_frame, columns=columns, show="headings", height=18)
         for col in columns:
             self.tree.heading(col, text=col.replace("_", " ").title())
             self.tree.column(col, anchor="center")
@@ -105,12 +144,13 @@ class EditInvoiceWindow(tk.Toplevel):
                 values = list(self.tree.item(row_id)['values'])
                 values[col] = new_val
                 self.tree.item(row_id, values=values)
+                if self.tree_full_data[row_id].get("existing_id") is not None:
+                    self.dirty_rows.add(row_id)
+                catalog = self.catalog
                 if col == 0:
-                    vendor_id = next((v[0] for v in self.vendor_list if v[1] == new_val), None)
-                    self.tree_full_data[row_id]['vendor_id'] = vendor_id
+                    self.tree_full_data[row_id]['vendor_id'] = catalog.vendor_id(new_val)
                 elif col == 1:
-                    item_id = database.get_item_id_by_name(new_val)
-                    self.tree_full_data[row_id]['item_id'] = item_id
+                    self.tree_full_data[row_id]['item_id'] = catalog.item_id(new_val)
                 combo.destroy()
 
             def save_entry(event):
@@ -129,6 +169,8 @@ class EditInvoiceWindow(tk.Toplevel):
                         self.tree_full_data[row_id]['optional_info'] = new_val_cast
                     values[col] = new_val_cast
                     self.tree.item(row_id, values=values)
+                    if self.tree_full_data[row_id].get("existing_id") is not None:
+                        self.dirty_rows.add(row_id)
                 except ValueError:
                     messagebox.showerror("Invalid Input", f"Invalid value for {columns[col]}.")
                 entry.destroy()
@@ -162,12 +204,14 @@ class EditInvoiceWindow(tk.Toplevel):
 
         ttk.Label(frame, text="Vendor:").grid(row=0, column=0, padx=5, sticky="w")
         self.vendor_combo = AutocompleteCombobox(frame, textvariable=self.new_vendor_var, width=20)
-        self.vendor_combo.set_completion_list([v[1] for v in self.vendor_list])
+        self.vendor_combo.set_completion_list([])
         self.vendor_combo.grid(row=2, column=0, padx=5)
         
         ttk.Label(frame, text="Item:").grid(row=0, column=1, padx=5, sticky="w")
         self.item_combo = AutocompleteCombobox(frame, textvariable=self.new_item_var, width=25)
-        self.item_combo.set_completion_list(self.item_list)
+        self.item_combo.set_completion_list([])
+        # Lets the box find items by item code or by a word in the middle of the name
+        self.item_combo.set_search_provider(lambda text: [row[1] for row in search_items(text)], tasks=self.tasks)
         self.item_combo.grid(row=2, column=1, padx=5)
         
         ttk.Label(frame, text="Quantity:").grid(row=0, column=2, padx=5, sticky="w")
@@ -179,6 +223,48 @@ class EditInvoiceWindow(tk.Toplevel):
         ttk.Label(frame, text="Optional Info:").grid(row=0, column=4, padx=5, sticky="w")
         ttk.Entry(frame, textvariable=self.new_info_var, width=25).grid(row=2, column=4)
         ttk.Button(frame, text="Add Row", command=self.add_new_row_to_table).grid(row=2, column=5, padx=10)
+        ttk.Button(frame, text="Import File...", command=self.import_from_file).grid(row=2, column=6, padx=5)
+
+        self.price_hint_label = ttk.Label(frame, text="", foreground="gray")
+        self.price_hint_label.grid(row=3, column=3, columnspan=3, sticky="w", padx=5)
+        self.price_pair = None
+        self.new_vendor_var.trace_add("write", lambda *args: self.prefill_unit_price())
+        self.new_item_var.trace_add("write", lambda *args: self.prefill_unit_price())
+
+    def prefill_unit_price(self):
+        if self.catalog is None:
+            return
+        vendor_name = self.new_vendor_var.get()
+        item_name = self.new_item_var.get()
+        vendor_id = self.catalog.vendor_id(vendor_name)
+        item_id = self.catalog.item_id(item_name)
+        if (vendor_name and vendor_id is None) or (item_name and item_id is None):
+            # Maybe added since the catalog loaded (e.g. on another terminal)
+            self.refresh_catalog()
+        pair = (vendor_id, item_id) if vendor_id is not None and item_id is not None else None
+        if pair == self.price_pair:
+            return
+        self.price_pair = pair
+        if pair is None:
+            self.price_hint_label.config(text="")
+            return
+        self.tasks.submit(
+            database.get_price_history, *pair,
+            key="price",
+            on_done=lambda history: self.show_price_history(pair, history)
+        )
+
+    def show_price_history(self, pair, history):
+        if pair != self.price_pair:
+            return
+        if history is None:
+            self.price_hint_label.config(text="Not bought from this vendor before")
+            return
+        self.new_price_var.set(history["last"])
+        self.price_hint_label.config(
+            text=f"Last ${history['last']:.2f}  Avg ${history['average']:.2f}  "
+                 f"Range ${history['min']:.2f}-${history['max']:.2f} ({history['count']} lines)"
+        )
 
     def setup_buttons(self):
         frame = ttk.LabelFrame(self, text="🛠 Actions")
@@ -197,8 +283,14 @@ class EditInvoiceWindow(tk.Toplevel):
         if not item_name or not vendor_name:
             messagebox.showwarning("Missing Info", "Please select both item and vendor.")
             return
-        item_id = database.get_item_id_by_name(item_name)
-        vendor_id = next((v[0] for v in self.vendor_list if v[1] == vendor_name), None)
+        if self.catalog is None:
+            messagebox.showinfo("Still Loading", "Wait for the vendors and items to finish loading.")
+            return
+        catalog = self.catalog
+        item_id = catalog.item_id(item_name)
+        vendor_id = catalog.vendor_id(vendor_name)
+        self.vendor_combo.record_use(vendor_name)
+        self.item_combo.record_use(item_name)
         index = len(self.tree.get_children())
         tag = 'evenrow' if index % 2 == 0 else 'oddrow'
         row_id = self.tree.insert("", "end", values=(vendor_name, item_name, qty, price, info), tags=(tag,))
@@ -211,6 +303,59 @@ class EditInvoiceWindow(tk.Toplevel):
             "existing_id": None
         }
 
+    def import_from_file(self):
+        if is_remote():
+            messagebox.showinfo("Import", "Importing files writes to the database directly; run it on the service machine (cli.py import).")
+            return
+        if not self.selected_invoice_id:
+            messagebox.showerror("No Invoice", "Please select an invoice to import into.")
+            return
+        if self.unsaved_changes:
+            confirm = messagebox.askyesno("Unsaved Changes", "There are unsaved changes.\nDo you want to save before importing?")
+            if not confirm:
+                return
+            if not self.save_changes():
+                return
+
+        path = filedialog.askopenfilename(
+            title="Import Line Items",
+            filetypes=[("Spreadsheet Files", "*.csv *.tsv *.txt"), ("All Files", "*.*")]
+        )
+        if not path:
+            return
+        error_path = os.path.splitext(path)[0] + "_rejected.csv"
+        invoice_id = self.selected_invoice_id
+        self.tasks.submit(
+            import_line_items,
+            invoice_id,
+            path,
+            error_path=error_path,
+            default_unit_price=self.settings["defaults"].get("unit_price", 0.0),
+            on_done=lambda report: self.on_import_finished(invoice_id, report, error_path),
+            on_error=lambda e: messagebox.showerror("Import Failed", f"Could not import file: {e}")
+        )
+
+    def on_import_finished(self, invoice_id, report, error_path):
+        if invoice_id == self.selected_invoice_id:
+            # Reloading shows the imported rows but drops edits made while it ran
+            reload = True
+            if self.unsaved_changes:
+                reload = messagebox.askyesno(
+                    "Unsaved Changes",
+                    "The import has finished, but this invoice has unsaved changes.\n"
+                    "Reload it to show the imported rows and discard those changes?"
+                )
+            if reload:
+                self.unsaved_changes = False
+                self.load_invoice_items_from_id(invoice_id)
+        summary = f"Imported {report['rows_imported']} of {report['rows_read']} rows."
+        if report["rows_rejected"]:
+            summary += f"\n{report['rows_rejected']} rows were rejected; see:\n{error_path}"
+            messagebox.showwarning("Import Finished", summary)
+        else:
+            os.remove(error_path)
+            messagebox.showinfo("Import Finished", summary)
+
     def delete_selected_row(self):
         self.unsaved_changes = True
         if not self.tree.selection():
@@ -226,43 +371,31 @@ class EditInvoiceWindow(tk.Toplevel):
                 if existing_id is not None:
                     self.deleted_ids.add(existing_id)
                 del self.tree_full_data[row_id]
+                self.dirty_rows.discard(row_id)
             self.tree.delete(row_id)
 
         self.reapply_row_tags()
 
     def save_changes(self):
+        """Save the edited rows; returns True only if the invoice was saved."""
         if not self.selected_invoice_id:
-            return
+            return False
+        if self.tasks.is_pending("invoice"):
+            messagebox.showinfo("Still Loading", "Wait for the invoice to finish loading before saving.")
+            return False
 
         if self.settings.get("confirmations", {}).get("on_save", True):
             confirm = messagebox.askyesno("Save Changes", "Are you sure you want to save all changes to this invoice?")
-            self.unsaved_changes = False
             if not confirm:
-                return
+                return False
 
-        updated_items = []
-        for row_id in self.tree.get_children():
-            data = self.tree_full_data[row_id]
-            if data.get("existing_id") is not None:
-                updated_items.append({
-                    "existing_id": data["existing_id"],
-                    "vendor_id": data["vendor_id"],
-                    "item_id": data["item_id"],
-                    "quantity": data["quantity"],
-                    "unit_price": data["unit_price"],
-                    "optional_info": data["optional_info"]
-                })
-            else:
-                updated_items.append({
-                    "vendor_id": data["vendor_id"],
-                    "item_id": data["item_id"],
-                    "quantity": data["quantity"],
-                    "unit_price": data["unit_price"],
-                    "optional_info": data["optional_info"]
-                })
+        insert_rows = [row_id for row_id in self.tree.get_children()
+                       if self.tree_full_data[row_id].get("existing_id") is None]
+        inserts = [self.tree_full_data[row_id] for row_id in insert_rows]
+        updates = [self.tree_full_data[row_id] for row_id in self.dirty_rows]
 
         try:
-            if not updated_items and not self.tree.get_children():
+            if not self.tree.get_children():
                 confirm_delete = messagebox.askyesno("Delete Empty Invoice", "There are no items left. Delete the invoice?")
                 if confirm_delete:
                     database.delete_invoice(self.selected_invoice_id)
@@ -272,38 +405,70 @@ class EditInvoiceWindow(tk.Toplevel):
                     elif hasattr(self.master, 'refresh'):
                         self.master.refresh()
                     self.destroy()
-                    return
+                    return False
                 else:
-                    return
+                    return False
 
-            database.update_invoice(self.selected_invoice_id, items=updated_items, deleted_ids=self.deleted_ids)
-            self.load_invoice_items_from_id(self.selected_invoice_id)
+            new_ids = database.update_invoice(
+                self.selected_invoice_id,
+                inserts=inserts,
+                updates=updates,
+                deletes=self.deleted_ids
+            )
+            for row_id, new_id in zip(insert_rows, new_ids):
+                self.tree_full_data[row_id]["existing_id"] = new_id
+            self.dirty_rows.clear()
+            self.deleted_ids.clear()
+            self.unsaved_changes = False
             messagebox.showinfo("Success", "Invoice updated successfully.")
+            return True
         except Exception as e:
             messagebox.showerror("Error", f"Failed to update invoice: {e}")
+            return False
 
     def load_invoice_items_from_id(self, invoice_id):
         self.tree.delete(*self.tree.get_children())
         self.tree_full_data.clear()
-        self.invoice_items = database.get_invoice_items(invoice_id)
+        self.dirty_rows.clear()
+        self.deleted_ids.clear()
+        self.invoice_items = []
         self.selected_invoice_id = invoice_id
-        details = database.get_invoice_details(invoice_id)
+        if self.invoice_info_label:
+            self.invoice_info_label.config(text=f"🧾 Invoice ID: {invoice_id}   Loading...")
+        # Keyed so that picking another invoice drops this load if it is still running
+        self.tasks.submit(
+            self.fetch_invoice, invoice_id,
+            key="invoice",
+            on_done=self.show_invoice_items,
+            on_error=lambda e: messagebox.showerror("Error", f"Failed to load invoice: {e}")
+        )
+
+    @staticmethod
+    def fetch_invoice(invoice_id):
+        # Runs on a worker thread
+        return invoice_id, database.get_invoice_items(invoice_id), database.get_invoice_details(invoice_id)
+
+    def show_invoice_items(self, result):
+        invoice_id, invoice_items, details = result
+        if invoice_id != self.selected_invoice_id:
+            return
+        self.invoice_items = invoice_items
         if details and self.invoice_info_label:
             date_str = datetime.strptime(details["date"], "%Y-%m-%d").strftime("%B %d, %Y")
             self.invoice_info_label.config(text=f"🧾 Invoice ID: {details['id']}   📅 Date: {date_str}")
 
-        for index, item in enumerate(self.invoice_items):
+        # Rows added while the invoice was loading stay at the top
+        offset = len(self.tree.get_children())
+        for index, item in enumerate(self.invoice_items, start=offset):
             tag = 'evenrow' if index % 2 == 0 else 'oddrow'
             item_id = item["item_id"]
+            vendor_id = item["vendor_id"]
             vendor_name = item["vendor_name"]
             item_name = item["item_name"]
             quantity = item["quantity"]
             unit_price = item["unit_price"]
             optional_info = item["optional_info"] if item["optional_info"] else ""
 
-            # Get vendor_id from name
-            vendor_id = next((v[0] for v in self.vendor_list if v[1] == vendor_name), None)
-
             row_id = self.tree.insert(
                 "", "end",
                 values=(vendor_name, item_name, quantity, unit_price, optional_info),
@@ -319,15 +484,22 @@ class EditInvoiceWindow(tk.Toplevel):
                 "optional_info": optional_info
             }
 
-    def load_invoice_items(self, event=None):
-        selection = self.invoice_menu.get()
-        if not selection:
-            return
-        invoice_index = self.invoice_menu.current()
-        self.selected_invoice_id = self.invoices[invoice_index][0]
-        self.load_invoice_items_from_id(self.selected_invoice_id)
+    def show_busy(self, busy):
+        self.busy_label.config(text="⏳ Working..." if busy else "")
+
+    def destroy(self):
+        self.tasks.close()
+        super().destroy()
+
+    def open_invoice_browser(self):
+        browser = InvoiceBrowser(self, on_select=self.load_invoice_items_from_id)
+        browser.transient(self)
+        browser.grab_set()
 
     def reapply_row_tags(self):
+        if self.virtual_grid:
+            # Striping follows row position in the virtual grid
+            return
         children = self.tree.get_children()
         for i, row_id in enumerate(children):
             tag = 'evenrow' if i % 2 == 0 else 'oddrow'
@@ -346,9 +518,8 @@ class EditInvoiceWindow(tk.Toplevel):
                 return
         default_dir = self.settings.get("pdf_output_directory", "")
         order_date = database.get_invoice_details(self.selected_invoice_id)["date"]
-        formatted_date = datetime.strptime(order_date, "%Y-%m-%d").strftime("%Y%m%d")
         filename_template = self.settings.get("pdf_filename_format", "invoice_{id}_{date}")
-        default_filename = filename_template.format(id=self.selected_invoice_id, date=formatted_date)
+        default_filename = build_pdf_filename(self.selected_invoice_id, order_date, filename_template)
         filepath = filedialog.asksaveasfilename(
             defaultextension=".pdf",
             filetypes=[("PDF Files", "*.pdf")],
@@ -358,16 +529,13 @@ class EditInvoiceWindow(tk.Toplevel):
         )
         if not filepath:
             return
-        raw_items = database.get_invoice_items(self.selected_invoice_id)
-        invoice_items = [{
-            "vendor_name": row["vendor_name"],
-            "item_code": row["item_code"],
-            "item_name": row["item_name"],
-            "optional_info": row["optional_info"],
-            "quantity": row["quantity"],
-            "unit_price": row["unit_price"]
-        } for row in raw_items]
-        generate_pdf_invoice(self.selected_invoice_id, order_date, invoice_items, filepath)
+        self.tasks.submit(
+            export_invoice_pdf, self.selected_invoice_id, filepath, order_date,
+            on_done=lambda stats: self.on_export_finished(filepath),
+            on_error=lambda e: messagebox.showerror("Export Failed", f"Could not export PDF: {e}")
+        )
+
+    def on_export_finished(self, filepath):
         messagebox.showinfo("Success", f"PDF saved to:{filepath}")
         try:
             if platform.system() == 'Darwin':
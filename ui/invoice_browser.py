@@ -0,0 +1,160 @@
+import tkinter as tk
+from tkinter import ttk, messagebox
+from datetime import datetime
+from models.backend import database, get_catalog
+from ui.widgets import AutocompleteCombobox
+from ui.task_runner import TaskRunner
+
+
+class InvoiceBrowser(tk.Toplevel):
+    """
+    Searchable invoice picker. Invoices are fetched a page at a time with
+    keyset pagination and more are loaded as the list is scrolled to the
+    bottom, so opening it costs the same however many invoices exist.
+    `on_select(invoice_id)` is called when the user opens an invoice.
+    """
+
+    PAGE_SIZE = 100
+
+    def __init__(self, master, on_select):
+        super().__init__(master)
+        self.title("📄 Find Invoice")
+        self.geometry("520x500")
+        self.on_select = on_select
+
+        self.filters = {}
+        self.last_key = None
+        self.exhausted = False
+        self.tasks = TaskRunner(self)
+
+        # Filled in once the catalog loads in the background
+        self.vendor_ids = {}
+
+        self.create_widgets()
+        self.tasks.submit(
+            get_catalog,
+            on_done=self.show_vendors,
+            on_error=lambda e: messagebox.showerror("Error", f"Could not load vendors: {e}", parent=self)
+        )
+        self.apply_filters()
+
+    def show_vendors(self, catalog):
+        self.vendor_ids = catalog.vendor_ids
+        self.vendor_combo.set_completion_list(list(self.vendor_ids))
+
+    def create_widgets(self):
+        filter_frame = ttk.LabelFrame(self, text="🔍 Filter")
+        filter_frame.pack(fill="x", padx=10, pady=5)
+
+        ttk.Label(filter_frame, text="From:").grid(row=0, column=0, sticky="w", padx=5)
+        self.start_var = tk.StringVar()
+        ttk.Entry(filter_frame, textvariable=self.start_var, width=12).grid(row=0, column=1, sticky="w")
+
+        ttk.Label(filter_frame, text="To:").grid(row=0, column=2, sticky="w", padx=5)
+        self.end_var = tk.StringVar()
+        ttk.Entry(filter_frame, textvariable=self.end_var, width=12).grid(row=0, column=3, sticky="w")
+
+        ttk.Label(filter_frame, text="Invoice ID:").grid(row=1, column=0, sticky="w", padx=5)
+        self.id_var = tk.StringVar()
+        ttk.Entry(filter_frame, textvariable=self.id_var, width=12).grid(row=1, column=1, sticky="w")
+
+        ttk.Label(filter_frame, text="Vendor:").grid(row=1, column=2, sticky="w", padx=5)
+        self.vendor_var = tk.StringVar()
+        self.vendor_combo = AutocompleteCombobox(filter_frame, textvariable=self.vendor_var, width=20)
+        self.vendor_combo.set_completion_list(list(self.vendor_ids))
+        self.vendor_combo.grid(row=1, column=3, sticky="w")
+
+        ttk.Button(filter_frame, text="Search", command=self.apply_filters).grid(row=0, column=4, rowspan=2, padx=10)
+        ttk.Label(filter_frame, text="Dates as YYYY-MM-DD", foreground="gray").grid(row=2, column=0, columnspan=4, sticky="w", padx=5)
+
+        list_frame = ttk.Frame(self)
+        list_frame.pack(fill="both", expand=True, padx=10, pady=5)
+        self.tree = ttk.Treeview(list_frame, columns=("id", "date"), show="headings")
+        self.tree.heading("id", text="Invoice ID")
+        self.tree.heading("date", text="Date")
+        self.tree.column("id", width=120, anchor="center")
+        self.tree.column("date", width=200, anchor="center")
+        scrollbar = ttk.Scrollbar(list_frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=lambda first, last: self.on_scroll(scrollbar, first, last))
+        self.tree.pack(side="left", fill="both", expand=True)
+        scrollbar.pack(side="right", fill="y")
+        self.tree.bind("<Double-1>", lambda e: self.open_selected())
+        self.tree.bind("<Return>", lambda e: self.open_selected())
+
+        btn_frame = ttk.Frame(self)
+        btn_frame.pack(fill="x", padx=10, pady=5)
+        self.status_label = ttk.Label(btn_frame, text="")
+        self.status_label.pack(side="left")
+        ttk.Button(btn_frame, text="Cancel", command=self.destroy).pack(side="right", padx=5)
+        ttk.Button(btn_frame, text="Open", command=self.open_selected).pack(side="right")
+
+    def apply_filters(self):
+        filters = {}
+        try:
+            for key, var in (("start_date", self.start_var), ("end_date", self.end_var)):
+                value = var.get().strip()
+                if value:
+                    datetime.strptime(value, "%Y-%m-%d")
+                    filters[key] = value
+            if self.id_var.get().strip():
+                filters["invoice_id"] = int(self.id_var.get().strip())
+        except ValueError:
+            messagebox.showerror("Invalid Filter", "Dates must be YYYY-MM-DD and the invoice id a number.", parent=self)
+            return
+        vendor_name = self.vendor_var.get().strip()
+        if vendor_name:
+            if vendor_name not in self.vendor_ids:
+                messagebox.showerror("Invalid Filter", f"Unknown vendor '{vendor_name}'.", parent=self)
+                return
+            filters["vendor_id"] = self.vendor_ids[vendor_name]
+
+        self.filters = filters
+        self.last_key = None
+        self.exhausted = False
+        self.tree.delete(*self.tree.get_children())
+        # Replaces (and so cancels) a page still loading for the old filters
+        self.request_page()
+
+    def load_next_page(self):
+        if self.exhausted or self.tasks.is_pending("page"):
+            return
+        self.request_page()
+
+    def request_page(self):
+        self.tasks.submit(
+            database.get_invoices_page,
+            after=self.last_key, limit=self.PAGE_SIZE, **self.filters,
+            key="page",
+            on_done=self.show_page,
+            on_error=lambda e: messagebox.showerror("Error", f"Could not load invoices: {e}", parent=self)
+        )
+
+    def show_page(self, rows):
+        for invoice_id, date in rows:
+            self.tree.insert("", "end", iid=str(invoice_id), values=(invoice_id, date))
+        if rows:
+            last_id, last_date = rows[-1]
+            self.last_key = (last_date, last_id)
+        if len(rows) < self.PAGE_SIZE:
+            self.exhausted = True
+        shown = len(self.tree.get_children())
+        self.status_label.config(text=f"{shown} invoices" + ("" if self.exhausted else "+"))
+
+    def on_scroll(self, scrollbar, first, last):
+        scrollbar.set(first, last)
+        # Fetch the next page once the user nears the bottom of what is loaded
+        if float(last) >= 0.9 and not self.exhausted:
+            self.after_idle(self.load_next_page)
+
+    def open_selected(self):
+        selection = self.tree.selection()
+        if not selection:
+            messagebox.showwarning("No Selection", "Select an invoice to open.", parent=self)
+            return
+        invoice_id = int(selection[0])
+        self.destroy()
+        self.on_select(invoice_id)
+
+    def destroy(self):
+        self.tasks.close()
+        super().destroy()
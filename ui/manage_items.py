@@ -1,6 +1,7 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-from models import database
+from models.backend import database, get_catalog
+from ui.task_runner import TaskRunner
 
 class ManageItemsWindow(tk.Toplevel):
     def __init__(self, master, on_close=None):
@@ -10,6 +11,7 @@ class ManageItemsWindow(tk.Toplevel):
         self.on_close = on_close
 
         self.selected_item_id = None
+        self.tasks = TaskRunner(self)
         self.setup_widgets()
         self.refresh_item_list()
 
@@ -39,8 +41,17 @@ class ManageItemsWindow(tk.Toplevel):
         ttk.Button(button_frame, text="Delete", command=self.delete_item).pack(side="left", padx=5)
 
     def refresh_item_list(self):
+        # The catalog may need reloading from the database, so fetch it off the Tk thread
+        self.tasks.submit(
+            lambda: get_catalog().active_items(),
+            key="items",
+            on_done=self.show_items,
+            on_error=lambda e: messagebox.showerror("Error", f"Could not load items: {e}")
+        )
+
+    def show_items(self, items):
         self.item_listbox.delete(0, tk.END)
-        self.items = database.get_all_items()
+        self.items = items
         self.filtered_items = self.items
 
         for i in self.filtered_items:
@@ -90,11 +101,7 @@ class ManageItemsWindow(tk.Toplevel):
             messagebox.showwarning("Missing Code", "Enter an item code.")
             return
         try:
-            conn = database.get_connection()
-            cursor = conn.cursor()
-            cursor.execute("UPDATE items SET name = ?, item_code = ? WHERE id = ?", (name, item_code, self.selected_item_id))
-            conn.commit()
-            conn.close()
+            database.rename_item(self.selected_item_id, name, item_code)
             self.refresh_item_list()
         except Exception as e:
             messagebox.showerror("Error", f"Could not rename item: {e}")
@@ -119,6 +126,7 @@ class ManageItemsWindow(tk.Toplevel):
             messagebox.showerror("Error", f"Could not deactivate item: {e}")
 
     def destroy(self):
+        self.tasks.close()
         if self.on_close:
             callback = self.on_close
             self.on_close = None
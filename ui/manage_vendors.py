@@ -1,6 +1,7 @@
 import tkinter as tk
 from tkinter import ttk, messagebox , simpledialog
-from models import database
+from models.backend import database, get_catalog
+from ui.task_runner import TaskRunner
 
 class ManageVendorsWindow(tk.Toplevel):
     def __init__(self, master, on_close=None):
@@ -10,6 +11,7 @@ class ManageVendorsWindow(tk.Toplevel):
         self.on_close = on_close
 
         self.selected_vendor_id = None
+        self.tasks = TaskRunner(self)
         self.setup_widgets()
         self.refresh_vendor_list()
 
@@ -32,8 +34,17 @@ class ManageVendorsWindow(tk.Toplevel):
         ttk.Button(entry_frame, text="Delete", command=self.delete_vendor).pack(side="left", padx=5)
 
     def refresh_vendor_list(self):
+        # The catalog may need reloading from the database, so fetch it off the Tk thread
+        self.tasks.submit(
+            lambda: get_catalog().active_vendors(),
+            key="vendors",
+            on_done=self.show_vendors,
+            on_error=lambda e: messagebox.showerror("Error", f"Could not load vendors: {e}")
+        )
+
+    def show_vendors(self, vendors):
         self.vendor_listbox.delete(0, tk.END)
-        self.vendors = database.get_all_vendors()
+        self.vendors = vendors
         for v in self.vendors:
             self.vendor_listbox.insert(tk.END, v[1])
         self.selected_vendor_id = None
@@ -68,11 +79,7 @@ class ManageVendorsWindow(tk.Toplevel):
             messagebox.showwarning("Missing Name", "Enter a new name.")
             return
         try:
-            conn = database.get_connection()
-            cursor = conn.cursor()
-            cursor.execute("UPDATE vendors SET name = ? WHERE id = ?", (name, self.selected_vendor_id))
-            conn.commit()
-            conn.close()
+            database.rename_vendor(self.selected_vendor_id, name)
             self.refresh_vendor_list()
         except Exception as e:
             messagebox.showerror("Error", f"Could not rename vendor: {e}")
@@ -96,6 +103,7 @@ class ManageVendorsWindow(tk.Toplevel):
 
     
     def destroy(self):
+        self.tasks.close()
         if self.on_close:
             callback = self.on_close
             self.on_close = None  # prevent loop
@@ -0,0 +1,111 @@
+import tkinter as tk
+from tkinter import ttk, filedialog, messagebox
+from datetime import datetime
+from models.reporting import spend_report, write_report_csv, COLUMN_TITLES
+from ui.task_runner import TaskRunner
+
+
+class ReportsWindow(tk.Toplevel):
+    def __init__(self, master=None):
+        super().__init__(master)
+        self.title("📊 Spend Reports")
+        self.geometry("900x550")
+        self.tasks = TaskRunner(self)
+        self.columns = []
+        self.rows = []
+
+        self.create_widgets()
+        self.run_report()
+
+    def create_widgets(self):
+        filter_frame = ttk.LabelFrame(self, text="Report")
+        filter_frame.pack(fill="x", padx=10, pady=5)
+
+        today = datetime.now()
+        ttk.Label(filter_frame, text="From (YYYY-MM):").grid(row=0, column=0, sticky="w", padx=5)
+        self.start_var = tk.StringVar(value=f"{today.year}-01")
+        ttk.Entry(filter_frame, textvariable=self.start_var, width=10).grid(row=0, column=1, sticky="w")
+        ttk.Label(filter_frame, text="To (YYYY-MM):").grid(row=0, column=2, sticky="w", padx=5)
+        self.end_var = tk.StringVar(value=today.strftime("%Y-%m"))
+        ttk.Entry(filter_frame, textvariable=self.end_var, width=10).grid(row=0, column=3, sticky="w")
+
+        ttk.Label(filter_frame, text="Group by:").grid(row=1, column=0, sticky="w", padx=5)
+        self.group_vars = {}
+        for col, (key, label) in enumerate((("month", "Month"), ("vendor", "Vendor"), ("item", "Item")), start=1):
+            var = tk.BooleanVar(value=(key == "vendor"))
+            self.group_vars[key] = var
+            ttk.Checkbutton(filter_frame, text=label, variable=var).grid(row=1, column=col, sticky="w")
+
+        ttk.Button(filter_frame, text="Run", command=self.run_report).grid(row=0, column=5, rowspan=2, padx=10)
+        ttk.Button(filter_frame, text="Export CSV...", command=self.export_csv).grid(row=0, column=6, rowspan=2, padx=5)
+
+        list_frame = ttk.Frame(self)
+        list_frame.pack(fill="both", expand=True, padx=10, pady=5)
+        self.tree = ttk.Treeview(list_frame, show="headings")
+        scrollbar = ttk.Scrollbar(list_frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.pack(side="left", fill="both", expand=True)
+        scrollbar.pack(side="right", fill="y")
+
+        self.status_label = ttk.Label(self, text="")
+        self.status_label.pack(fill="x", padx=10, pady=(0, 5))
+
+    def run_report(self):
+        start_month = self.start_var.get().strip() or None
+        end_month = self.end_var.get().strip() or None
+        try:
+            for value in (start_month, end_month):
+                if value:
+                    datetime.strptime(value, "%Y-%m")
+        except ValueError:
+            messagebox.showerror("Invalid Month", "Months must be YYYY-MM.", parent=self)
+            return
+        group_by = [key for key, var in self.group_vars.items() if var.get()]
+        if not group_by:
+            messagebox.showwarning("Group By", "Pick at least one grouping.", parent=self)
+            return
+
+        self.status_label.config(text="Running...")
+        self.tasks.submit(
+            spend_report, start_month, end_month, group_by,
+            key="report",
+            on_done=self.show_report,
+            on_error=lambda e: messagebox.showerror("Report Failed", f"Could not run report: {e}", parent=self)
+        )
+
+    def show_report(self, result):
+        self.columns, self.rows = result
+        self.tree.delete(*self.tree.get_children())
+        self.tree["columns"] = self.columns
+        for col in self.columns:
+            self.tree.heading(col, text=COLUMN_TITLES.get(col, col))
+            numeric = col in ("quantity", "spend", "line_count")
+            self.tree.column(col, width=100 if numeric else 180, anchor="e" if numeric else "w")
+        for row in self.rows:
+            self.tree.insert("", "end", values=["" if v is None else v for v in row])
+
+        spend_index = self.columns.index("spend")
+        total = sum(row[spend_index] or 0 for row in self.rows)
+        self.status_label.config(text=f"{len(self.rows)} rows   Total spend: ${total:,.2f}")
+
+    def export_csv(self):
+        if not self.rows:
+            messagebox.showwarning("No Data", "Run a report first.", parent=self)
+            return
+        path = filedialog.asksaveasfilename(
+            defaultextension=".csv",
+            filetypes=[("CSV Files", "*.csv")],
+            title="Save Report",
+            initialfile=f"spend_report_{datetime.now().strftime('%Y%m%d')}.csv"
+        )
+        if not path:
+            return
+        try:
+            write_report_csv(self.columns, self.rows, path)
+            messagebox.showinfo("Saved", f"Report saved to:\n{path}", parent=self)
+        except OSError as e:
+            messagebox.showerror("Save Failed", f"Could not write file:\n{e}", parent=self)
+
+    def destroy(self):
+        self.tasks.close()
+        super().destroy()
@@ -4,9 +4,14 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 from datetime import datetime
 import subprocess
-from ui.settings import load_settings
+from models.pdf_archive import get_archive
+from models.pdf_index import get_directory_index
+from ui.settings import load_settings, watch_settings
+from ui.task_runner import TaskRunner
 
 class SavedInvoicesWindow(tk.Toplevel):
+    FILTER_DEBOUNCE_MS = 250
+
     def __init__(self, master=None):
         super().__init__(master)
         self.title("📁 Saved Invoices")
@@ -19,38 +24,144 @@ class SavedInvoicesWindow(tk.Toplevel):
             self.destroy()
             return
 
+        view_settings = self.settings.get("saved_invoices", {})
+        self.page_size = view_settings.get("page_size", 200)
+        self.poll_seconds = view_settings.get("poll_seconds", 0)
+        self.index = get_directory_index(self.pdf_dir)
+        self.archive = get_archive()
+        self.tasks = TaskRunner(self)
+        self.offset = 0
+        self.total = 0
+        self._filter_pending = None
+        self._poll_job = None
+
         self.create_widgets()
         self.load_pdf_files()
+        watch_settings(self, self.on_settings_changed)
+
+    def on_settings_changed(self, settings):
+        self.settings = settings
+        view_settings = settings.get("saved_invoices", {})
+        self.page_size = view_settings.get("page_size", 200)
+        self.poll_seconds = view_settings.get("poll_seconds", 0)
+        pdf_dir = settings.get("pdf_output_directory", "")
+        if pdf_dir != self.pdf_dir and os.path.isdir(pdf_dir):
+            self.pdf_dir = pdf_dir
+            self.index = get_directory_index(pdf_dir)
+            self.offset = 0
+            self.load_pdf_files()
+        else:
+            self.show_page()
 
     def create_widgets(self):
-        self.tree = ttk.Treeview(self, columns=("filename", "modified"), show="headings")
+        filter_frame = ttk.Frame(self)
+        filter_frame.pack(fill="x", padx=10, pady=(10, 0))
+        ttk.Label(filter_frame, text="Filter:").pack(side="left")
+        self.filter_var = tk.StringVar()
+        filter_entry = ttk.Entry(filter_frame, textvariable=self.filter_var, width=40)
+        filter_entry.pack(side="left", padx=5)
+        filter_entry.bind("<KeyRelease>", self.on_filter_changed)
+        # Old PDFs are moved into the archive; browse either place
+        self.source_var = tk.StringVar(value="folder")
+        ttk.Radiobutton(filter_frame, text="Folder", value="folder", variable=self.source_var,
+                        command=self.apply_filter).pack(side="left", padx=(15, 0))
+        ttk.Radiobutton(filter_frame, text="Archive", value="archive", variable=self.source_var,
+                        command=self.apply_filter).pack(side="left", padx=5)
+
+        self.tree = ttk.Treeview(self, columns=("filename", "size", "modified"), show="headings")
         self.tree.heading("filename", text="Filename")
+        self.tree.heading("size", text="Size")
         self.tree.heading("modified", text="Last Modified")
-        self.tree.column("filename", width=500)
+        self.tree.column("filename", width=420)
+        self.tree.column("size", width=80, anchor="e")
         self.tree.column("modified", width=200, anchor="center")
         self.tree.pack(fill="both", expand=True, padx=10, pady=10)
 
+        page_frame = ttk.Frame(self)
+        page_frame.pack(fill="x", padx=10)
+        self.prev_button = ttk.Button(page_frame, text="◀ Prev", command=lambda: self.change_page(-1))
+        self.prev_button.pack(side="left")
+        self.next_button = ttk.Button(page_frame, text="Next ▶", command=lambda: self.change_page(1))
+        self.next_button.pack(side="left", padx=5)
+        self.page_label = ttk.Label(page_frame, text="")
+        self.page_label.pack(side="left", padx=10)
+
         btn_frame = ttk.Frame(self)
         btn_frame.pack(pady=5)
         ttk.Button(btn_frame, text="Open", command=self.open_selected).pack(side="left", padx=5)
         ttk.Button(btn_frame, text="Delete", command=self.delete_selected).pack(side="left", padx=5)
-        ttk.Button(btn_frame, text="Refresh", command=self.load_pdf_files).pack(side="left", padx=5)
+        ttk.Button(btn_frame, text="Refresh", command=lambda: self.load_pdf_files(force=True)).pack(side="left", padx=5)
+        ttk.Button(btn_frame, text="Archive Old PDFs", command=self.archive_old_files).pack(side="left", padx=5)
         ttk.Button(btn_frame, text="Close", command=self.destroy).pack(side="right", padx=5)
 
-    def load_pdf_files(self):
+    def load_pdf_files(self, force=False):
+        # Scanning a network share can take a while, so do it off the Tk thread
+        self.page_label.config(text="Scanning...")
+        self.tasks.submit(
+            self.index.refresh, force,
+            key="scan",
+            on_done=lambda changed: self.show_page(),
+            on_error=lambda e: messagebox.showerror("Error", f"Failed to load files:\n{e}", parent=self)
+        )
+
+    def show_page(self):
+        if self.source_var.get() == "archive":
+            self.tasks.submit(
+                self.archive.list_files, self.filter_var.get(), self.offset, self.page_size,
+                key="page",
+                on_done=lambda result: self.render_page(result[0], [row[:3] for row in result[1]]),
+                on_error=lambda e: messagebox.showerror("Error", f"Failed to read the archive:\n{e}", parent=self)
+            )
+            return
+        total, page = self.index.query(self.filter_var.get(), self.offset, self.page_size)
+        if self.offset and self.offset >= total:
+            self.offset = max(0, (total - 1) // self.page_size * self.page_size)
+            total, page = self.index.query(self.filter_var.get(), self.offset, self.page_size)
+        self.render_page(total, page)
+
+    def render_page(self, total, page):
+        self.total = total
         self.tree.delete(*self.tree.get_children())
-        try:
-            files = [
-                f for f in os.listdir(self.pdf_dir)
-                if f.lower().endswith(".pdf")
-            ]
-            files.sort(key=lambda x: os.path.getmtime(os.path.join(self.pdf_dir, x)), reverse=True)
-            for f in files:
-                path = os.path.join(self.pdf_dir, f)
-                modified = datetime.fromtimestamp(os.path.getmtime(path)).strftime("%Y-%m-%d %H:%M:%S")
-                self.tree.insert("", "end", values=(f, modified))
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to load files:\n{e}")
+        for name, size, mtime in page:
+            modified = datetime.fromtimestamp(mtime).strftime("%Y-%m-%d %H:%M:%S")
+            self.tree.insert("", "end", values=(name, f"{size / 1024:,.0f} KB", modified))
+
+        if self.total:
+            self.page_label.config(text=f"Showing {self.offset + 1:,}-{self.offset + len(page):,} of {self.total:,}")
+        else:
+            self.page_label.config(text="No matching files")
+        self.prev_button.config(state="normal" if self.offset > 0 else "disabled")
+        self.next_button.config(state="normal" if self.offset + self.page_size < self.total else "disabled")
+        self.schedule_poll()
+
+    def change_page(self, step):
+        self.offset = max(0, self.offset + step * self.page_size)
+        self.show_page()
+
+    def on_filter_changed(self, event=None):
+        if self._filter_pending is not None:
+            self.after_cancel(self._filter_pending)
+        self._filter_pending = self.after(self.FILTER_DEBOUNCE_MS, self.apply_filter)
+
+    def apply_filter(self):
+        self._filter_pending = None
+        self.offset = 0
+        self.show_page()
+
+    def schedule_poll(self):
+        # Optional: pick up PDFs saved by other users/machines without pressing Refresh
+        if not self.poll_seconds or self._poll_job is not None:
+            return
+        self._poll_job = self.after(int(self.poll_seconds * 1000), self.poll_directory)
+
+    def poll_directory(self):
+        self._poll_job = None
+        self.tasks.submit(
+            self.index.refresh,
+            key="scan",
+            on_done=lambda changed: self.show_page() if changed else self.schedule_poll(),
+            on_error=lambda e: self.schedule_poll()
+        )
 
     def open_selected(self):
         selected = self.tree.selection()
@@ -59,7 +170,17 @@ class SavedInvoicesWindow(tk.Toplevel):
             return
 
         filename = self.tree.item(selected[0])["values"][0]
-        filepath = os.path.join(self.pdf_dir, filename)
+        if self.source_var.get() == "archive":
+            # Unpacked to a temp folder, then opened like any other file
+            self.tasks.submit(
+                self.archive.extract, filename,
+                on_done=self.open_path,
+                on_error=lambda e: messagebox.showerror("Open Failed", f"Could not restore file:\n{e}", parent=self)
+            )
+            return
+        self.open_path(os.path.join(self.pdf_dir, filename))
+
+    def open_path(self, filepath):
         try:
             if platform.system() == 'Darwin':
                 subprocess.call(('open', filepath))
@@ -81,8 +202,48 @@ class SavedInvoicesWindow(tk.Toplevel):
         confirm = messagebox.askyesno("Confirm Delete", f"Delete '{filename}'?")
         if confirm:
             try:
-                os.remove(filepath)
-                self.load_pdf_files()
+                if self.source_var.get() == "archive":
+                    self.archive.remove(filename)
+                else:
+                    os.remove(filepath)
+                    self.index.remove(filename)
+                self.show_page()
                 messagebox.showinfo("Deleted", f"'{filename}' was deleted.")
             except Exception as e:
                 messagebox.showerror("Delete Failed", f"Could not delete file:\n{e}")
+
+    def archive_old_files(self):
+        days = self.archive.archive_after_days
+        confirm = messagebox.askyesno(
+            "Archive PDFs",
+            f"Move PDFs older than {days} days out of the folder and into the archive?\n"
+            "They can still be opened from the Archive view.",
+            parent=self
+        )
+        if not confirm:
+            return
+        self.page_label.config(text="Archiving...")
+        self.tasks.submit(
+            self.archive.archive_directory, self.pdf_dir, days,
+            on_done=self.on_archive_finished,
+            on_error=lambda e: messagebox.showerror("Archive Failed", f"Could not archive files:\n{e}", parent=self)
+        )
+
+    def on_archive_finished(self, summary):
+        message = f"Archived {summary['archived']} PDFs ({summary['new_blobs']} unique)."
+        if summary["failed"]:
+            message += f"\n{len(summary['failed'])} could not be archived:\n" + "\n".join(
+                f"{name}: {error}" for name, error in summary["failed"][:10]
+            )
+            messagebox.showwarning("Archive Finished", message, parent=self)
+        else:
+            messagebox.showinfo("Archive Finished", message, parent=self)
+        self.load_pdf_files(force=True)
+
+    def destroy(self):
+        if hasattr(self, "tasks"):
+            self.tasks.close()
+            for job in (self._poll_job, self._filter_pending):
+                if job is not None:
+                    self.after_cancel(job)
+        super().destroy()
@@ -0,0 +1,92 @@
+import tkinter as tk
+from tkinter import ttk
+from models.backend import search_all
+
+
+class SearchWindow(tk.Toplevel):
+    """
+    Global search over item names and codes, vendor names and the optional
+    info written on line items. Double-clicking a line item opens its invoice.
+    """
+
+    DEBOUNCE_MS = 250
+
+    def __init__(self, master=None):
+        super().__init__(master)
+        self.title("🔍 Search")
+        self.geometry("800x500")
+        self._pending = None
+        self.line_invoices = {}
+
+        self.create_widgets()
+
+    def create_widgets(self):
+        search_frame = ttk.Frame(self)
+        search_frame.pack(fill="x", padx=10, pady=10)
+        ttk.Label(search_frame, text="Search:").pack(side="left")
+        self.query_var = tk.StringVar()
+        entry = ttk.Entry(search_frame, textvariable=self.query_var, width=50)
+        entry.pack(side="left", padx=5, fill="x", expand=True)
+        entry.bind("<KeyRelease>", self.on_keyrelease)
+        entry.bind("<Return>", lambda e: self.run_search())
+        entry.focus_set()
+
+        self.tree = ttk.Treeview(self, columns=("type", "name", "detail"), show="headings")
+        self.tree.heading("type", text="Type")
+        self.tree.heading("name", text="Name")
+        self.tree.heading("detail", text="Detail")
+        self.tree.column("type", width=90, anchor="center")
+        self.tree.column("name", width=250)
+        self.tree.column("detail", width=400)
+        self.tree.pack(fill="both", expand=True, padx=10, pady=5)
+        self.tree.bind("<Double-1>", lambda e: self.open_selected())
+
+        btn_frame = ttk.Frame(self)
+        btn_frame.pack(fill="x", padx=10, pady=5)
+        self.status_label = ttk.Label(btn_frame, text="Search item names and codes, vendors, and line item notes.")
+        self.status_label.pack(side="left")
+        ttk.Button(btn_frame, text="Close", command=self.destroy).pack(side="right")
+
+    def on_keyrelease(self, event=None):
+        if self._pending is not None:
+            self.after_cancel(self._pending)
+        self._pending = self.after(self.DEBOUNCE_MS, self.run_search)
+
+    def run_search(self):
+        self._pending = None
+        self.tree.delete(*self.tree.get_children())
+        self.line_invoices = {}
+        text = self.query_var.get()
+        if not text.strip():
+            return
+        try:
+            results = search_all(text)
+        except Exception as e:
+            self.status_label.config(text=f"Search failed: {e}")
+            return
+
+        for item_id, name, item_code in results["items"]:
+            self.tree.insert("", "end", iid=f"item-{item_id}", values=("Item", name, f"Code {item_code}"))
+        for vendor_id, name in results["vendors"]:
+            self.tree.insert("", "end", iid=f"vendor-{vendor_id}", values=("Vendor", name, ""))
+        for row in results["line_items"]:
+            row_id = f"line-{row['invoice_item_id']}"
+            self.line_invoices[row_id] = row["invoice_id"]
+            self.tree.insert(
+                "", "end",
+                iid=row_id,
+                values=(
+                    "Line Item",
+                    f"{row['vendor_name']} / {row['item_name']}",
+                    f"Invoice {row['invoice_id']} ({row['date']}): {row['optional_info']}"
+                )
+            )
+        count = len(self.tree.get_children())
+        self.status_label.config(text=f"{count} matches" + (" (double-click a line item to open its invoice)" if results["line_items"] else ""))
+
+    def open_selected(self):
+        selection = self.tree.selection()
+        if not selection or selection[0] not in self.line_invoices:
+            return
+        from ui.edit_invoice import EditInvoiceWindow
+        EditInvoiceWindow(self, invoice_db_id=self.line_invoices[selection[0]])
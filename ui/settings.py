@@ -1,43 +1,43 @@
 
 import tkinter as tk
 from tkinter import ttk, filedialog, colorchooser, messagebox
-import json
-import os
-
-SETTINGS_FILE = DB_NAME = "Data/settings.json"
-
-DEFAULT_SETTINGS = {
-    "invoice_retention": {
-        "years": 2,
-        "months": 0
-    },
-    "row_colors": {
-        "even": "#f4f4f4",
-        "odd": "#ffffff"
-    },
-    "pdf_output_directory": "",
-    "defaults": {
-        "quantity": 1,
-        "unit_price": 0.0
-    },
-    "window_mode": "zoomed",
-    "confirmations": {
-        "on_save": True,
-        "on_delete": True
-    },
-    "pdf_filename_format": "invoice_{id}_{date}"
-}
+import copy
+from models.settings_store import (
+    DEFAULT_SETTINGS, SETTINGS_PATH, get_store, get_settings, save_settings, settings_generation
+)
+
+SETTINGS_FILE = DB_NAME = SETTINGS_PATH
+
+# How often open windows check for settings saved elsewhere
+WATCH_INTERVAL_MS = 1000
 
 
 def load_settings():
-    if not os.path.exists(SETTINGS_FILE):
+    if not get_store().exists():
         save_settings(DEFAULT_SETTINGS)
-    with open(SETTINGS_FILE, "r") as f:
-        return json.load(f)
-
-def save_settings(settings):
-    with open(SETTINGS_FILE, "w") as f:
-        json.dump(settings, f, indent=4)
+    return get_settings()
+
+def watch_settings(widget, callback, interval_ms=WATCH_INTERVAL_MS):
+    """
+    Call callback(settings) on the Tk thread whenever the settings change,
+    including saves from another window or another running instance.
+    Stops by itself when `widget` is destroyed.
+    """
+    seen = [settings_generation()]
+
+    def poll():
+        try:
+            if not widget.winfo_exists():
+                return
+        except tk.TclError:
+            return
+        generation = settings_generation()
+        if generation != seen[0]:
+            seen[0] = generation
+            callback(get_settings())
+        widget.after(interval_ms, poll)
+
+    widget.after(interval_ms, poll)
 
 class SettingsWindow(tk.Toplevel):
     def __init__(self, master=None):
@@ -122,14 +122,19 @@ class SettingsWindow(tk.Toplevel):
             self.output_dir_entry.insert(0, directory)
 
     def save(self):
-        os.makedirs(os.path.dirname(SETTINGS_FILE), exist_ok=True)
-        with open(SETTINGS_FILE, "w") as f:
-            json.dump(self.settings, f, indent=4)
+        try:
+            quantity = int(self.default_qty_entry.get())
+            unit_price = float(self.default_price_entry.get())
+        except ValueError:
+            messagebox.showerror("Settings", "Default quantity and unit price must be numbers.", parent=self)
+            return
+        # Start from what is on disk so sections saved elsewhere are kept
+        self.settings = get_settings()
         self.settings["row_colors"]["even"] = self.even_color_entry.get()
         self.settings["row_colors"]["odd"] = self.odd_color_entry.get()
         self.settings["pdf_output_directory"] = self.output_dir_entry.get()
-        self.settings["defaults"]["quantity"] = int(self.default_qty_entry.get())
-        self.settings["defaults"]["unit_price"] = float(self.default_price_entry.get())
+        self.settings["defaults"]["quantity"] = quantity
+        self.settings["defaults"]["unit_price"] = unit_price
         self.settings["window_mode"] = self.window_mode_var.get()
         self.settings["confirmations"]["on_save"] = self.confirm_save_var.get()
         self.settings["confirmations"]["on_delete"] = self.confirm_delete_var.get()
@@ -139,8 +144,7 @@ class SettingsWindow(tk.Toplevel):
         messagebox.showinfo("Settings", "Settings saved successfully!")
 
     def reset_defaults(self):
-        global DEFAULT_SETTINGS
-        self.settings = DEFAULT_SETTINGS.copy()
+        self.settings = copy.deepcopy(DEFAULT_SETTINGS)
         save_settings(self.settings)
         self.destroy()
         SettingsWindow(self.master)
\ No newline at end of file
@@ -0,0 +1,144 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Shared by every window so each worker thread keeps one long-lived
+# database connection (see models.connection) instead of opening new ones.
+WORKER_THREADS = 2
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=WORKER_THREADS, thread_name_prefix="ui-task")
+        return _executor
+
+
+class Task:
+    def __init__(self, key=None):
+        self.key = key
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        """The call may still finish, but its callbacks will not run."""
+        self._cancelled.set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+
+class TaskRunner:
+    """
+    Runs blocking calls (database queries, PDF rendering) off the Tk main
+    loop. Results come back through a queue that is polled with after(),
+    so on_done/on_error always run on the Tk thread.
+
+    Submitting with a `key` cancels the previous task with the same key;
+    e.g. switching invoices drops the load still in flight. While any
+    task is pending the widget shows a busy cursor and `on_busy(True)`
+    is called, then `on_busy(False)` once everything has finished.
+    """
+
+    POLL_MS = 50
+
+    def __init__(self, widget, on_busy=None):
+        self.widget = widget
+        self.on_busy = on_busy
+        self.results = queue.Queue()
+        self.pending = set()
+        self.keyed = {}
+        self.closed = False
+        self._polling = False
+
+    def submit(self, func, *args, on_done=None, on_error=None, key=None, **kwargs):
+        if self.closed:
+            return None
+        task = Task(key)
+        if key is not None:
+            previous = self.keyed.get(key)
+            if previous is not None:
+                previous.cancel()
+            self.keyed[key] = task
+
+        def run():
+            if task.cancelled:
+                self.results.put((task, None, None, on_done, on_error))
+                return
+            try:
+                result = func(*args, **kwargs)
+                self.results.put((task, result, None, on_done, on_error))
+            except Exception as e:
+                self.results.put((task, None, e, on_done, on_error))
+
+        was_busy = bool(self.pending)
+        self.pending.add(task)
+        if not was_busy:
+            self._set_busy(True)
+        _get_executor().submit(run)
+        if not self._polling:
+            self._polling = True
+            self.widget.after(self.POLL_MS, self._poll)
+        return task
+
+    def cancel(self, key=None):
+        """Cancel the task with `key`, or every pending task if no key is given."""
+        tasks = [self.keyed.get(key)] if key is not None else list(self.pending)
+        for task in tasks:
+            if task is not None:
+                task.cancel()
+
+    def close(self):
+        """Cancel everything; call from the window's destroy()."""
+        self.cancel()
+        self.closed = True
+
+    def is_pending(self, key):
+        return key in self.keyed
+
+    @property
+    def busy(self):
+        return bool(self.pending)
+
+    def _set_busy(self, busy):
+        try:
+            self.widget.config(cursor="watch" if busy else "")
+        except Exception:
+            pass
+        if self.on_busy:
+            self.on_busy(busy)
+
+    def _poll(self):
+        if self.closed:
+            self._polling = False
+            return
+        try:
+            while True:
+                task, result, error, on_done, on_error = self.results.get_nowait()
+                self.pending.discard(task)
+                if self.keyed.get(task.key) is task:
+                    del self.keyed[task.key]
+                if task.cancelled:
+                    continue
+                try:
+                    if error is not None:
+                        if on_error:
+                            on_error(error)
+                        else:
+                            print(f"Background task failed: {error}")
+                    elif on_done:
+                        on_done(result)
+                except Exception as e:
+                    print(f"Error handling background task result: {e}")
+        except queue.Empty:
+            pass
+
+        if self.pending:
+            self.widget.after(self.POLL_MS, self._poll)
+        else:
+            self._polling = False
+            self._set_busy(False)
@@ -0,0 +1,230 @@
+import itertools
+from tkinter import ttk
+
+
+class VirtualTreeview(ttk.Frame):
+    """
+    A ttk.Treeview that keeps every row in a Python list but only inserts
+    the rows on screen (plus BUFFER_ROWS) into the Tk widget.
+
+    It answers the subset of the Treeview API that EditInvoiceWindow uses
+    (insert/delete/item/get_children/selection/identify_*/bbox/heading/
+    column/tag_configure/bind), with row ids that stay valid while the row
+    exists. Row striping comes from the row's position, so deleting a row
+    never rewrites the tags of the rows below it.
+    """
+
+    BUFFER_ROWS = 5
+
+    def __init__(self, master, columns, even_tag="evenrow", odd_tag="oddrow", **tree_options):
+        super().__init__(master)
+        self.even_tag = even_tag
+        self.odd_tag = odd_tag
+
+        self._keys = []
+        self._values = {}
+        self._selected = set()
+        self._focus = None
+        self._offset = 0
+        self._visible_rows = tree_options.get("height", 18)
+        self._materialized = []
+        self._render_pending = False
+        self._counter = itertools.count(1)
+
+        self._tree = ttk.Treeview(self, columns=columns, yscrollcommand=self._on_native_scroll, **tree_options)
+        self._scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.yview)
+        self._tree.grid(row=0, column=0, sticky="nsew")
+        self._scrollbar.grid(row=0, column=1, sticky="ns")
+        self.rowconfigure(0, weight=1)
+        self.columnconfigure(0, weight=1)
+
+        self._tree.bind("<Configure>", self._on_configure, add="+")
+        self._tree.bind("<<TreeviewSelect>>", self._on_tree_select, add="+")
+        # A plain click replaces the selection, including rows scrolled out of view
+        self._tree.bind("<ButtonPress-1>", lambda e: self._selected.clear(), add="+")
+        self._tree.bind("<Control-ButtonPress-1>", lambda e: None)
+        self._tree.bind("<Shift-ButtonPress-1>", lambda e: None)
+        self._tree.bind("<MouseWheel>", self._on_mousewheel)
+        self._tree.bind("<Button-4>", lambda e: self._scroll_rows(-3))
+        self._tree.bind("<Button-5>", lambda e: self._scroll_rows(3))
+        self._tree.bind("<Up>", lambda e: self._move_focus(-1))
+        self._tree.bind("<Down>", lambda e: self._move_focus(1))
+        self._tree.bind("<Prior>", lambda e: self._move_focus(-self._visible_rows))
+        self._tree.bind("<Next>", lambda e: self._move_focus(self._visible_rows))
+
+    # -------------------
+    # Treeview-compatible API
+    # -------------------
+
+    def heading(self, column, **kw):
+        return self._tree.heading(column, **kw)
+
+    def column(self, column, **kw):
+        return self._tree.column(column, **kw)
+
+    def tag_configure(self, tagname, **kw):
+        return self._tree.tag_configure(tagname, **kw)
+
+    def bind(self, sequence=None, func=None, add=None):
+        return self._tree.bind(sequence, func, add)
+
+    def identify(self, component, x, y):
+        return self._tree.identify(component, x, y)
+
+    def identify_row(self, y):
+        return self._tree.identify_row(y)
+
+    def identify_column(self, x):
+        return self._tree.identify_column(x)
+
+    def bbox(self, item, column=None):
+        return self._tree.bbox(item, column)
+
+    def insert(self, parent, index, iid=None, values=(), **kw):
+        key = iid or f"R{next(self._counter)}"
+        self._values[key] = tuple(values)
+        if index == "end":
+            self._keys.append(key)
+        else:
+            self._keys.insert(int(index), key)
+        self._schedule_render()
+        return key
+
+    def delete(self, *items):
+        if not items:
+            return
+        doomed = set(items) & self._values.keys()
+        if not doomed:
+            return
+        if len(doomed) == 1:
+            self._keys.remove(next(iter(doomed)))
+        else:
+            self._keys = [key for key in self._keys if key not in doomed]
+        for key in doomed:
+            self._values.pop(key, None)
+        self._selected -= doomed
+        if self._focus in doomed:
+            self._focus = None
+        self._schedule_render()
+
+    def item(self, item, option=None, **kw):
+        if "values" in kw:
+            self._values[item] = tuple(kw["values"])
+            if item in self._materialized:
+                self._tree.item(item, values=kw["values"])
+            return None
+        if option == "tags":
+            return [self._tag_for(self._keys.index(item))]
+        info = {"values": list(self._values[item])}
+        return info[option] if option else info
+
+    def get_children(self, item=""):
+        return tuple(self._keys)
+
+    def selection(self):
+        return tuple(key for key in self._keys if key in self._selected) if self._selected else ()
+
+    def selection_set(self, *items):
+        self._selected = set(items)
+        self._schedule_render()
+
+    def see(self, item):
+        index = self._keys.index(item)
+        if index < self._offset:
+            self._offset = index
+        elif index >= self._offset + self._visible_rows:
+            self._offset = index - self._visible_rows + 1
+        self._schedule_render()
+
+    def yview(self, *args):
+        if not args:
+            return self._fractions()
+        total = len(self._keys)
+        if args[0] == "moveto":
+            self._offset = int(float(args[1]) * total)
+        elif args[0] == "scroll":
+            step = int(args[1])
+            if args[2] == "pages":
+                step *= self._visible_rows
+            self._offset += step
+        self._render()
+
+    # -------------------
+    # Rendering
+    # -------------------
+
+    def _tag_for(self, index):
+        return self.even_tag if index % 2 == 0 else self.odd_tag
+
+    def _fractions(self):
+        total = len(self._keys)
+        if not total:
+            return 0.0, 1.0
+        return self._offset / total, min(1.0, (self._offset + self._visible_rows) / total)
+
+    def _schedule_render(self):
+        # Coalesce bursts of insert/delete (e.g. loading an invoice) into one redraw
+        if not self._render_pending:
+            self._render_pending = True
+            self.after_idle(self._render)
+
+    def _render(self):
+        self._render_pending = False
+        total = len(self._keys)
+        self._offset = max(0, min(self._offset, total - self._visible_rows))
+        window = self._keys[self._offset:self._offset + self._visible_rows + self.BUFFER_ROWS]
+
+        if self._materialized:
+            self._tree.delete(*self._materialized)
+        for i, key in enumerate(window):
+            self._tree.insert("", "end", iid=key, values=self._values[key], tags=(self._tag_for(self._offset + i),))
+        self._materialized = window
+
+        visible_selected = [key for key in window if key in self._selected]
+        self._tree.selection_set(visible_selected)
+        if self._focus in window:
+            self._tree.focus(self._focus)
+        self._tree.yview_moveto(0)
+        self._scrollbar.set(*self._fractions())
+
+    def _on_configure(self, event):
+        rowheight = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+        # The heading row takes roughly one row of height
+        visible = max(1, event.height // rowheight - 1)
+        if visible != self._visible_rows:
+            self._visible_rows = visible
+            self._schedule_render()
+
+    def _on_native_scroll(self, first, last):
+        # Treeview scrolled itself (e.g. to show a clicked buffer row); fold it into our offset
+        first = float(first)
+        if first > 0 and self._materialized:
+            self._offset += round(first * len(self._materialized))
+            self._schedule_render()
+
+    def _on_tree_select(self, event=None):
+        shown = set(self._materialized)
+        self._selected = (self._selected - shown) | set(self._tree.selection())
+        focus = self._tree.focus()
+        if focus:
+            self._focus = focus
+
+    def _on_mousewheel(self, event):
+        self._scroll_rows(-3 if event.delta > 0 else 3)
+        return "break"
+
+    def _scroll_rows(self, rows):
+        self._offset += rows
+        self._render()
+        return "break"
+
+    def _move_focus(self, step):
+        if not self._keys:
+            return "break"
+        index = self._keys.index(self._focus) if self._focus in self._values else self._offset - step
+        index = max(0, min(len(self._keys) - 1, index + step))
+        self._focus = self._keys[index]
+        self._selected = {self._focus}
+        self.see(self._focus)
+        self._render()
+        return "break"
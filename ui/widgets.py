@@ -1,33 +1,181 @@
+import itertools
 import tkinter as tk
+from bisect import bisect_left
 from tkinter import ttk
 
+
+class CompletionIndex:
+    """
+    Completion lookups over a fixed list of strings. Everything is
+    lowercased and sorted once, so a prefix query is a binary search over
+    the names and a "starts-with-word" query is a binary search over the
+    word suffixes ("acme paper" also answers "pap"). Substring matches
+    are only scanned for when the first two kinds don't fill the result.
+
+    Within each kind, values passed to record_use() most recently come
+    first, then the rest alphabetically.
+    """
+
+    MAX_RECENT = 50
+
+    def __init__(self, values):
+        self._known = set(values)
+        self._values = sorted(self._known, key=str.lower)
+        self._lowered = [value.lower() for value in self._values]
+        suffixes = []
+        for index, lowered in enumerate(self._lowered):
+            for pos in range(1, len(lowered)):
+                if lowered[pos - 1] in " -_/(" and lowered[pos] not in " -_/(":
+                    suffixes.append((lowered[pos:], index))
+        suffixes.sort()
+        self._suffixes = suffixes
+        self._suffix_keys = [suffix for suffix, _ in suffixes]
+        self._recent = {}
+        self._clock = itertools.count()
+
+    def __len__(self):
+        return len(self._values)
+
+    @property
+    def values(self):
+        return self._values
+
+    def record_use(self, value):
+        if value not in self._known:
+            return
+        self._recent[value] = next(self._clock)
+        if len(self._recent) > self.MAX_RECENT:
+            oldest = min(self._recent, key=self._recent.get)
+            del self._recent[oldest]
+
+    @staticmethod
+    def _range(keys, prefix):
+        return bisect_left(keys, prefix), bisect_left(keys, prefix + "\uffff")
+
+    def search(self, text, limit=50):
+        text = text.strip().lower()
+        recent = sorted(self._recent, key=self._recent.get, reverse=True)
+        if not text:
+            return (recent + [v for v in self._values if v not in self._recent])[:limit]
+
+        results = []
+        seen = set()
+
+        def add(value):
+            if value not in seen:
+                seen.add(value)
+                results.append(value)
+            return len(results) >= limit
+
+        # 1. Whole name starts with the text
+        lo, hi = self._range(self._lowered, text)
+        for value in recent:
+            if value.lower().startswith(text) and add(value):
+                return results
+        for index in range(lo, hi):
+            if add(self._values[index]):
+                return results
+
+        # 2. A later word starts with the text
+        lo, hi = self._range(self._suffix_keys, text)
+        matches = {self._suffixes[i][1] for i in range(lo, hi)}
+        word_matches = [self._values[index] for index in sorted(matches)]
+        for value in sorted(word_matches, key=lambda v: -self._recent.get(v, -1)):
+            if add(value):
+                return results
+
+        # 3. Anywhere in the name
+        if len(text) >= 2:
+            substring_matches = [self._values[i] for i, lowered in enumerate(self._lowered) if text in lowered]
+            for value in sorted(substring_matches, key=lambda v: -self._recent.get(v, -1)):
+                if add(value):
+                    return results
+        return results
+
+
 class AutocompleteCombobox(ttk.Combobox):
+    # Wait this long after the last keystroke before filtering
+    DEBOUNCE_MS = 150
+    MAX_RESULTS = 50
+    _search_provider = None
+    _search_tasks = None
+
     def set_completion_list(self, completion_list):
-        self._completion_list = sorted(completion_list, key=str.lower)
+        """Set (or replace, e.g. after the catalog reloads) the values to complete from."""
+        first = getattr(self, "_index", None) is None
+        self._index = CompletionIndex(completion_list)
+        self._completion_list = self._index.values
         self['values'] = self._completion_list
-        self.bind('<KeyRelease>', self._on_keyrelease)
+        if first:
+            self._pending = None
+            self.bind('<KeyRelease>', self._on_keyrelease)
+            self.bind('<<ComboboxSelected>>', lambda e: self.record_use(self.get()), add="+")
+
+    def set_search_provider(self, provider, tasks=None):
+        """
+        `provider(text)` returns extra matches (e.g. from full-text search)
+        that are appended after the local ones when there is room. With a
+        TaskRunner as `tasks` the provider runs off the Tk thread and its
+        matches are added when they arrive.
+        """
+        self._search_provider = provider
+        self._search_tasks = tasks
+
+    def record_use(self, value):
+        """Rank `value` ahead of other matches in later lookups."""
+        if value:
+            self._index.record_use(value)
 
     def _on_keyrelease(self, event):
         # Don't interfere with navigation keys
-        if event.keysym in ("Up", "Down", "Left", "Right", "Return", "Tab"):
+        if event.keysym in ("Up", "Down", "Left", "Right", "Return", "Tab", "Escape"):
             return
+        if self._pending is not None:
+            self.after_cancel(self._pending)
+        self._pending = self.after(self.DEBOUNCE_MS, self._refresh)
 
-        typed = self.get().lower()
+    def _refresh(self):
+        self._pending = None
+        typed = self.get()
 
-        if typed == "":
+        if typed.strip() == "":
+            # An empty box lists everything, as before, so the catalog can be browsed
             filtered = self._completion_list
         else:
-            filtered = [item for item in self._completion_list if item.lower().startswith(typed)]
+            filtered = self._index.search(typed, self.MAX_RESULTS)
+            if self._search_provider and len(filtered) < self.MAX_RESULTS:
+                if self._search_tasks is not None:
+                    self._search_tasks.submit(
+                        self._search_provider, typed,
+                        key=("search", str(self)),
+                        on_done=lambda extra: self._add_search_matches(typed, filtered, extra),
+                        on_error=lambda e: print(f"Search failed: {e}")
+                    )
+                else:
+                    try:
+                        extra = self._search_provider(typed)
+                    except Exception as e:
+                        print(f"Search failed: {e}")
+                        extra = []
+                    filtered = self._merge(filtered, extra)
+        self._show(typed, filtered, post=True)
 
-        # Save cursor position so user can keep typing
-        current_pos = self.index(tk.INSERT)
+    def _merge(self, filtered, extra):
+        seen = set(filtered)
+        return (filtered + [value for value in extra if value not in seen])[:self.MAX_RESULTS]
 
-        self['values'] = filtered
+    def _add_search_matches(self, typed, filtered, extra):
+        if self.get() != typed:
+            return
+        merged = self._merge(filtered, extra)
+        # Open the list now if the local matches alone left it closed
+        self._show(typed, merged, post=not filtered)
 
-        # Re-set typed text to maintain what user typed
-        self.delete(0, tk.END)
-        self.insert(0, typed)
+    def _show(self, typed, values, post):
+        # Replacing the values can move the cursor, so keep it where the user left it
+        current_pos = self.index(tk.INSERT)
+        self['values'] = values
         self.icursor(current_pos)
 
-        if len(typed) >= 2 and self['values']:
-            self.event_generate('<Down>')
\ No newline at end of file
+        if post and len(typed) >= 2 and values:
+            self.event_generate('<Down>')